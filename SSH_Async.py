@@ -0,0 +1,621 @@
+"""
+# Title: SSH Async Class
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.13
+# Purpose: Asyncio execution engine for SSH_Paramiko, intended to hold hundreds to thousands of AP sessions in flight
+from a single process instead of one worker process per AP
+# Notes:
+0.1 - Created async counterpart of executeChannelCommands
+    - Added runSessions to drive a list of session coroutines with a concurrency semaphore
+0.2 - Added prompt read mode to executeChannelCommands - Waits on the channel instead of polling
+0.3 - Added check_host to executeChannelCommands and checkHostsUp for a non blocking reachability sweep
+0.4 - Added iterSessions and streamSessions - Results are handed back as each session completes
+0.5 - Terminal output is collected as bytes and decoded once with SSH_Paramiko.decodeSSHOutput
+0.6 - Connects through SSH_Paramiko.connectTransport - Session phases are timed into an optional RunMetrics
+0.7 - iterSessions launches through an AdaptiveLimiter fed by the connect latency and errors of each session
+0.8 - Added retry_policy to iterSessions - Failed sessions are queued and run again alongside the rest of the scan
+    - session_terminated output names the error category from SSH_Paramiko.errorCategory
+0.9 - executeChannelCommands expands steps in cmds the same as SSH_Paramiko.runShellCommands
+0.10- Added executeCollectDebugSSH - Debug output streamed into a DebugCapture for many APs at once
+0.11- Added executeMultiplexedCommands - Command groups run on their own channels of one transport
+    - Split runShellCommands and openTransport out of executeChannelCommands and openChannel
+0.12- Added profile and known_hosts, passed to SSH_Paramiko
+0.13- Added error_func to iterSessions - A session that raises is given a result and the rest of the scan carries on
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+from SSH_Paramiko import SSH_Paramiko
+from adaptive_limiter import AdaptiveLimiter
+from debug_capture import DebugCapture
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import collections
+import heapq
+import paramiko
+import socket
+import time
+
+
+class SSH_Async(object):
+    # Connect failures that point at load on the AP, controller or AAA servers rather than an unreachable AP
+    PRESSURE_ERRORS = (paramiko.SSHException, socket.timeout, EOFError, ConnectionResetError)
+
+    """
+    concurrency - Number of sessions allowed in flight at once
+    connect_workers - Number of threads used for the blocking paramiko connect/handshake
+    ssh_port - SSH port of the devices, SSH_Paramiko.SSH_PORT when not set
+    limiter - AdaptiveLimiter for iterSessions, a fixed limit of concurrency when not set
+    profile, known_hosts - SSHProfile and KnownHostsCache the sessions are connected with, see SSH_Paramiko
+    """
+    def __init__(self, concurrency=500, connect_workers=64, ssh_port=None, limiter=None, profile=None,
+                 known_hosts=None):
+        self.concurrency = concurrency
+        self.limiter = limiter or AdaptiveLimiter.fixed(concurrency)
+        self.ssh_session = SSH_Paramiko(ssh_port, profile, known_hosts)
+        self.executor = ThreadPoolExecutor(max_workers=connect_workers)
+
+    """
+    Release the connect threads, call once all runs have completed
+    """
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    """
+    Run a blocking call on the connect thread pool without holding up the event loop
+    """
+    async def runBlocking(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    """
+    Connect and authenticate, the connect latency and errors are fed to the limiter
+    Returns - paramiko.Transport
+    """
+    def openTransport(self, user, passwd, device_ip, timeout, metrics=None):
+        started = time.time()
+        try:
+            ssh = self.ssh_session.connectTransport(user, passwd, device_ip, timeout, metrics)
+        except self.PRESSURE_ERRORS:
+            self.limiter.observe(device_ip, time.time() - started, failed=True)
+            raise
+
+        # Timed on the connect thread so waiting for a free thread is not counted
+        self.limiter.observe(device_ip, time.time() - started)
+
+        return ssh
+
+    """
+    Connect to the device and open an interactive shell
+    Returns - (ssh_transport, ssh_channel)
+    """
+    def openChannel(self, user, passwd, device_ip, timeout, metrics=None):
+        ssh = self.openTransport(user, passwd, device_ip, timeout, metrics)
+        try:
+            ssh_channel = self.ssh_session.invokeShell(ssh, timeout)
+        except Exception:
+            ssh.close()
+            raise
+
+        return ssh, ssh_channel
+
+    """
+    Wait until the channel has data or is closed without blocking the event loop
+    Returns - True if the channel is readable, False if the timeout expired
+    """
+    async def waitReadable(self, ssh_channel, timeout):
+        if ssh_channel.recv_ready() or ssh_channel.closed or ssh_channel.eof_received:
+            return True
+
+        loop = asyncio.get_event_loop()
+        readable = loop.create_future()
+        fd = ssh_channel.fileno()
+
+        def onReadable():
+            if not readable.done():
+                readable.set_result(True)
+
+        try:
+            loop.add_reader(fd, onReadable)
+        except NotImplementedError:
+            # Event loops without add_reader (Windows proactor) fall back to polling
+            end_time = time.time() + timeout
+            while time.time() < end_time:
+                await asyncio.sleep(0.05)
+                if ssh_channel.recv_ready() or ssh_channel.closed or ssh_channel.eof_received:
+                    return True
+            return False
+
+        try:
+            await asyncio.wait_for(readable, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            loop.remove_reader(fd)
+
+    """
+    Async counterpart of SSH_Paramiko.readUntilPrompt
+    Returns - bytes of the terminal output
+    """
+    async def readUntilPrompt(self, ssh_channel, prompt, cmd_timeout=60, deadline=None):
+        if prompt is not None:
+            prompt = self.ssh_session.compilePrompt(prompt)
+        ssh_chunks = []
+        tail = ""
+        end_time = time.time() + cmd_timeout
+
+        while True:
+            if deadline is not None and time.time() >= deadline:
+                raise socket.timeout("Session timeout waiting for device prompt")
+
+            if deadline is not None:
+                remaining = min(end_time, deadline) - time.time()
+            else:
+                remaining = end_time - time.time()
+
+            # Command timeout - Move on to the next command with the output collected so far
+            if remaining <= 0:
+                break
+
+            if not ssh_channel.recv_ready():
+                if ssh_channel.closed or ssh_channel.eof_received:
+                    break
+
+                await self.waitReadable(ssh_channel, remaining)
+                continue
+
+            ssh_temp = ssh_channel.recv(20480)
+            if not ssh_temp:
+                break
+
+            ssh_chunks.append(ssh_temp)
+            if prompt is None:
+                continue
+
+            tail, prompt_found = self.ssh_session.matchPrompt(prompt, tail, ssh_temp)
+            if prompt_found:
+                break
+
+        return b"".join(ssh_chunks)
+
+    """
+    Async counterpart of SSH_Paramiko.executeChannelCommands
+    The connect is handed to a thread, every wait on the channel yields to the event loop
+    Returns - string(ssh_term) >> "session_terminated,<device_name>,<errorCategory>", "ping_failed" if error in session
+    """
+    async def executeChannelCommands(self, user, passwd, device_ip, device_name, cmds, hold_time=0.1,
+                                     silent_cmds=True, timeout=60, prompt=None, cmd_timeout=60,
+                                     session_timeout=None, check_host=True, metrics=None):
+        ssh_chunks = []
+
+        # Check if host is reachable before attempting to connect
+        if check_host:
+            started = time.time()
+            host, host_up = await self.ssh_session.probeHostUp(device_ip)
+            self.ssh_session.recordPhase(metrics, "ping", started)
+            if not host_up:
+                return "ping_failed," + device_name
+
+        ssh = None
+        try:
+            ssh, ssh_channel = await self.runBlocking(self.openChannel, user, passwd, device_ip, timeout, metrics)
+            started = time.time()
+
+            deadline = None
+            if session_timeout is not None:
+                deadline = time.time() + session_timeout
+
+            if prompt is not None:
+                # wait for terminal to show the prompt
+                ssh_chunks.append(await self.readUntilPrompt(ssh_channel, prompt, cmd_timeout, deadline))
+            else:
+                # wait for terminal to be in ready state - Holds for 60 seconds
+                stuck_ssh_counter = 0
+                while not ssh_channel.recv_ready() and stuck_ssh_counter <= 600:
+                    stuck_ssh_counter += 1
+                    await asyncio.sleep(0.1)
+
+            self.ssh_session.recordPhase(metrics, "shell_ready", started)
+
+            ssh_chunks.append(await self.runShellCommands(ssh_channel, cmds, hold_time, silent_cmds, prompt,
+                                                          cmd_timeout, deadline, metrics))
+
+            ssh.close()
+            ssh_out = self.ssh_session.decodeSSHOutput(ssh_chunks)
+        except Exception as error:
+            ssh_out = self.ssh_session.sessionTerminated(device_name, error)
+            if ssh is not None:
+                ssh.close()
+
+        return ssh_out
+
+    """
+    Async counterpart of SSH_Paramiko.runShellCommands
+    Returns - bytes of terminal output
+    """
+    async def runShellCommands(self, ssh_channel, cmds, hold_time=0.1, silent_cmds=True, prompt=None, cmd_timeout=60,
+                               deadline=None, metrics=None):
+        ssh_chunks = []
+        cmd_queue = collections.deque(cmds)
+
+        while True:
+            cmd = self.ssh_session.nextCommand(cmd_queue, ssh_chunks)
+            if cmd is None:
+                break
+
+            started = time.time()
+            ssh_wait = True
+            cmd = str(cmd) + "\n"
+            stuck_ssh_counter = 0
+
+            # Silent Command Run
+            if silent_cmds != True:
+                print("### Executing Command ###")
+                print(cmd)
+
+            ssh_channel.send(cmd)
+
+            # Read until the prompt returns
+            if prompt is not None:
+                ssh_chunks.append(await self.readUntilPrompt(ssh_channel, prompt, cmd_timeout, deadline))
+                ssh_wait = False
+
+            # Hold untill the ssh session is ready
+            while ssh_wait:
+                if ssh_channel.recv_ready():
+                    ssh_wait = False
+                    await asyncio.sleep(hold_time)
+
+                    ssh_chunks.append(ssh_channel.recv(20480))
+
+                # Prevent the ssh_wait from getting stuck - Holds for 60 seconds
+                if stuck_ssh_counter > 600:
+                    ssh_wait = False
+
+                stuck_ssh_counter += 1
+                await asyncio.sleep(0.1)
+
+            self.ssh_session.recordPhase(metrics, "command", started)
+
+        return b"".join(ssh_chunks)
+
+    """
+    Async counterpart of SSH_Paramiko.runChannelGroup, only opening the channel is handed to a thread
+    Returns - string of the group output
+    """
+    async def runChannelGroup(self, transport, cmds, timeout=60, prompt=SSH_Paramiko.DEVICE_PROMPT, cmd_timeout=60,
+                              deadline=None, metrics=None):
+        started = time.time()
+        if isinstance(cmds, str):
+            ssh_channel = await self.runBlocking(self.ssh_session.openExec, transport, cmds, timeout)
+            try:
+                ssh_out = await self.readUntilPrompt(ssh_channel, None, cmd_timeout, deadline)
+            finally:
+                ssh_channel.close()
+            self.ssh_session.recordPhase(metrics, "command", started)
+            return self.ssh_session.decodeSSHOutput(ssh_out)
+
+        ssh_channel = await self.runBlocking(self.ssh_session.invokeShell, transport, timeout)
+        try:
+            ssh_banner = await self.readUntilPrompt(ssh_channel, prompt, cmd_timeout, deadline)
+            self.ssh_session.recordPhase(metrics, "shell_ready", started)
+            ssh_cmds_out = await self.runShellCommands(ssh_channel, cmds, prompt=prompt, cmd_timeout=cmd_timeout,
+                                                       deadline=deadline, metrics=metrics)
+        finally:
+            ssh_channel.close()
+
+        return self.ssh_session.decodeSSHOutput([ssh_banner, ssh_cmds_out])
+
+    """
+    Async counterpart of SSH_Paramiko.executeMultiplexedCommands, the groups run as coroutines on the event loop
+    Returns - list of strings, the output of each group in the order of cmd_groups
+    """
+    async def executeMultiplexedCommands(self, user, passwd, device_ip, device_name, cmd_groups, timeout=60,
+                                         prompt=SSH_Paramiko.DEVICE_PROMPT, cmd_timeout=60, session_timeout=None,
+                                         check_host=True, metrics=None):
+        # Check if host is reachable before attempting to connect
+        if check_host:
+            started = time.time()
+            host, host_up = await self.ssh_session.probeHostUp(device_ip)
+            self.ssh_session.recordPhase(metrics, "ping", started)
+            if not host_up:
+                return ["ping_failed," + device_name] * len(cmd_groups)
+
+        deadline = None
+        if session_timeout is not None:
+            deadline = time.time() + session_timeout
+
+        try:
+            ssh = await self.runBlocking(self.openTransport, user, passwd, device_ip, timeout, metrics)
+        except Exception as error:
+            return [self.ssh_session.sessionTerminated(device_name, error)] * len(cmd_groups)
+
+        async def runGroup(cmds):
+            try:
+                return await self.runChannelGroup(ssh, cmds, timeout, prompt, cmd_timeout, deadline, metrics)
+            except Exception as error:
+                return self.ssh_session.sessionTerminated(device_name, error)
+
+        try:
+            ssh_outs = await asyncio.gather(*[runGroup(cmds) for cmds in cmd_groups])
+        finally:
+            ssh.close()
+
+        return list(ssh_outs)
+
+    """
+    Async counterpart of SSH_Paramiko.drainChannel
+    Returns - True if the capture stopped on its stop pattern
+    """
+    async def drainChannel(self, ssh_channel, capture, duration, until_data=False):
+        end_time = time.time() + duration
+
+        while not capture.stopped:
+            if ssh_channel.recv_ready():
+                data = ssh_channel.recv(32768)
+                if not data:
+                    break
+
+                capture.write(data)
+                if until_data:
+                    break
+                continue
+
+            remaining = end_time - time.time()
+            if remaining <= 0 or ssh_channel.closed or ssh_channel.eof_received:
+                break
+
+            await self.waitReadable(ssh_channel, remaining)
+
+        return capture.stopped
+
+    """
+    Async counterpart of SSH_Paramiko.executeCollectDebugSSH, every AP holds at most its capture max_bytes in memory
+    Returns - string(ssh_term) >> "session_terminated,<device_name>,<errorCategory>", "ping_failed" if error in session
+    """
+    async def executeCollectDebugSSH(self, user, passwd, device_ip, device_name, cmds, timer=60, silent_cmds=True,
+                                     timeout=1800, capture=None):
+        if capture is None:
+            capture = DebugCapture()
+
+        # Check if host is reachable before attempting to connect
+        host, host_up = await self.ssh_session.probeHostUp(device_ip)
+        if not host_up:
+            return "ping_failed," + device_name
+
+        ssh = None
+        try:
+            ssh, ssh_channel = await self.runBlocking(self.openChannel, user, passwd, device_ip, timeout)
+
+            # wait for terminal to be in ready state - Holds for 60 seconds
+            await self.drainChannel(ssh_channel, capture, 60, until_data=True)
+
+            for cmd in cmds:
+                cmd = str(cmd) + "\n"
+
+                # Silent Command Run
+                if silent_cmds != True:
+                    print("### Executing Command ###")
+                    print(cmd)
+
+                ssh_channel.send(cmd)
+                await self.drainChannel(ssh_channel, capture, 60, until_data=True)
+
+            # Collect for the given amount of time or until the stop pattern is seen
+            if await self.drainChannel(ssh_channel, capture, timer) and silent_cmds != True:
+                print("Capture stopped on " + capture.stop_match)
+
+            # Remove any debugs once the capture has finished
+            ssh_channel.send("no debug all\n")
+            ssh_channel.send("\n")
+            ssh_channel.send("no debug all\n")
+            ssh_channel.send("\n")
+
+            capture.clearStop()
+            await self.drainChannel(ssh_channel, capture, 1)
+
+            ssh.close()
+            ssh_out = self.ssh_session.decodeSSHOutput(capture.getvalue())
+        except Exception as error:
+            ssh_out = self.ssh_session.sessionTerminated(device_name, error)
+            if ssh is not None:
+                ssh.close()
+        finally:
+            capture.close()
+
+        return ssh_out
+
+    """
+    Sweep the device list on the running event loop
+    Returns - dict {host: bool}
+    """
+    async def checkHostsUp(self, hosts, port=None, timeout=2, concurrency=512):
+        return await self.ssh_session.probeHostsUp(hosts, port, timeout, concurrency)
+
+    """
+    Run session_func(*params) for every entry in parameters, at most self.concurrency at a time
+    session_func must be a coroutine function, the SSH_Async instance is passed as the first argument
+    Returns - list of results in the same order as parameters
+    """
+    async def gatherSessions(self, session_func, parameters):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(params):
+            async with semaphore:
+                return await session_func(self, *params)
+
+        return await asyncio.gather(*[bounded(params) for params in parameters])
+
+    """
+    Blocking entry point for scripts, runs gatherSessions on a fresh event loop
+    """
+    def runSessions(self, session_func, parameters):
+        loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            return loop.run_until_complete(self.gatherSessions(session_func, parameters))
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    """
+    Run session_func(*params) for every entry in parameters, as many at a time as self.limiter allows
+    parameters can be any iterable, sessions are only started as slots become free
+    ip_func - returns the device IP of an entry in parameters, used for the limiter per site or subnet limits
+    retry_policy - RetryPolicy, a session it retries is queued and run again once its delay is up alongside the
+                   remaining parameters, only the final result of each entry is yielded
+    error_func - returns the result of a session that raised from (params, error) e.g. a session_terminated APResult,
+                 when not set the error is raised out of iterSessions and ends the scan
+    Yields - each result as soon as its session completes, in completion order
+    """
+    async def iterSessions(self, session_func, parameters, ip_func=None, max_deferred=10000, retry_policy=None,
+                           error_func=None):
+        loop = asyncio.get_event_loop()
+        results = asyncio.Queue()
+        slot_freed = asyncio.Event()
+        launched = [0]
+        in_flight = [0]
+        feed_done = loop.create_future()
+
+        # Sessions waiting to be retried >> heap of (due time, sequence, params, device_ip, attempt)
+        retries = []
+        retry_sequence = [0]
+
+        async def run(params, device_ip, attempt):
+            try:
+                result = (True, await session_func(self, *params))
+            except Exception as error:
+                # One AP failing is reported for that AP, the sessions still in flight are not lost
+                if error_func is not None:
+                    result = (True, error_func(params, error))
+                else:
+                    result = (False, error)
+
+            try:
+                retry = None
+                if retry_policy is not None and result[0]:
+                    retry = retry_policy.retry(params, result[1], attempt)
+
+                if retry is not None:
+                    # Queued before the slot is freed so the feed never sees an empty queue with this retry pending
+                    retry_delay, retry_params = retry
+                    retry_sequence[0] += 1
+                    heapq.heappush(retries, (time.time() + retry_delay, retry_sequence[0], retry_params, device_ip,
+                                             attempt + 1))
+                    launched[0] -= 1
+                else:
+                    results.put_nowait(result)
+            finally:
+                in_flight[0] -= 1
+                self.limiter.release(device_ip)
+                slot_freed.set()
+
+        def launch(params, device_ip, attempt=1):
+            self.limiter.acquire(device_ip)
+            in_flight[0] += 1
+            launched[0] += 1
+            loop.create_task(run(params, device_ip, attempt))
+
+        async def feed():
+            # Sessions for a site or subnet at its limit wait here so other sites are not held up behind them
+            deferred = collections.OrderedDict()
+            deferred_count = 0
+            params_iter = iter(parameters)
+            exhausted = False
+
+            def defer(params, device_ip, attempt):
+                key = self.limiter.keyOf(device_ip)
+                deferred.setdefault(key, collections.deque()).append((params, device_ip, attempt))
+
+            try:
+                while True:
+                    for key in list(deferred):
+                        waiting = deferred[key]
+                        while waiting and self.limiter.hasSlot(waiting[0][1]):
+                            launch(*waiting.popleft())
+                            deferred_count -= 1
+                        if not waiting:
+                            del deferred[key]
+
+                    # Retries that are due go ahead of the remaining parameters
+                    while retries and retries[0][0] <= time.time():
+                        due, sequence, params, device_ip, attempt = heapq.heappop(retries)
+                        if self.limiter.hasSlot(device_ip):
+                            launch(params, device_ip, attempt)
+                        else:
+                            defer(params, device_ip, attempt)
+                            deferred_count += 1
+
+                    while not exhausted and self.limiter.hasSlot() and deferred_count < max_deferred:
+                        try:
+                            params = next(params_iter)
+                        except StopIteration:
+                            exhausted = True
+                            break
+
+                        device_ip = ip_func(params) if ip_func is not None else None
+                        if self.limiter.hasSlot(device_ip):
+                            launch(params, device_ip)
+                        else:
+                            defer(params, device_ip, 1)
+                            deferred_count += 1
+
+                    # A session still in flight may yet be queued for a retry
+                    if exhausted and not deferred and not retries and (retry_policy is None or not in_flight[0]):
+                        break
+
+                    slot_freed.clear()
+                    if retries:
+                        try:
+                            await asyncio.wait_for(slot_freed.wait(), max(retries[0][0] - time.time(), 0))
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await slot_freed.wait()
+            finally:
+                feed_done.set_result(True)
+
+        feeder = loop.create_task(feed())
+        yielded = 0
+
+        try:
+            while not feed_done.done() or yielded < launched[0]:
+                if feed_done.done():
+                    completed, result = await results.get()
+                else:
+                    # Wake for the next result or for the feed finishing with nothing left to launch
+                    get_result = loop.create_task(results.get())
+                    await asyncio.wait([get_result, feed_done], return_when=asyncio.FIRST_COMPLETED)
+
+                    if not get_result.done():
+                        get_result.cancel()
+                        continue
+
+                    completed, result = get_result.result()
+
+                yielded += 1
+                if not completed:
+                    raise result
+
+                yield result
+        finally:
+            feeder.cancel()
+
+    """
+    Blocking entry point for scripts, on_result(result) is called as each session completes
+    """
+    def streamSessions(self, session_func, parameters, on_result, ip_func=None, retry_policy=None, error_func=None):
+        async def consume():
+            async for result in self.iterSessions(session_func, parameters, ip_func, retry_policy=retry_policy,
+                                                  error_func=error_func):
+                on_result(result)
+
+        loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(consume())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
@@ -2,8 +2,8 @@
 # Title: SSH Paramiko Class
 # Author: Dean Clark
 # Date Created: 23/07/2016
-# Date Modified: 06/09/2018
-# Version: 0.61
+# Date Modified: 17/10/2026
+# Version: 0.77
 # Purpose: This is intended as a SSH library to be used with Cisco switches and routers
 # Notes:
 0.1 - Requires update to output from executeCommands Method (To output string of Terminal Output)
@@ -18,19 +18,71 @@
     - Added hold_timer to executeChannelCommands method
     - Fixed holding bug in execute methods
 0.61- Added checkHostUp method - Use to perform a ping check before connecting to host
+0.62- Added prompt read mode to executeChannelCommands - Reads until the device prompt instead of holding
+    - Added per command and session timeouts for the prompt read mode
+0.63- Added checkHostsUp method - Concurrent TCP reachability sweep of a device list before any SSH work
+    - Added check_host to executeChannelCommands so a swept host is not pinged again
+0.64- Split executeChannelCommands into openShell and runShellCommands so shells can be held open by SSH_SessionPool
+0.65- Terminal output is collected as bytes and decoded once by decodeSSHOutput - No str(bytes) round trip
+    - executeChannelCommands returns clean output, cleanSSHOutput is only needed for output from earlier versions
+0.66- printTextFile returns the path of the file written
+0.67- printTextFile no longer changes the working directory or shells out to mkdir, files are closed after writing
+0.68- getCSV closes the CSV file
+0.69- Connects with an explicit paramiko Transport - Ping, TCP connect, handshake, auth, shell ready and each
+      command are timed into an optional RunMetrics
+0.70- Added SSH_PORT and ssh_port so sessions can be run against simulated APs on a high port
+0.71- Added errorCategory - session_terminated output names why the session failed so it can be retried
+    - executeChannelCommands no longer catches KeyboardInterrupt and SystemExit
+0.72- cmds can include steps, a step is called with the output so far and returns the commands to send next
+0.73- executeCollectDebugSSH streams the output into a DebugCapture - No 40KB recv limit, bounded memory,
+      optional capture file and stop pattern
+0.74- Added executeMultiplexedCommands - Groups of commands run at the same time on their own channels over one
+      transport, one handshake covers every check of the device
+0.75- Optional SSHProfile and KnownHostsCache - Algorithm preferences for the handshake and host keys checked against
+      a known_hosts file, a changed host key fails with the host_key error category
+0.76- Added answerConfirm - Step answering the [yes/no] and [confirm] questions of a command in the prompt read mode
+0.77- Channels are waited on with a channel timeout on recv instead of select, select cannot wait on a channel on
+      Windows
 """
 
 # ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+from debug_capture import DebugCapture
+from ssh_profile import PROFILES, KnownHostsCache
+import asyncio
+import collections
 import csv
+import errno
 import paramiko
 import time
 import os
+import re
+import socket
 import subprocess
 import sys
+import threading
 
 class SSH_Paramiko(object):
-    def __init__(self):
-        return None
+    # Matches the end of Cisco exec/enable prompts and the interactive questions raised by the AP
+    DEVICE_PROMPT = r"(?:[>#]|[Pp]assword:|\[confirm\]|\[yes/no\]:?)\s*$"
+
+    # Terminal formatting removed from output in a single pass - line endings, backspaces and padding
+    OUTPUT_FORMATTING = re.compile(r"\r\n|[\x08\r]| {9}")
+
+    # SSH port of the devices, set to the port of fake_ap_server.py to run against simulated APs
+    SSH_PORT = 22
+
+    # errno values of a connect that could not reach the device
+    UNREACHABLE_ERRNOS = (errno.EHOSTUNREACH, errno.ENETUNREACH, getattr(errno, "EHOSTDOWN", errno.EHOSTUNREACH))
+
+    """
+    ssh_port - SSH port of the devices, SSH_PORT when not set
+    profile - SSHProfile of the algorithms offered in the handshake, the paramiko defaults when not set
+    known_hosts - optional KnownHostsCache the host key of each device is checked against
+    """
+    def __init__(self, ssh_port=None, profile=None, known_hosts=None):
+        self.ssh_port = ssh_port or self.SSH_PORT
+        self.profile = profile or PROFILES["default"]
+        self.known_hosts = known_hosts
 
     """
     Use this method to verify that the host is online before initiating an SSH session
@@ -50,9 +102,52 @@ class SSH_Paramiko(object):
 
         return host_up
 
+    """
+    Probe a single host with a TCP connect to the SSH port
+    Returns - (host, bool) >> True only if the connect completes within the timeout
+    """
+    async def probeHostUp(self, host, port=None, timeout=2):
+        try:
+            port = port or self.ssh_port
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            writer.close()
+            host_up = True
+        except (OSError, asyncio.TimeoutError):
+            host_up = False
+
+        return host, host_up
+
+    """
+    Probe every host concurrently, at most concurrency connects outstanding at once
+    Returns - dict {host: bool}
+    """
+    async def probeHostsUp(self, hosts, port=None, timeout=2, concurrency=512):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(host):
+            async with semaphore:
+                return await self.probeHostUp(host, port, timeout)
+
+        results = await asyncio.gather(*[bounded(host) for host in set(hosts)])
+
+        return dict(results)
+
+    """
+    Use this method to sweep a whole device list before starting SSH sessions
+    Reason - Filters offline hosts in seconds rather than forking a ping for each host in turn
+    Returns - dict {host: bool}
+    """
+    def checkHostsUp(self, hosts, port=None, timeout=2, concurrency=512):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.probeHostsUp(hosts, port, timeout, concurrency))
+        finally:
+            loop.close()
+
     """
     Clean SSH Out and return the ssh output
     Function will remove the formatting that's returned from an SSH session
+    Only needed for output built from str(bytes), decodeSSHOutput is used for output collected as bytes
     """
     def cleanSSHOutput(self, ssh_out):
         ssh_out = ssh_out.replace('\\r\\n', '\n')
@@ -64,199 +159,570 @@ class SSH_Paramiko(object):
 
         return ssh_out
 
+    """
+    Decode terminal output collected as bytes and remove the terminal formatting
+    Accepts bytes or a list of bytes chunks
+    Returns - string of the terminal output
+    """
+    def decodeSSHOutput(self, ssh_out):
+        if isinstance(ssh_out, list):
+            ssh_out = b"".join(ssh_out)
+
+        ssh_out = ssh_out.decode("utf-8", "replace")
+
+        return self.OUTPUT_FORMATTING.sub(lambda match: "\n" if match.group(0) == "\r\n" else "", ssh_out)
+
+    """
+    Compile a prompt pattern, accepts a regex string or an already compiled pattern
+    """
+    def compilePrompt(self, prompt):
+        if hasattr(prompt, "search"):
+            return prompt
+
+        return re.compile(prompt)
+
+    """
+    Check whether the tail of the terminal output ends with the device prompt
+    Returns - updated tail, True if the prompt was found
+    """
+    def matchPrompt(self, prompt, tail, data):
+        tail = (tail + data.decode("utf-8", "replace"))[-256:]
+
+        return tail, prompt.search(tail) is not None
+
+    """
+    Wait up to timeout seconds for data on the channel, select is not used as it only takes sockets on Windows
+    Returns - bytes read, b"" once the channel has closed, None if nothing arrived in time
+    """
+    @staticmethod
+    def recvWait(ssh_channel, timeout, nbytes=20480):
+        channel_timeout = ssh_channel.gettimeout()
+        ssh_channel.settimeout(timeout)
+        try:
+            return ssh_channel.recv(nbytes)
+        except socket.timeout:
+            return None
+        finally:
+            ssh_channel.settimeout(channel_timeout)
+
+    """
+    Read from the channel until the device prompt is seen, the channel closes or cmd_timeout expires
+    Data is drained as soon as it arrives rather than after a fixed hold
+    prompt - None to read until the device closes the channel, used for exec channels
+    deadline - absolute time.time() for the whole session, raises socket.timeout once passed
+    Returns - bytes of the terminal output
+    """
+    def readUntilPrompt(self, ssh_channel, prompt, cmd_timeout=60, deadline=None):
+        if prompt is not None:
+            prompt = self.compilePrompt(prompt)
+        ssh_chunks = []
+        tail = ""
+        end_time = time.time() + cmd_timeout
+
+        while True:
+            if deadline is not None and time.time() >= deadline:
+                raise socket.timeout("Session timeout waiting for device prompt")
+
+            if deadline is not None:
+                remaining = min(end_time, deadline) - time.time()
+            else:
+                remaining = end_time - time.time()
+
+            # Command timeout - Move on to the next command with the output collected so far
+            if remaining <= 0:
+                break
+
+            # Block until the channel has data or the timeout expires
+            ssh_temp = self.recvWait(ssh_channel, remaining)
+            if ssh_temp is None:
+                continue
+            if not ssh_temp:
+                break
+
+            ssh_chunks.append(ssh_temp)
+            if prompt is None:
+                continue
+
+            tail, prompt_found = self.matchPrompt(prompt, tail, ssh_temp)
+            if prompt_found:
+                break
+
+        return b"".join(ssh_chunks)
+
     """
     Execute commands on remote device via SSH
-    Returns - string(ssh_term) >> "session_terminated", "ping_failed" if error in session
+    prompt - regex for the device prompt e.g. SSH_Paramiko.DEVICE_PROMPT, each command returns as soon as the
+             prompt is seen. When None the hold_time read mode is used
+    cmd_timeout - seconds to wait for the prompt after each command (prompt mode)
+    session_timeout - seconds allowed for the whole session (prompt mode), session_terminated once exceeded
+    check_host - ping the host before connecting, set False when checkHostsUp has already been run
+    Returns - string(ssh_term) >> "session_terminated,<device_name>,<errorCategory>", "ping_failed" if error in session
     """
-    def executeChannelCommands(self, user, passwd, device_ip, device_name, cmds, hold_time=0.1, silent_cmds=True, timeout=60):
+    def executeChannelCommands(self, user, passwd, device_ip, device_name, cmds, hold_time=0.1, silent_cmds=True,
+                               timeout=60, prompt=None, cmd_timeout=60, session_timeout=None, check_host=True,
+                               metrics=None):
         ssh_out = ""
 
         # Check if host is reachable before attempting to connect
-        if self.checkHostUp(device_ip):
+        host_up = True
+        if check_host:
+            started = time.time()
+            host_up = self.checkHostUp(device_ip)
+            self.recordPhase(metrics, "ping", started)
+
+        if host_up:
+            ssh = None
             try:
-                ssh = paramiko.SSHClient()
-                ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                ssh.connect(device_ip, username=user, password=passwd, look_for_keys=False, allow_agent=False, timeout=timeout)
+                deadline = None
+                if session_timeout is not None:
+                    deadline = time.time() + session_timeout
 
-                ssh_wait = True
+                ssh, ssh_channel, ssh_banner = self.openShell(user, passwd, device_ip, timeout, prompt, cmd_timeout,
+                                                              deadline, metrics)
+                ssh_cmds_out = self.runShellCommands(ssh_channel, cmds, hold_time, silent_cmds, prompt, cmd_timeout,
+                                                     deadline, metrics)
+                ssh_out = self.decodeSSHOutput([ssh_banner, ssh_cmds_out])
 
-                ssh_channel = ssh.invoke_shell()
-                stuck_ssh_counter = 0
+                ssh.close()
+            except Exception as error:
+                ssh_out = self.sessionTerminated(device_name, error)
+                if ssh is not None:
+                    ssh.close()
+        else:
+            ssh_out = "ping_failed," + device_name
 
-                # wait for terminal to be in ready state
-                while ssh_wait:
-                    time.sleep(0.1)
-                    if ssh_channel.recv_ready():
-                        ssh_wait = False
+        return ssh_out
 
-                    # Prevent the ssh_wait from getting stuck - Holds for 60 seconds
-                    if stuck_ssh_counter > 600:
-                        ssh_wait = False
+    """
+    Record the seconds since started against a phase when metrics are being collected
+    Returns - time.time() now, the start of the next phase
+    """
+    def recordPhase(self, metrics, phase, started):
+        now = time.time()
+        if metrics is not None:
+            metrics.record(phase, now - started)
 
-                    stuck_ssh_counter += 1
-                    time.sleep(0.1)
+        return now
 
-                for cmd_line in range(0, len(cmds)):
-                    ssh_wait = True
-                    cmd = str(cmds[cmd_line]) + "\n"
-                    stuck_ssh_counter = 0
+    """
+    Connect and authenticate with an explicit transport so the TCP connect, handshake and auth can be timed
+    Returns - paramiko.Transport
+    """
+    def connectTransport(self, user, passwd, device_ip, timeout=60, metrics=None, port=None):
+        port = port or self.ssh_port
+        host_name = KnownHostsCache.hostName(device_ip, port)
 
-                    # Silent Command Run
-                    if silent_cmds != True:
-                        print("### Executing Command ###")
-                        print(cmd)
+        started = time.time()
+        sock = socket.create_connection((device_ip, port), timeout)
+        started = self.recordPhase(metrics, "tcp_connect", started)
 
-                    ssh_channel.send(cmd)
+        transport = paramiko.Transport(sock)
+        try:
+            host_key_type = None
+            if self.known_hosts is not None:
+                host_key_type = self.known_hosts.keyType(host_name)
+            self.profile.apply(transport, host_key_type)
 
-                    # Hold untill the ssh session is ready
-                    while ssh_wait:
-                        if ssh_channel.recv_ready():
-                            ssh_wait = False
-                            time.sleep(hold_time)
+            transport.banner_timeout = timeout
+            transport.auth_timeout = timeout
+            transport.start_client(timeout=timeout)
+            started = self.recordPhase(metrics, "ssh_handshake", started)
 
-                            ssh_temp = str(ssh_channel.recv(20480))
-                            ssh_out = ssh_out + ssh_temp
-                        # Loading bar for user
-                        if silent_cmds != True:
-                            print(".", end="")
+            # Checked before the password is sent so it is never given to a device impersonating the AP
+            if self.known_hosts is not None:
+                self.known_hosts.check(host_name, transport.get_remote_server_key())
 
-                        # Prevent the ssh_wait from getting stuck - Holds for 60 seconds
-                        if stuck_ssh_counter > 600:
-                            ssh_wait = False
+            # Falls back to keyboard-interactive when the device does not offer password auth
+            transport.auth_password(user, passwd)
+            self.recordPhase(metrics, "auth", started)
+        except:
+            transport.close()
+            raise
 
-                        stuck_ssh_counter += 1
-                        time.sleep(0.1)
+        return transport
 
-                    if silent_cmds != True:
-                        print("\n")
+    """
+    Why a session failed, checked most specific first as the socket errors are all OSError
+    Returns - string >> "auth", "host_key", "timeout", "unreachable", "reset" or "error"
+    """
+    @classmethod
+    def errorCategory(cls, error):
+        if isinstance(error, paramiko.AuthenticationException):
+            return "auth"
+        if isinstance(error, paramiko.BadHostKeyException):
+            return "host_key"
+        if isinstance(error, (socket.timeout, TimeoutError)):
+            return "timeout"
+        if isinstance(error, ConnectionRefusedError):
+            return "unreachable"
+        if isinstance(error, OSError) and error.errno in cls.UNREACHABLE_ERRNOS:
+            return "unreachable"
+        # paramiko raises a plain socket.error once the device has closed the channel
+        if isinstance(error, (OSError, EOFError, paramiko.SSHException)):
+            return "reset"
+
+        return "error"
 
-                ssh.close()
-            except:
-                ssh_out = "session_terminated," + device_name
-                ssh.close()
-        else:
-            ssh_out = "ping_failed," + device_name
+    """
+    Returns - string >> "session_terminated,<device_name>,<errorCategory>"
+    """
+    def sessionTerminated(self, device_name, error):
+        return "session_terminated," + device_name + "," + self.errorCategory(error)
+
+    """
+    Open an interactive shell on a connected transport, the same terminal as SSHClient.invoke_shell
+    Returns - paramiko.Channel
+    """
+    def invokeShell(self, transport, timeout=60):
+        ssh_channel = transport.open_session(timeout=timeout)
+        ssh_channel.get_pty("vt100", 80, 24)
+        ssh_channel.invoke_shell()
+
+        return ssh_channel
+
+    """
+    Connect to the device, open an interactive shell and wait for the terminal to be ready
+    Returns - (ssh_transport, ssh_channel, bytes of terminal output read while waiting)
+    """
+    def openShell(self, user, passwd, device_ip, timeout=60, prompt=None, cmd_timeout=60, deadline=None,
+                  metrics=None):
+        ssh_out = b""
+
+        ssh = self.connectTransport(user, passwd, device_ip, timeout, metrics)
+        try:
+            started = time.time()
+            ssh_wait = True
+
+            ssh_channel = self.invokeShell(ssh, timeout)
+            stuck_ssh_counter = 0
+
+            if prompt is not None:
+                # wait for terminal to show the prompt
+                ssh_out = self.readUntilPrompt(ssh_channel, prompt, cmd_timeout, deadline)
+                ssh_wait = False
+
+            # wait for terminal to be in ready state
+            while ssh_wait:
+                time.sleep(0.1)
+                if ssh_channel.recv_ready():
+                    ssh_wait = False
+
+                # Prevent the ssh_wait from getting stuck - Holds for 60 seconds
+                if stuck_ssh_counter > 600:
+                    ssh_wait = False
+
+                stuck_ssh_counter += 1
+                time.sleep(0.1)
+
+            self.recordPhase(metrics, "shell_ready", started)
+        except:
+            ssh.close()
+            raise
+
+        return ssh, ssh_channel, ssh_out
+
+    """
+    Step for cmds that answers the [yes/no] and [confirm] questions of the command before it, nothing is sent when the
+    command asked nothing so each answer returns exactly one prompt e.g. ["reload", SSH_Paramiko.answerConfirm]
+    """
+    @staticmethod
+    def answerConfirm(ssh_out):
+        tail = ssh_out.rstrip()
+        if tail.endswith("[yes/no]") or tail.endswith("[yes/no]:"):
+            return ["yes", SSH_Paramiko.answerConfirm]
+        if tail.endswith("[confirm]"):
+            return [""]
+
+        return []
+
+    """
+    Take the next command from a deque of cmds, a step is a callable given the decoded output so far that
+    returns the commands to send next e.g. a verify command picked from the show version output
+    Returns - the next command to send, None when the queue is empty
+    """
+    def nextCommand(self, cmd_queue, ssh_chunks):
+        while cmd_queue:
+            cmd = cmd_queue.popleft()
+            if not callable(cmd):
+                return cmd
+
+            cmd_queue.extendleft(reversed(list(cmd(self.decodeSSHOutput(ssh_chunks)))))
+
+        return None
+
+    """
+    Send commands to an open shell and collect the terminal output
+    Uses the prompt read mode when prompt is set, otherwise holds for hold_time after each command
+    Returns - bytes of terminal output
+    """
+    def runShellCommands(self, ssh_channel, cmds, hold_time=0.1, silent_cmds=True, prompt=None, cmd_timeout=60,
+                         deadline=None, metrics=None):
+        ssh_chunks = []
+        cmd_queue = collections.deque(cmds)
+
+        while True:
+            cmd = self.nextCommand(cmd_queue, ssh_chunks)
+            if cmd is None:
+                break
+
+            started = time.time()
+            ssh_wait = True
+            cmd = str(cmd) + "\n"
+            stuck_ssh_counter = 0
+
+            # Silent Command Run
+            if silent_cmds != True:
+                print("### Executing Command ###")
+                print(cmd)
+
+            ssh_channel.send(cmd)
+
+            # Read until the prompt returns
+            if prompt is not None:
+                ssh_chunks.append(self.readUntilPrompt(ssh_channel, prompt, cmd_timeout, deadline))
+                ssh_wait = False
+
+            # Hold untill the ssh session is ready
+            while ssh_wait:
+                if ssh_channel.recv_ready():
+                    ssh_wait = False
+                    time.sleep(hold_time)
+
+                    ssh_chunks.append(ssh_channel.recv(20480))
+                # Loading bar for user
+                if silent_cmds != True:
+                    print(".", end="")
+
+                # Prevent the ssh_wait from getting stuck - Holds for 60 seconds
+                if stuck_ssh_counter > 600:
+                    ssh_wait = False
+
+                stuck_ssh_counter += 1
+                time.sleep(0.1)
+
+            if silent_cmds != True:
+                print("\n")
+
+            self.recordPhase(metrics, "command", started)
+
+        return b"".join(ssh_chunks)
+
+    """
+    Open an exec channel on a connected transport running a single command
+    Exec channels run at the privilege level of the user, commands that need enable are run in a shell
+    Returns - paramiko.Channel
+    """
+    def openExec(self, transport, cmd, timeout=60):
+        ssh_channel = transport.open_session(timeout=timeout)
+        try:
+            ssh_channel.exec_command(cmd)
+        except:
+            ssh_channel.close()
+            raise
+
+        return ssh_channel
+
+    """
+    Run a single command on its own exec channel, the device closes the channel once the command has completed
+    Returns - bytes of the command output
+    """
+    def execCommand(self, transport, cmd, timeout=60, cmd_timeout=60, deadline=None):
+        ssh_channel = self.openExec(transport, cmd, timeout)
+        try:
+            ssh_out = self.readUntilPrompt(ssh_channel, None, cmd_timeout, deadline)
+        finally:
+            ssh_channel.close()
 
         return ssh_out
 
     """
-    Method is used to hold for a given amount of time to allow the SSH buffer to collect outputs
-    Returns - string(ssh_term) >> "session_terminated", "ping_failed" if error in session
+    Run one group of executeMultiplexedCommands on its own channel of the transport
+    cmds - list of commands and steps run in an interactive shell, or a string run on an exec channel
+    Returns - string of the group output
     """
-    def executeCollectDebugSSH(self, user, passwd, device_ip, device_name, cmds, timer=60, silent_cmds=True, timeout=1800):
-        # Declare returned variable
-        ssh_out = ""
+    def runChannelGroup(self, transport, cmds, timeout=60, prompt=DEVICE_PROMPT, cmd_timeout=60, deadline=None,
+                        metrics=None):
+        started = time.time()
+        if isinstance(cmds, str):
+            ssh_out = self.execCommand(transport, cmds, timeout, cmd_timeout, deadline)
+            self.recordPhase(metrics, "command", started)
+            return self.decodeSSHOutput(ssh_out)
+
+        ssh_channel = self.invokeShell(transport, timeout)
+        try:
+            ssh_banner = self.readUntilPrompt(ssh_channel, prompt, cmd_timeout, deadline)
+            self.recordPhase(metrics, "shell_ready", started)
+            ssh_cmds_out = self.runShellCommands(ssh_channel, cmds, prompt=prompt, cmd_timeout=cmd_timeout,
+                                                 deadline=deadline, metrics=metrics)
+        finally:
+            ssh_channel.close()
+
+        return self.decodeSSHOutput([ssh_banner, ssh_cmds_out])
 
+    """
+    Execute groups of commands at the same time on one connection to the device
+    Each group runs on its own channel of a single authenticated transport, so independent checks e.g. verify /md5,
+    dir flash: and show log share one handshake instead of waiting for each other in one shell
+    cmd_groups - list of groups, a list of commands runs in its own interactive shell (prompt read mode) and a
+                 string runs on its own exec channel
+    Returns - list of strings, the output of each group in the order of cmd_groups
+              >> "session_terminated,<device_name>,<errorCategory>" for a group that failed, every group when the
+              connect failed and "ping_failed" for every group if the host is down
+    """
+    def executeMultiplexedCommands(self, user, passwd, device_ip, device_name, cmd_groups, timeout=60,
+                                   prompt=DEVICE_PROMPT, cmd_timeout=60, session_timeout=None, check_host=True,
+                                   metrics=None):
         # Check if host is reachable before attempting to connect
-        if self.checkHostUp(device_ip):
+        if check_host:
+            started = time.time()
+            host_up = self.checkHostUp(device_ip)
+            self.recordPhase(metrics, "ping", started)
+            if not host_up:
+                return ["ping_failed," + device_name] * len(cmd_groups)
+
+        deadline = None
+        if session_timeout is not None:
+            deadline = time.time() + session_timeout
+
+        try:
+            ssh = self.connectTransport(user, passwd, device_ip, timeout, metrics)
+        except Exception as error:
+            return [self.sessionTerminated(device_name, error)] * len(cmd_groups)
+
+        ssh_outs = [""] * len(cmd_groups)
+
+        def runGroup(group_index):
             try:
-                client = paramiko.SSHClient()
-                client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                client.connect(device_ip, username=user, password=passwd, look_for_keys=False, timeout=timeout)
-
-                # client.invoke_shell()
-                ssh_channel = client.invoke_shell()
-                stuck_ssh_counter = 0
-                ssh_wait = True
-
-                # wait for terminal to be in ready state
-                while ssh_wait:
-                    time.sleep(0.1)
-                    if ssh_channel.recv_ready():
-                        ssh_wait = False
-
-                    # Prevent the ssh_wait from getting stuck - Holds for 60 seconds
-                    if stuck_ssh_counter > 600:
-                        ssh_wait = False
-
-                    stuck_ssh_counter += 1
-                    time.sleep(0.1)
-
-                # Execute the required debug commands
-                for cmd_line in range(0, len(cmds)):
-                    ssh_wait = True
-                    stuck_ssh_counter = 0
-
-                    cmd = str(cmds[cmd_line]) + "\n"
-
-                    # Silent Command Run
-                    if silent_cmds != True:
-                        print("### Executing Command ###")
-                        print(cmd)
-
-                    ssh_channel.send(cmd)
-
-                    # Hold until the ssh session is ready
-                    while ssh_wait:
-                        if ssh_channel.recv_ready():
-                            ssh_wait = False
-                            time.sleep(0.1)
-                        # Loading bar for user
-                        if silent_cmds != True:
-                            print(".", end="")
-
-                        stuck_ssh_counter += 1
-                        # Prevent the ssh_wait from getting stuck - Holds for 60 seconds
-                        if stuck_ssh_counter > 600:
-                            ssh_wait = False
-
-                # Hold for given amount of time
-                i = 0
-                while(i < timer):
-                    i += 1
-                    time.sleep(1)
-
-                """
-                Commands are sent after the runtime has expired to remove any debugs post collecting the required debugs
-                """
-                ssh_channel.send("no debug all\n")
-                ssh_channel.send("\n")
-                ssh_channel.send("no debug all\n")
-                ssh_channel.send("\n")
-
-                time.sleep(1)
-
-                ssh_out = ssh_channel.recv(40960)
-            except:
-                ssh_out = "session_terminated," + device_name
-        else:
-            ssh_out = "ping_failed," + device_name
+                ssh_outs[group_index] = self.runChannelGroup(ssh, cmd_groups[group_index], timeout, prompt,
+                                                             cmd_timeout, deadline, metrics)
+            except Exception as error:
+                ssh_outs[group_index] = self.sessionTerminated(device_name, error)
+
+        # The first group runs on this thread, paramiko serves every channel of the transport from its own thread
+        group_threads = [threading.Thread(target=runGroup, args=(group_index,), name="SSHGroup-" + device_name)
+                         for group_index in range(1, len(cmd_groups))]
+        try:
+            for group_thread in group_threads:
+                group_thread.start()
+            if cmd_groups:
+                runGroup(0)
+            for group_thread in group_threads:
+                group_thread.join()
+        finally:
+            ssh.close()
+
+        return ssh_outs
+
+    """
+    Read from the channel into a DebugCapture until duration seconds have passed, the stop pattern is seen or the
+    channel closes. The channel is drained as output arrives so the SSH window never fills and stalls the device
+    until_data - return as soon as some output has been read, used to wait for the shell or a command
+    Returns - True if the capture stopped on its stop pattern
+    """
+    def drainChannel(self, ssh_channel, capture, duration, until_data=False):
+        end_time = time.time() + duration
+
+        while not capture.stopped:
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                break
+
+            data = self.recvWait(ssh_channel, min(remaining, 1.0), 32768)
+            if data is None:
+                continue
+            if not data:
+                break
+
+            capture.write(data)
+            if until_data:
+                break
+
+        return capture.stopped
+
+    """
+    Method is used to collect debug output for a given amount of time
+    capture - DebugCapture the output is streamed into, e.g. with a capture file, size caps or a stop pattern to
+              end the capture early. When not set the last 1MB of output is returned
+    Returns - string(ssh_term) >> "session_terminated,<device_name>,<errorCategory>", "ping_failed" if error in session
+    """
+    def executeCollectDebugSSH(self, user, passwd, device_ip, device_name, cmds, timer=60, silent_cmds=True,
+                               timeout=1800, capture=None):
+        if capture is None:
+            capture = DebugCapture()
+
+        # Check if host is reachable before attempting to connect
+        if not self.checkHostUp(device_ip):
+            return "ping_failed," + device_name
+
+        ssh = None
+        try:
+            ssh = self.connectTransport(user, passwd, device_ip, timeout)
+            ssh_channel = self.invokeShell(ssh, timeout)
+
+            # wait for terminal to be in ready state - Holds for 60 seconds
+            self.drainChannel(ssh_channel, capture, 60, until_data=True)
+
+            # Execute the required debug commands
+            for cmd in cmds:
+                cmd = str(cmd) + "\n"
+
+                # Silent Command Run
+                if silent_cmds != True:
+                    print("### Executing Command ###")
+                    print(cmd)
+
+                ssh_channel.send(cmd)
+                self.drainChannel(ssh_channel, capture, 60, until_data=True)
+
+            # Collect for the given amount of time or until the stop pattern is seen
+            if self.drainChannel(ssh_channel, capture, timer) and silent_cmds != True:
+                print("Capture stopped on " + capture.stop_match)
+
+            """
+            Commands are sent after the runtime has expired to remove any debugs post collecting the required debugs
+            """
+            ssh_channel.send("no debug all\n")
+            ssh_channel.send("\n")
+            ssh_channel.send("no debug all\n")
+            ssh_channel.send("\n")
+
+            capture.clearStop()
+            self.drainChannel(ssh_channel, capture, 1)
+
+            ssh.close()
+            ssh_out = self.decodeSSHOutput(capture.getvalue())
+        except Exception as error:
+            ssh_out = self.sessionTerminated(device_name, error)
+            if ssh is not None:
+                ssh.close()
+        finally:
+            capture.close()
 
         return ssh_out
 
     # Import CSV and output as an 3D Array
     # Returns - in_csv[]
     def getCSV(self, csv_nme):
-        in_csv = []
-        reader = csv.reader(open(csv_nme, 'r'), delimiter=',')
-
-        # Read CSV content into 3D Array
-        for row in reader:
-            in_csv.append(row)
-
-        return in_csv
+        with open(csv_nme, 'r', newline='') as csv_file:
+            # Read CSV content into 3D Array
+            return list(csv.reader(csv_file, delimiter=','))
 
     # Send string to text file and create an output dir
+    # Returns - path of the text file relative to the program home directory
     def printTextFile(self, f_nme, input, name, exec_time="", write_method="write"):
-        cwd = os.getcwd()
-
         folder = str(exec_time + name + "log")
 
-        # Determine if dir /output exists and change to this directory
-        if not os.path.isdir(folder):
-            os.system("mkdir " + folder)
-
-        os.chdir(os.path.join(str(cwd), folder))
+        # Create the output dir without changing the working directory, safe to call from threads
+        os.makedirs(folder, exist_ok=True)
 
-        f_nme = f_nme + ".txt"
+        f_nme = os.path.join(folder, f_nme + ".txt")
 
         if "write" == write_method:
             f_write = "w"
         else:
             f_write = "a"
 
-        results = open(f_nme, f_write)
-        results.write(input)
+        with open(f_nme, f_write) as results:
+            results.write(input)
 
-        # Set CWD to Program Home Directory
-        os.chdir(str(cwd))
+        return f_nme
@@ -0,0 +1,195 @@
+"""
+# Title: SSH Session Pool Class
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.5
+# Purpose: Keeps authenticated, enabled shells open between the diagnose / fix / verify phases so each AP
+only pays for the SSH handshake once
+# Notes:
+0.1 - Created SSH_SessionPool keyed by device and user, idle sessions evicted by TTL and LRU
+0.2 - Terminal output is collected as bytes and decoded once with SSH_Paramiko.decodeSSHOutput
+0.3 - session_terminated output names the error category from SSH_Paramiko.errorCategory
+0.4 - Added profile and known_hosts, passed to SSH_Paramiko
+0.5 - Output left unread on a pooled shell is drained before it is reused
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+from SSH_Paramiko import SSH_Paramiko
+import collections
+import threading
+import time
+
+
+class SSH_SessionPool(object):
+    """
+    enable_cmds - commands run once when a shell is opened e.g. ["enable", passwd]
+    max_sessions - idle shells kept open, the least recently used is closed beyond this
+    idle_ttl - seconds an idle shell is kept before it is closed
+    prompt - read mode used for the enable commands and as the default for executeChannelCommands
+    profile, known_hosts - SSHProfile and KnownHostsCache the shells are connected with, see SSH_Paramiko
+    """
+    def __init__(self, user, passwd, enable_cmds=None, max_sessions=50, idle_ttl=300, timeout=60,
+                 prompt=SSH_Paramiko.DEVICE_PROMPT, cmd_timeout=60, profile=None, known_hosts=None):
+        self.user = user
+        self.passwd = passwd
+        self.enable_cmds = enable_cmds or []
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.timeout = timeout
+        self.prompt = prompt
+        self.cmd_timeout = cmd_timeout
+
+        self.ssh_session = SSH_Paramiko(profile=profile, known_hosts=known_hosts)
+        # (device_ip, user) >> (ssh_client, ssh_channel, last_used), oldest first
+        self.idle_sessions = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    """
+    Check the shell is still usable, a reload or idle timeout on the AP closes the channel
+    """
+    def isAlive(self, ssh_channel):
+        if ssh_channel.closed or ssh_channel.eof_received:
+            return False
+
+        transport = ssh_channel.get_transport()
+
+        return transport is not None and transport.is_active()
+
+    """
+    Close idle shells past idle_ttl and the least recently used shells beyond max_sessions
+    Must be called with the lock held
+    Returns - list of ssh_client to close outside the lock
+    """
+    def evictIdle(self):
+        expired = []
+        now = time.time()
+
+        for key in list(self.idle_sessions.keys()):
+            ssh, ssh_channel, last_used = self.idle_sessions[key]
+            if now - last_used > self.idle_ttl:
+                del self.idle_sessions[key]
+                expired.append(ssh)
+
+        while len(self.idle_sessions) > self.max_sessions:
+            key, session = self.idle_sessions.popitem(last=False)
+            expired.append(session[0])
+
+        return expired
+
+    """
+    Take a shell for the device out of the pool, opening and enabling a new one if none is held
+    Returns - (ssh_client, ssh_channel, bytes of terminal output from opening the shell)
+    """
+    def checkout(self, device_ip):
+        key = (device_ip, self.user)
+
+        with self.lock:
+            expired = self.evictIdle()
+            session = self.idle_sessions.pop(key, None)
+
+        for ssh in expired:
+            ssh.close()
+
+        if session is not None:
+            ssh, ssh_channel, last_used = session
+            if self.isAlive(ssh_channel):
+                self.drain(ssh_channel)
+                return ssh, ssh_channel, b""
+
+            ssh.close()
+
+        ssh, ssh_channel, ssh_out = self.ssh_session.openShell(self.user, self.passwd, device_ip, self.timeout,
+                                                               self.prompt, self.cmd_timeout)
+        try:
+            ssh_out = ssh_out + self.ssh_session.runShellCommands(ssh_channel, self.enable_cmds, prompt=self.prompt,
+                                                                  cmd_timeout=self.cmd_timeout)
+        except:
+            ssh.close()
+            raise
+
+        return ssh, ssh_channel, ssh_out
+
+    """
+    Discard output the last caller left unread e.g. a prompt for each extra line sent, otherwise the next command
+    stops at a stale prompt and is given the reply to the command before it
+    """
+    def drain(self, ssh_channel):
+        while ssh_channel.recv_ready():
+            ssh_channel.recv(20480)
+
+    """
+    Return a shell to the pool once the caller has finished with it
+    """
+    def checkin(self, device_ip, ssh, ssh_channel):
+        if not self.isAlive(ssh_channel):
+            ssh.close()
+            return
+
+        key = (device_ip, self.user)
+
+        with self.lock:
+            previous = self.idle_sessions.pop(key, None)
+            self.idle_sessions[key] = (ssh, ssh_channel, time.time())
+            expired = self.evictIdle()
+
+        if previous is not None:
+            expired.append(previous[0])
+
+        for ssh in expired:
+            ssh.close()
+
+    """
+    Close the pooled shell for a device, use after a reload so the next call reconnects
+    """
+    def invalidate(self, device_ip):
+        with self.lock:
+            session = self.idle_sessions.pop((device_ip, self.user), None)
+
+        if session is not None:
+            session[0].close()
+
+    """
+    Close every pooled shell
+    """
+    def closeAll(self):
+        with self.lock:
+            sessions = list(self.idle_sessions.values())
+            self.idle_sessions.clear()
+
+        for session in sessions:
+            session[0].close()
+
+    """
+    Execute commands on a pooled shell, the shell is already enabled so cmds should not include enable
+    A pooled shell that has dropped since it was last used is replaced by a new one
+    Returns - string(ssh_term) >> "session_terminated,<device_name>,<errorCategory>", "ping_failed" if error in session
+    """
+    def executeChannelCommands(self, device_ip, device_name, cmds, hold_time=0.1, silent_cmds=True, prompt="default",
+                               cmd_timeout=None, session_timeout=None, check_host=False):
+        if prompt == "default":
+            prompt = self.prompt
+        if cmd_timeout is None:
+            cmd_timeout = self.cmd_timeout
+
+        # Check if host is reachable before attempting to connect
+        if check_host and not self.ssh_session.checkHostUp(device_ip):
+            return "ping_failed," + device_name
+
+        deadline = None
+        if session_timeout is not None:
+            deadline = time.time() + session_timeout
+
+        ssh = None
+        try:
+            ssh, ssh_channel, ssh_banner = self.checkout(device_ip)
+            ssh_cmds_out = self.ssh_session.runShellCommands(ssh_channel, cmds, hold_time, silent_cmds, prompt,
+                                                             cmd_timeout, deadline)
+            self.checkin(device_ip, ssh, ssh_channel)
+            ssh_out = self.ssh_session.decodeSSHOutput([ssh_banner, ssh_cmds_out])
+        except Exception as error:
+            ssh_out = self.ssh_session.sessionTerminated(device_name, error)
+            if ssh is not None:
+                ssh.close()
+
+        return ssh_out
@@ -0,0 +1,203 @@
+"""
+# Title: Adaptive Limiter
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Adjust how many AP sessions are in flight from the SSH connect latency and error rate
+# Notes:
+0.1 - Created AdaptiveLimiter - AIMD, the limit grows while connects stay healthy and is cut when they degrade
+    - Slow start, the limit doubles after each healthy window until it is first cut
+    - Optional per site or subnet limits so one controller or AAA server is not overloaded by its APs
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import ipaddress
+import math
+import threading
+
+
+class LimitState(object):
+    def __init__(self, limit, min_limit, max_limit):
+        self.limit = float(limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.latencies = []
+        self.errors = 0
+        self.baseline = None
+
+        # The limit doubles after each healthy window until the first time it is cut
+        self.slow_start = True
+
+    def hasSlot(self):
+        return self.in_flight < int(self.limit)
+
+
+class AdaptiveLimiter(object):
+    """
+    initial - sessions allowed in flight at the start
+    min_limit, max_limit - bounds of the limit
+    key_func - maps a device IP to its site or subnet key, None for no per key limits
+    key_initial, key_max - start and max limit for each key
+    increase - sessions added after a healthy window in which the limit was reached
+    backoff - the limit is multiplied by this after a degraded window
+    error_threshold - share of failed connects in a window that counts as degraded
+    latency_tolerance - p90 connect latency over this multiple of the baseline counts as degraded
+    latency_margin - seconds the p90 must also be over the baseline, so jitter on a fast network is not degraded
+    min_window - fewest connects a window is judged on
+    """
+    def __init__(self, initial=50, min_limit=5, max_limit=500, key_func=None, key_initial=10, key_max=50,
+                 increase=5, backoff=0.5, error_threshold=0.1, latency_tolerance=2.0, latency_margin=0.5,
+                 min_window=10):
+        self.total = LimitState(initial, min_limit, max_limit)
+        self.key_func = key_func
+        self.key_initial = key_initial
+        self.key_min = min(min_limit, key_initial)
+        self.key_max = key_max
+        self.keys = {}
+        self.increase = increase
+        self.backoff = backoff
+        self.error_threshold = error_threshold
+        self.latency_tolerance = latency_tolerance
+        self.latency_margin = latency_margin
+        self.min_window = min_window
+        self.lock = threading.Lock()
+
+    """
+    Limiter that holds concurrency sessions in flight and never adjusts, the same as a semaphore
+    """
+    @classmethod
+    def fixed(cls, concurrency):
+        return cls(initial=concurrency, min_limit=concurrency, max_limit=concurrency)
+
+    """
+    Key devices by the subnet they are in
+    Returns - function device_ip >> "10.1.2.0/24"
+    """
+    @staticmethod
+    def subnetKey(prefix=24):
+        def key(device_ip):
+            try:
+                return str(ipaddress.ip_network(device_ip + "/" + str(prefix), strict=False))
+            except ValueError:
+                return None
+
+        return key
+
+    def keyOf(self, device_ip):
+        if self.key_func is None or device_ip is None:
+            return None
+
+        return self.key_func(device_ip)
+
+    def keyState(self, key):
+        state = self.keys.get(key)
+        if state is None:
+            state = LimitState(self.key_initial, self.key_min, self.key_max)
+            self.keys[key] = state
+
+        return state
+
+    """
+    Check there is room for another session overall and for the device's key
+    """
+    def hasSlot(self, device_ip=None):
+        key = self.keyOf(device_ip)
+
+        with self.lock:
+            if not self.total.hasSlot():
+                return False
+
+            return key is None or self.keyState(key).hasSlot()
+
+    def acquire(self, device_ip=None):
+        key = self.keyOf(device_ip)
+
+        with self.lock:
+            states = [self.total] if key is None else [self.total, self.keyState(key)]
+            for state in states:
+                state.in_flight += 1
+                state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+
+    def release(self, device_ip=None):
+        key = self.keyOf(device_ip)
+
+        with self.lock:
+            self.total.in_flight -= 1
+            if key is not None:
+                self.keyState(key).in_flight -= 1
+
+    """
+    Record a connect, latency is the seconds for the TCP connect, handshake and auth
+    failed - the connect failed in a way that points at load e.g. auth or handshake timeouts
+    """
+    def observe(self, device_ip, latency, failed=False):
+        key = self.keyOf(device_ip)
+
+        with self.lock:
+            self.sample(self.total, latency, failed, "Concurrency")
+            if key is not None:
+                self.sample(self.keyState(key), latency, failed, "Concurrency for " + str(key))
+
+    def sample(self, state, latency, failed, label):
+        if failed:
+            state.errors += 1
+        else:
+            state.latencies.append(latency)
+
+        samples = state.errors + len(state.latencies)
+        if samples < max(self.min_window, int(state.limit)):
+            return
+
+        self.adjust(state, samples, label)
+
+    """
+    Judge a full window, cut the limit if it degraded or grow it if it was healthy and the limit was reached
+    """
+    def adjust(self, state, samples, label):
+        error_rate = float(state.errors) / samples
+        p50 = p90 = None
+        if state.latencies:
+            ordered = sorted(state.latencies)
+            p50 = ordered[max(int(math.ceil(0.5 * len(ordered))) - 1, 0)]
+            p90 = ordered[max(int(math.ceil(0.9 * len(ordered))) - 1, 0)]
+
+        slow = (p90 is not None and state.baseline is not None and p90 > state.baseline * self.latency_tolerance and
+                p90 > state.baseline + self.latency_margin)
+
+        if error_rate > self.error_threshold or slow:
+            limit = max(float(state.min_limit), state.limit * self.backoff)
+            if int(limit) < int(state.limit):
+                print(label + " limit " + str(int(state.limit)) + " >> " + str(int(limit)) + " - errors " +
+                      "%.0f" % (error_rate * 100) + "%" + (" p90 connect " + "%.2f" % p90 + "s" if p90 else ""))
+            state.limit = limit
+            state.slow_start = False
+        elif state.peak_in_flight >= int(state.limit):
+            if state.slow_start:
+                state.limit = min(float(state.max_limit), state.limit * 2)
+            else:
+                state.limit = min(float(state.max_limit), state.limit + self.increase)
+
+        # The baseline follows the best p50 seen and drifts up slowly so a lasting change is accepted
+        # Once at the min limit a slower network is taken as the new baseline rather than holding the limit down
+        if p50 is not None and (not slow or state.limit <= state.min_limit):
+            if state.baseline is None or p50 < state.baseline:
+                state.baseline = p50
+            else:
+                state.baseline += 0.1 * (p50 - state.baseline)
+
+        state.latencies = []
+        state.errors = 0
+        state.peak_in_flight = state.in_flight
+
+    """
+    Returns - dict of the current limits >> {"total": int, key: int}
+    """
+    def limits(self):
+        with self.lock:
+            limits = dict((key, int(state.limit)) for key, state in self.keys.items())
+            limits["total"] = int(self.total.limit)
+
+        return limits
@@ -0,0 +1,351 @@
+"""
+# Title: AP Benchmark
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.4
+# Purpose: Measure the scan throughput of each execution engine against simulated APs from fake_ap_server.py
+# Notes:
+0.1 - Created the benchmark - devices/sec, memory per in flight session and session latency percentiles
+    - Engines >> async (SSH_Async), adaptive (SSH_Async with AdaptiveLimiter), threads (run_SSHsession on a thread pool), processes (the original process pool)
+    - The fake APs are served from a separate process so they do not share the CPU or memory being measured
+0.2 - Added --handshakes - Handshakes/sec and CPU per handshake of each SSHProfile
+0.3 - SSH profiles the installed paramiko cannot offer are skipped
+0.4 - A session that raises is counted as session_terminated, as in the scan
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+from SSH_Paramiko import SSH_Paramiko
+from SSH_Async import SSH_Async
+from adaptive_limiter import AdaptiveLimiter
+from ap_chk_session import run_SSHsession, run_SSHsessionAsync, sessionErrorResult
+from fake_ap_server import FakeAPServer, FakeAPProfile, fakeAPAddresses, raiseFileLimit
+from run_metrics import RunMetrics
+from ssh_profile import PROFILES
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import paramiko
+import tempfile
+import threading
+import time
+
+ENGINES = ("async", "adaptive", "threads", "processes")
+
+
+"""
+Serve the fake APs until stop_event is set, runs in its own process
+"""
+def serveFakeAPs(count, base_ip, port, profile_args, user, passwd, ready_event, stop_event):
+    raiseFileLimit()
+    fake_server = FakeAPServer(count, base_ip, port, FakeAPProfile(**profile_args), user, passwd)
+    fake_server.start()
+    ready_event.set()
+
+    stop_event.wait()
+    fake_server.stop()
+
+
+"""
+Resident memory of the processes in bytes, from /proc on Linux
+Returns - int bytes, None when /proc is not available
+"""
+def residentBytes(pids):
+    page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+    total = 0
+
+    for pid in pids:
+        try:
+            with open("/proc/" + str(pid) + "/statm", "r") as statm:
+                total += int(statm.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            if pid == os.getpid():
+                return None
+
+    return total
+
+
+class MemorySampler(object):
+    """
+    Sample the resident memory of this process and its children every interval seconds to find the peak
+    exclude - child pids not counted e.g. the fake AP server
+    """
+    def __init__(self, interval=0.2, exclude=()):
+        self.interval = interval
+        self.exclude = set(exclude)
+        self.peak = 0
+        self.stopped = threading.Event()
+        self.baseline = self.sample()
+
+    def sample(self):
+        pids = [os.getpid()] + [child.pid for child in multiprocessing.active_children()
+                                if child.pid not in self.exclude]
+        return residentBytes(pids)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            resident = self.sample()
+            if resident is not None:
+                self.peak = max(self.peak, resident)
+
+    def start(self):
+        self.sampler = threading.Thread(target=self.run, name="MemorySampler")
+        self.sampler.daemon = True
+        self.sampler.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.sampler.join()
+
+
+"""
+Run every device through one engine
+Returns - list of APResult
+"""
+def runEngine(engine, parameters, concurrency):
+    ap_results = []
+
+    if engine in ("async", "adaptive"):
+        limiter = None
+        if "adaptive" == engine:
+            limiter = AdaptiveLimiter(initial=min(50, concurrency), max_limit=concurrency)
+
+        ssh_async = SSH_Async(concurrency=concurrency, limiter=limiter)
+        try:
+            ssh_async.streamSessions(run_SSHsessionAsync, parameters, ap_results.append,
+                                     ip_func=lambda params: params[2],
+                                     error_func=lambda params, error: sessionErrorResult(ssh_async.ssh_session,
+                                                                                         params[2], params[3], error))
+        finally:
+            ssh_async.close()
+        if limiter is not None:
+            print("Adaptive limit at the end of the run " + str(limiter.limits()["total"]))
+    elif "threads" == engine:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            ap_results = list(executor.map(lambda params: run_SSHsession(*params), parameters))
+    elif "processes" == engine:
+        pool = multiprocessing.Pool(concurrency)
+        try:
+            ap_results = pool.starmap(run_SSHsession, parameters)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        raise ValueError("unknown engine " + engine)
+
+    return ap_results
+
+
+"""
+Benchmark one engine against the served APs
+Returns - dict of the engine results
+"""
+def benchmarkEngine(engine, hosts, user, passwd, concurrency, hold_time, output_root, exclude=()):
+    hosts_up = SSH_Paramiko().checkHostsUp([device_ip for device_ip, device_name in hosts])
+    exec_time = os.path.join(output_root, engine + "_")
+
+    # Output is written with printTextFile so every engine does the same file work
+    parameters = [(user, passwd, device_ip, device_name, "bench", exec_time, hold_time,
+                   hosts_up.get(device_ip, False), None, None) for device_ip, device_name in hosts]
+
+    sampler = MemorySampler(exclude=exclude)
+    sampler.start()
+    started = time.time()
+    try:
+        ap_results = runEngine(engine, parameters, concurrency)
+    finally:
+        elapsed = time.time() - started
+        sampler.stop()
+
+    metrics = RunMetrics()
+    statuses = {}
+    for ap_result in ap_results:
+        if ap_result.duration is not None:
+            metrics.record("session", ap_result.duration)
+        statuses[ap_result.status] = statuses.get(ap_result.status, 0) + 1
+
+    in_flight = min(concurrency, len(hosts)) or 1
+    memory_per_session = None
+    if sampler.baseline is not None and sampler.peak:
+        memory_per_session = max(sampler.peak - sampler.baseline, 0) / in_flight
+
+    return {"engine": engine,
+            "devices": len(hosts),
+            "concurrency": concurrency,
+            "elapsed": elapsed,
+            "devices_per_sec": len(ap_results) / elapsed if elapsed > 0 else 0.0,
+            "peak_resident_bytes": sampler.peak or None,
+            "memory_per_session_bytes": memory_per_session,
+            "latency": metrics.summary().get("session", {}),
+            "results": statuses}
+
+
+"""
+Names of the algorithms a connected transport agreed on, the key exchange is the first of the profile the AP offers
+Returns - string >> cipher mac host_key_type
+"""
+def negotiatedAlgorithms(transport):
+    return " ".join([str(transport.local_cipher), str(transport.local_mac), str(transport.host_key_type)])
+
+
+"""
+Benchmark the handshake of one SSH profile, each handshake is a TCP connect, key exchange and password auth
+The CPU time is this process only, the fake APs are served from their own process
+Returns - dict of the profile results
+"""
+def benchmarkHandshakes(profile_name, hosts, user, passwd, handshakes, concurrency):
+    ssh_session = SSH_Paramiko(profile=PROFILES[profile_name])
+    metrics = RunMetrics()
+
+    def handshake(handshake_index):
+        device_ip = hosts[handshake_index % len(hosts)][0]
+        try:
+            transport = ssh_session.connectTransport(user, passwd, device_ip, 30, metrics)
+        except Exception as error:
+            return "failed " + ssh_session.errorCategory(error)
+
+        try:
+            return negotiatedAlgorithms(transport)
+        finally:
+            transport.close()
+
+    cpu_started = time.process_time()
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        algorithms = collections.Counter(executor.map(handshake, range(handshakes)))
+    elapsed = time.time() - started
+    cpu_seconds = time.process_time() - cpu_started
+
+    completed = sum(count for negotiated, count in algorithms.items() if not negotiated.startswith("failed"))
+
+    return {"profile": profile_name,
+            "handshakes": handshakes,
+            "completed": completed,
+            "concurrency": concurrency,
+            "elapsed": elapsed,
+            "handshakes_per_sec": completed / elapsed if elapsed > 0 else 0.0,
+            "cpu_ms_per_handshake": 1000.0 * cpu_seconds / completed if completed else None,
+            "latency": metrics.summary().get("ssh_handshake", {}),
+            "kex": list(PROFILES[profile_name].preferences.get("kex", paramiko.Transport._preferred_kex)),
+            "algorithms": dict(algorithms)}
+
+
+def formatHandshakeResult(result):
+    lines = [result["profile"] + " - " + str(result["completed"]) + "/" + str(result["handshakes"]) +
+             " handshakes at concurrency " + str(result["concurrency"]),
+             "  " + "%.1f" % result["handshakes_per_sec"] + " handshakes/sec in " + "%.1f" % result["elapsed"] + "s"]
+
+    if result["cpu_ms_per_handshake"] is not None:
+        lines.append("  " + "%.2f" % result["cpu_ms_per_handshake"] + " ms CPU per handshake")
+
+    latency = result["latency"]
+    if latency:
+        lines.append("  key exchange p50 " + "%.3f" % latency["p50"] + "s p90 " + "%.3f" % latency["p90"] +
+                     "s p99 " + "%.3f" % latency["p99"] + "s")
+
+    lines.append("  key exchange offered " + ", ".join(result["kex"]))
+    for negotiated, count in sorted(result["algorithms"].items()):
+        lines.append("  " + str(count) + " x " + negotiated)
+
+    return "\n".join(lines)
+
+
+def formatResult(result):
+    latency = result["latency"]
+    lines = [result["engine"] + " - " + str(result["devices"]) + " devices at concurrency " +
+             str(result["concurrency"]),
+             "  " + "%.1f" % result["devices_per_sec"] + " devices/sec in " + "%.1f" % result["elapsed"] + "s"]
+
+    if result["memory_per_session_bytes"] is not None:
+        lines.append("  " + "%.1f" % (result["memory_per_session_bytes"] / 1024.0) + " KiB per in flight session")
+
+    if latency:
+        lines.append("  session p50 " + "%.2f" % latency["p50"] + "s p90 " + "%.2f" % latency["p90"] + "s p99 " +
+                     "%.2f" % latency["p99"] + "s max " + "%.2f" % latency["max"] + "s")
+
+    lines.append("  results " + str(result["results"]))
+
+    return "\n".join(lines)
+
+
+# ++++++++++++++++++++++ Main Method ++++++++++++++++++++++
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scan engines against simulated APs")
+    parser.add_argument("--engine", action="append", choices=ENGINES, default=[],
+                        help="engine to run, can be repeated (default all)")
+    parser.add_argument("--count", type=int, default=1000, help="number of simulated APs")
+    parser.add_argument("--concurrency", type=int, default=500, help="sessions in flight for async and threads")
+    parser.add_argument("--processes", type=int, default=50, help="pool size for the processes engine")
+    parser.add_argument("--hold-time", type=float, default=5)
+    parser.add_argument("--base-ip", default="127.0.1.1", help="address of the first simulated AP")
+    parser.add_argument("--port", type=int, default=2222, help="SSH port of the simulated APs")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds before each command is answered")
+    parser.add_argument("--md5-time", type=float, default=2.0, help="seconds verify /md5 takes")
+    parser.add_argument("--corrupt-image-rate", type=float, default=0.01)
+    parser.add_argument("--corrupt-flash-rate", type=float, default=0.01)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--handshakes", type=int, default=0,
+                        help="benchmark this many handshakes for each SSH profile instead of the scan engines")
+    parser.add_argument("--ssh-profile", action="append", choices=sorted(PROFILES), default=[],
+                        help="profile for --handshakes, can be repeated (default all)")
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    args = parser.parse_args()
+
+    raiseFileLimit()
+
+    # Sessions in this process and the forked pool workers connect to the simulated APs
+    SSH_Paramiko.SSH_PORT = args.port
+
+    bench_user = "admin"
+    bench_passwd = "admin"
+    fake_profile_args = {"latency": args.latency,
+                         "md5_time": args.md5_time,
+                         "corrupt_image_rate": args.corrupt_image_rate,
+                         "corrupt_flash_rate": args.corrupt_flash_rate,
+                         "hang_rate": args.hang_rate,
+                         "disconnect_rate": args.disconnect_rate}
+
+    fake_ready = multiprocessing.Event()
+    fake_stop = multiprocessing.Event()
+    fake_process = multiprocessing.Process(target=serveFakeAPs,
+                                           args=(args.count, args.base_ip, args.port, fake_profile_args, bench_user,
+                                                 bench_passwd, fake_ready, fake_stop))
+    fake_process.start()
+    fake_ready.wait()
+
+    bench_hosts = fakeAPAddresses(args.count, args.base_ip)
+
+    bench_results = []
+    try:
+        if args.handshakes > 0:
+            # The handshake alone, the cost paid by every session before any command is run
+            for bench_profile in args.ssh_profile or sorted(PROFILES):
+                if PROFILES[bench_profile].unsupported:
+                    print("Skipped " + bench_profile + " - " + ", ".join(PROFILES[bench_profile].unsupported) +
+                          " not supported by paramiko " + paramiko.__version__)
+                    continue
+
+                bench_result = benchmarkHandshakes(bench_profile, bench_hosts, bench_user, bench_passwd,
+                                                   args.handshakes, args.concurrency)
+                bench_results.append(bench_result)
+                print(formatHandshakeResult(bench_result))
+        else:
+            with tempfile.TemporaryDirectory() as output_root:
+                for bench_engine in args.engine or ENGINES:
+                    bench_concurrency = args.processes if "processes" == bench_engine else args.concurrency
+                    bench_result = benchmarkEngine(bench_engine, bench_hosts, bench_user, bench_passwd,
+                                                   bench_concurrency, args.hold_time, output_root,
+                                                   exclude=[fake_process.pid])
+                    bench_results.append(bench_result)
+                    print(formatResult(bench_result))
+    finally:
+        fake_stop.set()
+        fake_process.join()
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(bench_results, output_file, indent=2)
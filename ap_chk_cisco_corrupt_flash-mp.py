@@ -1,10 +1,10 @@
 """
 # Author: Dean Clark
 # Date Created: 25/08/2018
-# Date Modified: 06/09/2018
-# Version: 0.4
+# Date Modified: 17/10/2026
+# Version: 0.35
 # Purpose: To search through a list of devices and look for the Cisco AP corrupt flash bug, this script will also run known fixes
-Known fixes can reload APs. These will be reloaded one at a time
+Known fixes can reload APs. Reloads are limited overall, per site and per controller
 # - Compatible with Python 3.6
 Notes:
 0.1 - Requires update to output from executeCommands Method (To output string of Terminal Output)
@@ -12,94 +12,190 @@ Notes:
     - Code Commented
 0.3 - Method to process information from executeCommands for desired validation
 0.4 - Added test capwap image - to fix corrupt AireOS images
+0.5 - Replaced the multiprocessing pool with the SSH_Async engine - concurrency sets the sessions in flight
+0.6 - Verify scan reads until the device prompt instead of holding for hold_time
+0.7 - Added a reachability sweep of the device list before the scan, unreachable APs are not connected to
+0.8 - Fix phase reuses enabled shells from SSH_SessionPool between the diagnose, reload and image steps
+    - Fixed image verify using the last AP's details for every AP
+0.9 - Fix phase runs in parallel through RemediationScheduler - Recovery and image downloads are polled
+    - Optional site and controller columns in the device list
+0.10- Scan results are sorted as each AP completes - fix_during_scan queues corrupt APs for fixing straight away
+0.11- Results are written to a scan journal as they complete - Added --resume to skip APs already classified
+0.12- Added the verify cache - APs verified clean that have not reloaded since are not verified again
+0.13- Session output is classified by APClassifier in a single pass, output is already decoded by SSH_Paramiko
+0.14- Sessions return APResult records which are collected in a ResultStore - Results also written as JSON lines
+0.15- Output is written through LogSink from a background thread - Added --archive-logs for a single tar.gz per run
+0.16- Device list streamed through DeviceInventory - Added name, site, model and subnet filters and --shard i/N
+0.17- Session methods moved to ap_chk_session - Added --coordinator to queue the scan for local and remote workers
+0.18- Session phases timed with RunMetrics and written as JSON and Prometheus text - Progress and ETA replace the sleep
+0.19- Sessions in flight adapt to the connect latency and errors - Added --fixed-concurrency and --limit-by
+0.20- Timed out, reset, unreachable and auth failed sessions are retried with jittered backoff alongside the scan
+    - Added --no-retry, results record the error category and attempts of each failed AP
+0.21- Added --image-manifest - Each AP is verified against the known good image for its model and version
+0.22- Added --triage - Cheap flash checks first, only suspect APs and a --triage-sample share are md5 verified
+0.23- Added --multiplex - The verify and the other probes of an AP run on their own channels of one connection
+0.24- Added --ssh-profile for the handshake algorithms and --known-hosts, host keys are checked and saved once a run
+0.25- Emails sent by Notifier from a background thread - The relay is no longer connected to at startup
+    - Added --smtp-host, --smtp-port and --notify-interval for digests of the corrupt APs found so far
+0.26- Each run's results are stored in the results history - Changes since the last scan are reported as CSV or JSON
+0.27- Added --output-archive - AP output appended to compressed segments indexed by run, device and error string
+0.28- Sessions are given the RetryPolicy and attempt so an AP's output is only written for its final attempt
+0.29- Only journaled APs in this run's device list are carried over on resume
+0.30- Fix commands are no longer padded with blank lines, [confirm] is answered by SSH_Paramiko.answerConfirm
+0.31- Added --stall-timeout - The coordinator fails the APs no worker leases, leases of exited local workers are freed
+0.32- --listen without --authkey is rejected with the other arguments, before anything is queued
+0.33- An --ssh-profile the installed paramiko cannot offer is rejected with the other arguments
+0.34- A session that raises is reported as session_terminated for its AP instead of ending the scan
+0.35- The fix phase report sections are built with formatResults instead of concatenating in loops
 """
 
 # ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
 from SSH_Paramiko import SSH_Paramiko
+from SSH_Async import SSH_Async
+from adaptive_limiter import AdaptiveLimiter
+from retry_policy import RetryPolicy
+from ap_chk_session import run_SSHsessionAsync, retryParameters, sessionErrorResult
+from ap_chk_worker import runLocalWorker
+from scan_queue import ScanQueue, serveQueue, parseAddress
+from SSH_SessionPool import SSH_SessionPool
+from ap_remediation import RemediationScheduler
+from scan_journal import ScanJournal
+from verify_cache import VerifyCache
+from ap_results import APResult, ResultStore, formatResults
+from log_sink import LogSink
+from device_inventory import DeviceInventory
+from image_manifest import ImageManifest
+from ap_triage import FlashTriage
+from ssh_profile import PROFILES, KnownHostsCache
+from run_metrics import RunMetrics, ProgressCounter
+from notifier import Notifier
+from output_archive import OutputArchive
+from results_history import ResultsHistory
 from creds import LocalUser
+import argparse
 import multiprocessing
 import os
 import time
-import smtplib
-
-"""
-Method is used in conjunction with multiprocessing to filter output from the pool into variable types
-Uses md5 hash to verify Cisco AP image
-"""
-def run_SSHsession(user, passwd, device_ip, device_name, output_dir, exec_time, hold_time):
-    image_file_name = "ap3g2-k9w8-mx.ap_smr3_esc.201712191345"
-    image_hash = "d55c0adb2d331c2fcaa5ec466c2c5cbb"
-
-    print("Child Process id: ", os.getpid())
-
-    ssh_session = SSH_Paramiko()
-
-    ap_chk_log_cmds = ["enable",
-                       passwd,
-                       "verify /md5 flash:" + image_file_name + "/" + image_file_name + " " + image_hash,
-                       "\n",
-                       "\n",
-                       "\n",
-                       "\n",
-                       "\n"]
-
-    ssh_out = ssh_session.executeChannelCommands(user, passwd, device_ip, device_name, ap_chk_log_cmds, timeout=120,
-                                                 hold_time=hold_time)
-    ssh_out = ssh_session.cleanSSHOutput(ssh_out)
-
-    # Looking for Corrupt flash based on AireOS 8.3.133.10
-    # 684351209 : AP will not allocate clients into correct VLAN; "no bridge-group 1 unicast-flooding"
-    if "Verified" in ssh_out:
-        ap_detail = "valid_image" + "," + device_name + "," + device_ip
-    elif "Computed signature" in ssh_out:
-        ap_detail = "corrupt_image" + "," + device_name + "," + device_ip
-    else:
-        ap_detail = "corrupt_flash" + "," + device_name + "," + device_ip
-
-    if ("session_terminated" not in ssh_out) and ("ping_failed" not in ssh_out):
-        ssh_session.printTextFile(device_name, ssh_out, output_dir, exec_time)
-    else:
-        if ("session_terminated" in ssh_out):
-            fname_failed = device_name + "_session_terminated"
-            ssh_session.printTextFile(fname_failed, ssh_out, output_dir, exec_time)
-            ap_detail = "session_terminated" + "," + device_name + "," + device_ip
-        else:
-            fname_failed = device_name + "_ping_failed"
-            ssh_session.printTextFile(fname_failed, ssh_out, output_dir, exec_time)
-            ap_detail = "ping_failed" + "," + device_name + "," + device_ip
-
-    result = ap_detail
-
-    print("Completed on Device " + device_name)
-
-    return result
 
 # ++++++++++++++++++++++ Main Method ++++++++++++++++++++++
 if __name__ == "__main__":
     devices = []
-    ap_corrupt_flash = []
-    ap_corrupt_image = []
+    result_store = ResultStore()
     ap_reloaded = []
     ap_fsck_fixed = []
-    ap_offline = []
-    ap_ssh_terminated = []
     ap_fix_image_pass = []
     ap_fix_image_fail = []
     parameters = []
+    ap_locations = {}
 
     device_keyword = ""
     fix_faults = "null"
     hold_time = 5
+    concurrency = 500
+    initial_concurrency = 50
+    site_concurrency = 100
+    probe_timeout = 2
+    probe_concurrency = 512
+    pool_idle_ttl = 600
+    fix_workers = 50
+    max_reloads = 20
+    max_site_reloads = 1
+    max_controller_reloads = 10
+    fix_during_scan = False
+    progress_interval = 10
     device_count = 0
     sender_email = ""
     receiver_email = ""
     smtp_host = ''
+    smtp_port = 25
+    notify_interval = 30
+    device_list = "<Device_List>.csv"
+    journal_path = "ap_corrupt_flash_journal.jsonl"
+    queue_db_path = "ap_corrupt_flash_queue.db"
+    queue_stall_timeout = 10
+    verify_cache_path = "ap_corrupt_flash_verify_cache.json"
+    verify_cache_ttl = 7
+    known_hosts_path = "ap_corrupt_flash_known_hosts"
+    history_path = "ap_corrupt_flash_history.db"
+    triage_sample = 0.05
+
+    parser = argparse.ArgumentParser(description="Check Cisco APs for corrupt flash and images")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip APs already classified in the journal within the resume window")
+    parser.add_argument("--resume-window", type=float, default=24,
+                        help="hours a journaled result is treated as current (default 24)")
+    parser.add_argument("--device-list", default=device_list, help="device list CSV")
+    parser.add_argument("--include", default=device_keyword, help="regex the device name must match")
+    parser.add_argument("--exclude", default=None, help="regex of device names to skip")
+    parser.add_argument("--site", action="append", default=[], help="only scan this site, can be repeated")
+    parser.add_argument("--model", action="append", default=[], help="only scan this model, can be repeated")
+    parser.add_argument("--subnet", action="append", default=[],
+                        help="only scan APs in this subnet e.g. 10.1.0.0/16, can be repeated")
+    parser.add_argument("--shard", default="1/1",
+                        help="scan shard i of N of the device list e.g. 2/4, each scanner host takes one shard")
+    parser.add_argument("--fixed-concurrency", action="store_true",
+                        help="hold concurrency sessions in flight instead of adapting to the connect latency and errors")
+    parser.add_argument("--limit-by", choices=("site", "subnet", "none"), default="site",
+                        help="group APs for the per group session limit (default site)")
+    parser.add_argument("--no-retry", action="store_true",
+                        help="report failed sessions straight away instead of retrying them")
+    parser.add_argument("--coordinator", action="store_true",
+                        help="queue the scan for workers instead of scanning from this process")
+    parser.add_argument("--queue-db", default=queue_db_path, help="coordinator job queue file")
+    parser.add_argument("--workers", type=int, default=0, help="local worker processes started by the coordinator")
+    parser.add_argument("--listen", default=None,
+                        help="host:port the coordinator serves the queue on for ap_chk_worker.py --connect")
+    parser.add_argument("--authkey", default=os.environ.get("AP_CHK_QUEUE_KEY", ""),
+                        help="key workers connect with, defaults to $AP_CHK_QUEUE_KEY")
+    parser.add_argument("--stall-timeout", type=float, default=queue_stall_timeout,
+                        help="minutes the coordinator waits with no worker holding a lease or reporting before the "
+                             "APs left are failed (default 10)")
+    parser.add_argument("--journal", default=journal_path, help="scan journal file")
+    parser.add_argument("--archive-logs", action="store_true",
+                        help="pack the per AP output into a single tar.gz for the run")
+    parser.add_argument("--output-archive", default=None,
+                        help="append the per AP output to this indexed archive shared by every run, instead of one "
+                             "text file per AP")
+    parser.add_argument("--image-manifest", default=None,
+                        help="CSV of model, version, image_file_name, image_hash - pick the image to verify for each "
+                             "AP from show version and dir flash: instead of image_file_name and image_hash")
+    parser.add_argument("--triage", action="store_true",
+                        help="check the image size and flash logs first, only verify suspect APs with md5")
+    parser.add_argument("--triage-sample", type=float, default=triage_sample,
+                        help="share of APs that pass triage which are still verified with md5 (default 0.05)")
+    parser.add_argument("--multiplex", action="store_true",
+                        help="run the md5 verify and the other probes of an AP at the same time over one connection")
+    parser.add_argument("--ssh-profile", choices=sorted(PROFILES), default="default",
+                        help="key exchange, cipher and MAC preferences offered to the APs (default paramiko defaults)")
+    parser.add_argument("--known-hosts", default=known_hosts_path,
+                        help="known_hosts file the AP host keys are checked against, \"\" to not check host keys")
+    parser.add_argument("--smtp-host", default=smtp_host, help="mail relay for the run emails, none sent when not set")
+    parser.add_argument("--smtp-port", type=int, default=smtp_port)
+    parser.add_argument("--notify-interval", type=float, default=notify_interval,
+                        help="minutes between emails of the corrupt APs found so far, 0 for none (default 30)")
+    parser.add_argument("--history", default=history_path,
+                        help="results history file the changes since the last scan are reported from, \"\" for none")
+    parser.add_argument("--history-format", choices=("csv", "json"), default="csv",
+                        help="format of the report of changes since the last scan (default csv)")
+    parser.add_argument("--verify-cache", default=verify_cache_path, help="md5 verify result cache file")
+    parser.add_argument("--verify-cache-ttl", type=float, default=verify_cache_ttl,
+                        help="days a clean md5 verify is trusted for, 0 to verify every AP (default 7)")
+    args = parser.parse_args()
+
+    # Rejected before the queue is opened, queueing a run expires the jobs of earlier runs
+    if args.listen and not args.authkey:
+        parser.error("--listen requires --authkey or $AP_CHK_QUEUE_KEY")
+    try:
+        PROFILES[args.ssh_profile].check()
+    except ValueError as error:
+        parser.error(str(error))
+
+    shard, shards = DeviceInventory.parseShard(args.shard)
+    inventory = DeviceInventory(args.device_list, include=args.include, exclude=args.exclude, sites=args.site,
+                                models=args.model, subnets=args.subnet, shard=shard, shards=shards)
 
     local_user = LocalUser()
     ssh_session = SSH_Paramiko()
-    smtp_server = smtplib.SMTP(smtp_host, 25)
-
-    devices = ssh_session.getCSV('<Device_List>.csv')
 
     user = local_user.user
     passwd = local_user.passwd
@@ -107,147 +203,268 @@ if __name__ == "__main__":
     exec_time = time.strftime("%y%m%d%H%M%S")
     output_dir = "_ap_corrupt_flash_"
 
-    # Fix commands
-    ap_diagnose_cmds = ["enable",
-                        passwd,
-                        "debug capwap console cli",
-                        "\n",
+    # Fix commands - Run on shells from the session pool which are enabled when opened
+    # Each command is read until its prompt, a blank line would leave an extra prompt for the next command to read
+    ap_enable_cmds = ["enable",
+                      passwd]
+
+    ap_diagnose_cmds = ["debug capwap console cli",
                         "fsck flash:",
-                        "\n",
-                        "\n",
-                        "\n",
-                        "\n",
-                        "\n",
-                        "\n",
-                        "no debug all",
-                        "\n",
+                        SSH_Paramiko.answerConfirm,
                         "no debug all",
-                        "\n",
-                        "\n",
-                        "\n"]
-
-    ap_reload_cmds = ["enable",
-                      passwd,
-                      "debug capwap console cli",
-                      "\n",
-                      "\n",
+                        "no debug all"]
+
+    ap_reload_cmds = ["debug capwap console cli",
                       "reload",
-                      "yes",
-                      "\n",
-                      "\n",
-                      "no debug all",
-                      "\n",
+                      SSH_Paramiko.answerConfirm,
                       "no debug all",
-                      "\n",
-                      "\n",
-                      "\n"]
-
-    ap_cp_image_cmds = ["enable",
-                        passwd,
-                        "debug capwap console cli",
-                        "\n",
+                      "no debug all"]
+
+    ap_cp_image_cmds = ["debug capwap console cli",
                         "test capwap image capwap",
-                        "\n",
-                        "\n",
-                        "\n",
-                        "\n",
-                        "no debug all",
-                        "\n",
                         "no debug all",
-                        "\n",
-                        "\n",
-                        "\n",
-                        "\n"]
-
-    ap_sh_log_img_verify_cmds = ["enable",
-                                 passwd,
-                                 "show log | include \"AP image\"\n",
-                                 "\n",
-                                 "\n",
-                                 "\n"]
-
-    # build the parameters list with values to run on the workers in the pool
-    for k in range(0, len(devices)):
-        if device_keyword in str(devices[k][0]):
-            device_name = str(devices[k][0])
-            device_ip = str(devices[k][1])
-
-            parameters.append((user, passwd, device_ip, device_name, output_dir, exec_time, hold_time))
-            device_count = device_count + 1
-
-    # validate with user the number of devices this will execute on
-    print("Running on " + str(device_count) + " devices")
+                        "no debug all"]
+
+    ap_sh_log_img_verify_cmds = ["show log | include \"AP image\""]
+
+    fix_cmds = {"diagnose": ap_diagnose_cmds,
+                "reload": ap_reload_cmds,
+                "cp_image": ap_cp_image_cmds,
+                "img_verify": ap_sh_log_img_verify_cmds}
+
+    # Device output is written by a background writer into the run directory, or appended to the output archive
+    # where it can be searched by run, device and error string
+    output_archive = None
+    if args.output_archive:
+        output_archive = OutputArchive(args.output_archive)
+    log_sink = LogSink(exec_time + output_dir + "log", archive=args.archive_logs, output_archive=output_archive,
+                       run=exec_time)
+
+    # Emails are sent from a background thread which connects to the relay for each email, so a slow relay never
+    # holds up the scan. Emails that cannot be sent are kept in the run directory
+    notifier = None
+    if args.smtp_host:
+        notifier = Notifier(args.smtp_host, sender_email, receiver_email, smtp_port=args.smtp_port,
+                            digest_interval=args.notify_interval * 60,
+                            undelivered_path=os.path.join(log_sink.log_dir, "ap_chk_cisco_bugs_unsent_email.txt"))
+
+    # Each phase of the sessions is timed and written with the run log
+    metrics = RunMetrics()
+
+    # Every result is journaled as it completes, on resume APs classified within the window are not scanned again
+    journal = ScanJournal(args.journal)
+    resumed = {}
+    if args.resume:
+        resumed = journal.loadRecent(args.resume_window * 3600)
+
+    # APs verified clean within the TTL are only asked for their uptime
+    verify_cache = None
+    if args.verify_cache_ttl > 0:
+        verify_cache = VerifyCache(args.verify_cache, ttl=args.verify_cache_ttl * 86400)
+
+    # Host keys are loaded once and new keys written back once at the end of the run
+    ssh_profile = PROFILES[args.ssh_profile]
+    known_hosts = None
+    if args.known_hosts:
+        known_hosts = KnownHostsCache(args.known_hosts)
+
+    # Known good images for each model, loaded once and shared by every session
+    image_manifest = None
+    if args.image_manifest:
+        image_manifest = ImageManifest.fromCSV(args.image_manifest)
+        print("Loaded " + str(len(image_manifest)) + " images from the image manifest")
+
+    # Most APs are healthy, triage saves reading the whole image on each of them
+    triage = None
+    if args.triage:
+        triage = FlashTriage(sample_rate=args.triage_sample)
+
+    # Stream the device list keeping only the devices in this shard that pass the filters
+    for device in inventory:
+        # Site and controller are used to limit reloads during the fix phase
+        ap_locations[device.ip] = (device.site, device.controller)
+
+        if device.ip not in resumed:
+            devices.append(device)
+
+    # The journal also holds APs of other shards and filters, only APs in this run's device list are carried over
+    if args.resume:
+        resumed = dict((device_ip, entry) for device_ip, entry in resumed.items() if device_ip in ap_locations)
+        print("Resuming, " + str(len(resumed)) + " APs already classified")
+
+    if inventory.skipped:
+        print("Skipped " + str(dict(inventory.skipped)))
+
+    # Sweep the device list for reachable hosts before any SSH work starts, workers sweep their own jobs
+    hosts_up = {}
+    if not args.coordinator:
+        started = time.time()
+        hosts_up = ssh_session.checkHostsUp([device.ip for device in devices], timeout=probe_timeout,
+                                            concurrency=probe_concurrency)
+        ssh_session.recordPhase(metrics, "reachability_sweep", started)
+
+    # Failed sessions are queued with a jittered backoff by error category and run again alongside the scan,
+    # only the final attempt of each AP writes its output and is journaled
+    retry_policy = None
+    if not args.no_retry:
+        retry_policy = RetryPolicy(rebuild_func=retryParameters, metrics=metrics)
+
+    # build the parameters list with values to run on each session, the attempt is last for retryParameters
+    for device in devices:
+        parameters.append((user, passwd, device.ip, device.name, output_dir, exec_time, hold_time,
+                           hosts_up.get(device.ip, False), verify_cache, log_sink, metrics, image_manifest,
+                           triage, args.multiplex, retry_policy, 1))
+    device_count = len(parameters)
 
-    time.sleep(20)
+    print("Running on " + str(device_count) + " devices")
+    print("Reachable " + str(list(hosts_up.values()).count(True)) + " of " + str(len(hosts_up)) + " hosts")
+
+    # Completed APs, rate and ETA are printed as results come in
+    progress = ProgressCounter(device_count, interval=progress_interval)
+
+    # Corrupt APs can be queued for fixing as they are found rather than after the whole scan
+    scheduler = None
+    if fix_during_scan:
+        fix_faults = "yes"
+        ssh_pool = SSH_SessionPool(user, passwd, enable_cmds=ap_enable_cmds, max_sessions=fix_workers,
+                                   idle_ttl=pool_idle_ttl, timeout=120, profile=ssh_profile,
+                                   known_hosts=known_hosts)
+        scheduler = RemediationScheduler(ssh_pool, fix_cmds, max_workers=fix_workers, max_reloads=max_reloads,
+                                         max_site_reloads=max_site_reloads,
+                                         max_controller_reloads=max_controller_reloads)
+
+    """
+    Add each AP result to the result store as its session completes
+    """
+    def sortResult(ap_result):
+        ap_result.site, ap_result.controller = ap_locations.get(ap_result.device_ip, ("default", "default"))
+        result_store.add(ap_result)
+
+        if scheduler is not None:
+            if "corrupt_flash" == ap_result.status:
+                scheduler.submitFlash(ap_result)
+            elif "corrupt_image" == ap_result.status:
+                scheduler.submitImage(ap_result)
+
+    """
+    Journal each AP result before sorting it so it survives the scan being interrupted
+    """
+    def journalResult(ap_result):
+        journal.record(ap_result, exec_time)
+        sortResult(ap_result)
+        progress.update()
+
+        if notifier is not None and ap_result.status in ("corrupt_flash", "corrupt_image"):
+            notifier.record(ap_result.status, ap_result.device_name)
+
+    # Results carried over from the interrupted scan
+    for entry in resumed.values():
+        sortResult(APResult.fromDict(entry))
 
     # Start the processing
-    # Set how many simultaneous processes
-    pool = multiprocessing.Pool(processes=50)
-
-    # Run the processes - in the pool using the multiprocessing handler
-    results = pool.starmap(run_SSHsession, parameters)
-
-    print("Pools Completed")
-
-    # Close the Worker Pool
-    pool.close()
-    pool.join()
-
-    for ap_result in results:
-        ap_list = ap_result.split(",")
-        if "ping_failed" == ap_list[0]:
-            ap_offline.append(ap_list)
-        if "corrupt_image" in ap_list[0]:
-            ap_corrupt_image.append(ap_list)
-        if "corrupt_flash" in ap_list[0]:
-            ap_corrupt_flash.append(ap_list)
-        if "session_terminated" in ap_list[0]:
-            ap_ssh_terminated.append(ap_list)
+    if args.coordinator:
+        # Workers lease the APs from the queue and run them close to the APs, results are read back as reported
+        scan_queue = ScanQueue(args.queue_db)
+        print("Queued " + str(scan_queue.put(exec_time, devices)) + " jobs")
+
+        if args.listen:
+            serveQueue(scan_queue, parseAddress(args.listen), args.authkey.encode("utf-8"))
+
+        workers = []
+        for worker_id in range(args.workers):
+            worker = multiprocessing.Process(target=runLocalWorker,
+                                             args=(args.queue_db, user, passwd, "local-" + str(worker_id),
+                                                   concurrency, args.verify_cache, args.verify_cache_ttl * 86400,
+                                                   os.path.join(log_sink.log_dir,
+                                                                "local-" + str(worker_id) + "_metrics"),
+                                                   not args.no_retry, args.image_manifest,
+                                                   args.triage_sample if args.triage else None,
+                                                   args.multiplex, args.ssh_profile, args.known_hosts,
+                                                   args.output_archive))
+            worker.start()
+            workers.append(worker)
+
+        # Jobs leased by a local worker that has exited are handed out again, once no worker is left the APs
+        # still queued are failed after the stall timeout rather than waited on forever
+        def deadWorkers():
+            return ["local-" + str(worker_id) for worker_id, worker in enumerate(workers) if not worker.is_alive()]
+
+        for worker_name, result in scan_queue.iterResults(exec_time, stall_timeout=args.stall_timeout * 60,
+                                                          dead_workers=deadWorkers):
+            journalResult(APResult.fromDict(result))
+
+        for worker in workers:
+            worker.join()
+        scan_queue.close()
+    else:
+        # Sessions are run on a single event loop, the limiter grows the sessions in flight up to concurrency
+        # while connects stay healthy and cuts them when auth or handshakes slow down or fail
+        limiter = None
+        if not args.fixed_concurrency:
+            limit_key = None
+            if "site" == args.limit_by:
+                # APs without a site in the device list only count against the overall limit
+                def limit_key(device_ip):
+                    site = ap_locations.get(device_ip, ("default",))[0]
+                    return None if "default" == site else site
+            elif "subnet" == args.limit_by:
+                limit_key = AdaptiveLimiter.subnetKey(24)
+
+            limiter = AdaptiveLimiter(initial=initial_concurrency, max_limit=concurrency, key_func=limit_key,
+                                      key_max=site_concurrency)
+
+        ssh_async = SSH_Async(concurrency=concurrency, limiter=limiter, profile=ssh_profile,
+                              known_hosts=known_hosts)
+
+        ssh_async.streamSessions(run_SSHsessionAsync, parameters, journalResult, ip_func=lambda params: params[2],
+                                 retry_policy=retry_policy,
+                                 error_func=lambda params, error: sessionErrorResult(ssh_async.ssh_session, params[2],
+                                                                                     params[3], error))
+
+        ssh_async.close()
+
+    print("Sessions Completed")
+
+    journal.close()
+    if verify_cache is not None:
+        verify_cache.save()
+    if known_hosts is not None:
+        known_hosts.save()
+
+    # The run is stored in the results history and compared with each AP's previous result
+    delta_report = None
+    if args.history:
+        history = ResultsHistory(args.history)
+        history.addRun(exec_time, result_store, started=metrics.started)
+        delta_report = history.deltaReport(exec_time)
+        history.close()
 
     # List to user findings and results
     print("\n-----")
-    print("APs with corrupt AireOS image:")
-    log_image_corrupt = ("Executed: " + exec_time + "\nAPs with corrupt images")
-    for ap in ap_corrupt_image:
-        print(ap)
-        log_image_corrupt = log_image_corrupt + "\n" + str(ap)
-    print("Total APs ", len(ap_corrupt_image))
-    log_image_corrupt = log_image_corrupt + "\n" + "Total APs " + str(len(ap_corrupt_image))
-
-    print("APs with Flash Issues")
-    log_flash_corrupt = "APs with Flash Issues"
-    for ap in ap_corrupt_flash:
-        print(ap)
-        log_flash_corrupt = log_flash_corrupt + "\n" + str(ap)
-    print("Total APs ", len(ap_corrupt_flash))
-    log_flash_corrupt = log_flash_corrupt + "\n" + "Total APs " + str(len(ap_corrupt_flash))
-
-    print("APs that are unreachable")
-    log_ap_offline = ("APs that are unreachable")
-    for ap in ap_offline:
-        print(ap)
-        log_ap_offline = log_ap_offline + "\n" + str(ap)
-    print("Total APs ", len(ap_offline))
-    log_ap_offline = log_ap_offline + "\n" + "Total APs " + str(len(ap_offline))
-
-    print("APs SSH Terminated")
-    log_ap_ssh_terminated = ("APs SSH Terminated")
-    for ap in ap_ssh_terminated:
-        print(ap)
-        log_ap_ssh_terminated = log_ap_ssh_terminated + "\n" + str(ap)
-    print("Total APs ", len(ap_ssh_terminated))
-    log_ap_ssh_terminated = log_ap_ssh_terminated + "\n" + "Total APs " + str(len(ap_ssh_terminated))
-
-    log_all = log_image_corrupt + "\n" + log_flash_corrupt + "\n" + log_ap_offline + "\n" + log_ap_ssh_terminated
-    ssh_session.printTextFile("ap_chk_cisco_bugs_log", log_all, output_dir, exec_time, write_method="append")
+    log_sections = ["Executed: " + exec_time,
+                    result_store.formatSection("APs with corrupt images", "corrupt_image"),
+                    result_store.formatSection("APs with Flash Issues", "corrupt_flash"),
+                    result_store.formatSection("APs with no image in the manifest", "unknown_image"),
+                    result_store.formatSection("APs that passed triage without an md5 verify", "triage_clean"),
+                    result_store.formatSection("APs that are unreachable", "ping_failed"),
+                    result_store.formatSection("APs SSH Terminated", "session_terminated")]
+    if delta_report is not None:
+        log_sections.append(ResultsHistory.formatSummary(delta_report))
+    log_all = "\n".join(log_sections)
+    print(log_all)
+
+    log_sink.printTextFile("ap_chk_cisco_bugs_log", log_all, write_method="append")
+    log_sink.flush()
+    metrics.writeJSON(os.path.join(log_sink.log_dir, "ap_chk_cisco_bugs_metrics.json"))
+    metrics.writePrometheus(os.path.join(log_sink.log_dir, "ap_chk_cisco_bugs_metrics.prom"))
+    result_store.writeJSONL(os.path.join(log_sink.log_dir, "ap_chk_cisco_bugs_results.jsonl"))
+    if delta_report is not None:
+        ResultsHistory.writeReport(delta_report, os.path.join(log_sink.log_dir, "ap_chk_cisco_bugs_changes." +
+                                                              args.history_format))
 
     # send a completion email to prompt next actions
-    try:
-        msg = "\nFinished polling devices"
-        smtp_server.sendmail(sender_email, receiver_email, msg)
-        smtp_server.quit()
-    except:
-        print("Email Failed")
+    if notifier is not None:
+        notifier.notify("Finished polling devices", log_all)
 
     # prompt user to run known fixes
     while "yes" != fix_faults:
@@ -258,104 +475,63 @@ if __name__ == "__main__":
             break
 
     if "yes" == fix_faults:
-        for ap in ap_corrupt_flash:
-            print("Checking AP; ", str(ap))
-            device_ip = str(ap[2])
-            device_name = str(ap[1])
-
-            # Check the flash filesystem
-            ssh_out = ssh_session.executeChannelCommands(user, passwd, device_ip, device_name, ap_diagnose_cmds,
-                                                         timeout=120, hold_time=10)
-            ssh_out = ssh_session.cleanSSHOutput(ssh_out)
-
-            if "Error fscking" in ssh_out:
-                print("Reloading; ", str(ap))
-                ssh_out = ssh_session.executeChannelCommands(user, passwd, device_ip, device_name, ap_reload_cmds,
-                                                             timeout=30)
-                ap_reloaded.append(ap)
-                time.sleep(200)
-            else:
-                ap_fsck_fixed.append(ap)
-
-        print("APs that have been reloaded")
-        log_fix_ap = "APs that have been reloaded\n"
-        for ap in ap_reloaded:
-            print(ap)
-            log_fix_ap = log_fix_ap + "\n" + str(ap)
-        print("Total reloaded: ", len(ap_reloaded))
-        log_fix_ap = log_fix_ap + "\n" + "Total reloaded: " + str(len(ap_reloaded))
-
-        print("APs that have been fixed by fsck")
-        log_fsck_ap = "\nAPs that have been fixed by fsck\n"
-        for ap in ap_fsck_fixed:
-            print(ap)
-            log_fsck_ap = log_fsck_ap + "\n" + str(ap)
-        print("Total fixed using fsck: ", len(ap_fsck_fixed))
-        log_fsck_ap = log_fsck_ap + "\n" + "Total fixed using fsck: " + str(len(ap_fsck_fixed))
-
-        log_all = "\n" + log_fix_ap + "\n" + log_fsck_ap
-        ssh_session.printTextFile("ap_chk_cisco_bugs_log", log_all, output_dir, exec_time, write_method="append")
-
-        log_ap_online = "\nReloaded APs Online"
-        log_ap_offline = "Reloaded APs Offline"
-        for ap in ap_reloaded:
-            device_ip = str(ap[2])
-            device_name = str(ap[1])
-
-            if ssh_session.checkHostUp(device_ip):
-                print("Reloaded AP Online: ", str(ap))
-                log_ap_online = log_ap_online + "\n" + str(ap)
-            else:
-                print("Reloaded AP is buggered: ", str(ap))
-                log_ap_offline = log_ap_offline + "\n" + str(ap)
-
-        log_all = "\n" + log_ap_offline + "\n" + log_ap_online
-        ssh_session.printTextFile("ap_chk_cisco_bugs_log", log_all, output_dir, exec_time, write_method="append")
-
-        print("Fix APs that have corrupt images")
-        for ap in ap_corrupt_image:
-            print("Running on AP; ", ap)
-            device_ip = str(ap[2])
-            device_name = str(ap[1])
-
-            ssh_out = ssh_session.executeChannelCommands(user, passwd, device_ip, device_name, ap_cp_image_cmds,
-                                                         timeout=120)
-        print("Waiting a while for downloads to complete ", time.strftime("%y/%m/%d/%H:%M:%S"))
-        time.sleep(2400)
-
-        print("Verifying image downloads")
-        for ap in ap_corrupt_image:
-            ssh_out = ssh_session.executeChannelCommands(user, passwd, device_ip, device_name,
-                                                         ap_sh_log_img_verify_cmds,
-                                                         timeout=120)
-
-            if "PASSED" in ssh_out:
-                ap_fix_image_pass.append(ap)
-            else:
-                ap_fix_image_fail.append(ap)
-
-        print("APs that succeeded to download a replacement images")
-        log_fix_corrupt_img_pass = "\nAPs that succeeded to download a replacement images"
-        for ap in ap_fix_image_pass:
-            print(ap)
-            log_fix_corrupt_img_pass = log_fix_corrupt_img_pass + "\n" + ap
-
-        print("Total APs with fixed images: ", len(ap_fix_image_pass))
-        log_fix_corrupt_img_pass = log_fix_corrupt_img_pass + "\n" + "Total APs with fixed images: " + str(
-            len(ap_fix_image_pass))
-
-        print("APs that failed to download a replacement image")
-        log_fix_corrupt_img_fail = "\nAPs that failed to download a replacement image"
-        for ap in ap_fix_image_fail:
-            print(ap)
-            log_fix_corrupt_img_fail = log_fix_corrupt_img_fail + "\n" + ap
-        print("Total APs with corrupt images: ", len(ap_fix_image_fail))
-        log_fix_corrupt_img_fail = log_fix_corrupt_img_fail + "\n" + "Total APs with corrupt images: " + str(
-            len(ap_fix_image_fail))
-
-        log_all = "\n" + log_fix_corrupt_img_pass + "\n" + log_fix_corrupt_img_fail
-        ssh_session.printTextFile("ap_chk_cisco_bugs_log", log_all, output_dir, exec_time, write_method="append")
+        if scheduler is None:
+            # Shells are held open between the diagnose, reload and image phases for each AP
+            ssh_pool = SSH_SessionPool(user, passwd, enable_cmds=ap_enable_cmds, max_sessions=fix_workers,
+                                       idle_ttl=pool_idle_ttl, timeout=120, profile=ssh_profile,
+                                       known_hosts=known_hosts)
+
+            # Fixes are run in parallel, reloads are limited overall, per site and per controller
+            scheduler = RemediationScheduler(ssh_pool, fix_cmds, max_workers=fix_workers, max_reloads=max_reloads,
+                                             max_site_reloads=max_site_reloads,
+                                             max_controller_reloads=max_controller_reloads)
+
+            for ap in result_store.byStatus("corrupt_flash"):
+                scheduler.submitFlash(ap)
+
+            print("Fix APs that have corrupt images")
+            for ap in result_store.byStatus("corrupt_image"):
+                scheduler.submitImage(ap)
+
+        fix_results = scheduler.join()
+        ap_reloaded = fix_results["reloaded"]
+        ap_fsck_fixed = fix_results["fsck_fixed"]
+        ap_fix_image_pass = fix_results["image_pass"]
+        ap_fix_image_fail = fix_results["image_fail"]
+
+        log_fix_ap = formatResults("APs that have been reloaded", ap_reloaded, "Total reloaded: ")
+        log_fsck_ap = formatResults("\nAPs that have been fixed by fsck", ap_fsck_fixed, "Total fixed using fsck: ")
+        log_all = "\n".join(["", log_fix_ap, log_fsck_ap])
+        print(log_all)
+        log_sink.printTextFile("ap_chk_cisco_bugs_log", log_all, write_method="append")
+
+        log_ap_offline = formatResults("Reloaded APs Offline", fix_results["reloaded_offline"])
+        log_ap_online = formatResults("\nReloaded APs Online", fix_results["reloaded_online"])
+        log_all = "\n".join(["", log_ap_offline, log_ap_online])
+        log_sink.printTextFile("ap_chk_cisco_bugs_log", log_all, write_method="append")
+
+        log_fix_corrupt_img_pass = formatResults("\nAPs that succeeded to download a replacement images",
+                                                 ap_fix_image_pass, "Total APs with fixed images: ")
+        log_fix_corrupt_img_fail = formatResults("\nAPs that failed to download a replacement image",
+                                                 ap_fix_image_fail, "Total APs with corrupt images: ")
+        log_all = "\n".join(["", log_fix_corrupt_img_pass, log_fix_corrupt_img_fail])
+        print(log_all)
+        log_sink.printTextFile("ap_chk_cisco_bugs_log", log_all, write_method="append")
+
+        ssh_pool.closeAll()
+        if known_hosts is not None:
+            known_hosts.save()
+
+        if notifier is not None:
+            notifier.notify("Finished fixing APs", "\n".join([log_fix_ap, log_fsck_ap, log_ap_offline, log_ap_online,
+                                                              log_fix_corrupt_img_pass, log_fix_corrupt_img_fail]))
     else:
         print("You have elected not to fix these, its ok the results are logged")
 
+    log_sink.close()
+    if output_archive is not None:
+        output_archive.close()
+    if notifier is not None:
+        notifier.close()
+
     print("Completed Execution")
@@ -0,0 +1,427 @@
+"""
+# Title: AP Check Session
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.10
+# Purpose: The AP image and flash check run on each AP, shared by the scanner and the queue workers
+# Notes:
+0.1 - Moved the session methods out of ap_chk_cisco_corrupt_flash-mp.py so queue workers can import them
+0.2 - Sessions are timed into an optional RunMetrics
+0.3 - Failed results carry the error category used by RetryPolicy - Added retryParameters
+0.4 - Optional ImageManifest - show version and dir flash: pick the image and hash each AP is verified against
+    - APs with no image in the manifest are reported as unknown_image
+0.5 - Optional FlashTriage before the verify - APs that pass are reported as triage_clean without an md5 verify
+0.6 - Optional multiplexed session - The verify and the other probes run on their own channels of one connection
+0.7 - Session output is written under the device name so an OutputArchive can look it up by device
+0.8 - Verify commands are no longer padded with blank lines when read by prompt, each blank line gave an extra prompt
+      so the uptime reply was never read and the verify cache could not be used
+0.9 - Sessions take the RetryPolicy and attempt, an attempt that will be retried writes no output, prints nothing and
+      is not counted in the metrics
+0.10- Added sessionErrorResult - session_terminated result of a session that raised, for SSH_Async error_func
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+from SSH_Paramiko import SSH_Paramiko
+from ap_classifier import APClassifier
+from ap_results import APResult
+from image_manifest import ImageEntry
+import os
+import time
+
+image_file_name = "ap3g2-k9w8-mx.ap_smr3_esc.201712191345"
+image_hash = "d55c0adb2d331c2fcaa5ec466c2c5cbb"
+# Bytes of the image file, checked by triage when set
+image_size = None
+
+ap_classifier = APClassifier()
+
+# Prompt read mode timeouts - verify /md5 reads the whole image so allow for slow flash
+cmd_timeout = 120
+session_timeout = 300
+
+"""
+Commands used to verify the Cisco AP image with an md5 hash
+image_manifest - optional ImageManifest, the AP is probed with show version and dir flash: and verified against
+                 the image picked from the manifest instead of image_file_name and image_hash
+triage - optional FlashTriage, the verify is only run if the cheap checks find the AP suspect or sample it
+triage_state - dict the triage decision is recorded in for processSSHOutput
+padded - send blank lines after the verify, see getVerifyCmds
+"""
+def getAPCheckCmds(passwd, image_manifest=None, triage=None, triage_state=None, padded=False):
+    ap_chk_log_cmds = ["enable",
+                       passwd]
+
+    if image_manifest is None and triage is None:
+        ap_chk_log_cmds.extend(getVerifyCmds(image_file_name, image_hash, padded))
+        ap_chk_log_cmds.append("show version | include uptime")
+        return ap_chk_log_cmds
+
+    # Steps are run once the output they depend on has been read
+    def verifyStep(ssh_out):
+        image_entry = selectImage(ssh_out, image_manifest)
+        if image_entry is None:
+            return []
+
+        if triage is None:
+            return getVerifyCmds(image_entry.image_file_name, image_entry.image_hash, padded)
+
+        def escalateStep(triage_out):
+            if not triage.escalate(triage_out, image_entry, triage_state):
+                return []
+
+            return getVerifyCmds(image_entry.image_file_name, image_entry.image_hash, padded)
+
+        return triage.triageCmds(image_entry) + [escalateStep]
+
+    ap_chk_log_cmds.append("terminal length 0")
+    if image_manifest is not None:
+        # show version also gives the uptime for the verify cache
+        ap_chk_log_cmds.extend(["show version",
+                                "dir flash:"])
+    ap_chk_log_cmds.append(verifyStep)
+    if image_manifest is None:
+        ap_chk_log_cmds.append("show version | include uptime")
+
+    return ap_chk_log_cmds
+
+"""
+padded - send blank lines after the verify, only for output read with hold_time. Read by prompt each blank line
+         gives an extra prompt and every later reply is read against the wrong command
+"""
+def getVerifyCmds(verify_file_name, verify_hash, padded=False):
+    verify_cmds = ["verify /md5 flash:" + verify_file_name + "/" + verify_file_name + " " + verify_hash]
+    if padded:
+        verify_cmds.extend(["\n",
+                            "\n",
+                            "\n",
+                            "\n",
+                            "\n"])
+
+    return verify_cmds
+
+"""
+Command groups for a multiplexed session, each group runs in its own shell on one connection to the AP
+The verify reads the whole image so the probes that do not depend on it run alongside it in a second shell
+Returns - list of command lists for SSH_Paramiko.executeMultiplexedCommands
+"""
+def getAPCheckCmdGroups(passwd, image_manifest=None, triage=None, triage_state=None):
+    ap_enable_cmds = ["enable",
+                      passwd,
+                      "terminal length 0"]
+    ap_verify_cmds = getAPCheckCmds(passwd, image_manifest, triage, triage_state)
+    ap_probe_cmds = ap_enable_cmds + ["show log | include \"AP image\""]
+
+    # With a manifest the image to verify is picked from show version and dir flash: in the verify shell
+    if image_manifest is None:
+        ap_verify_cmds.remove("show version | include uptime")
+        ap_probe_cmds.extend(["dir flash:",
+                              "show version | include uptime"])
+
+    return [ap_verify_cmds, ap_probe_cmds]
+
+"""
+Output of a multiplexed session in the order of the groups, a failed connect gives every group the same line
+so it is only kept once
+"""
+def joinGroupOutput(ssh_outs):
+    joined_outs = []
+    for ssh_out in ssh_outs:
+        if ssh_out not in joined_outs:
+            joined_outs.append(ssh_out)
+
+    return "\n".join(joined_outs)
+
+"""
+The image the AP is checked against, picked from the probe output when a manifest is used
+Returns - ImageEntry, None if the AP has no image in the manifest
+"""
+def selectImage(ssh_out, image_manifest=None):
+    if image_manifest is None:
+        return ImageEntry("", "", image_file_name, image_hash, image_size)
+
+    return image_manifest.selectFromOutput(ssh_out)
+
+# Uptime is recorded with each verify so the verify cache can tell if the AP has reloaded since
+ap_uptime_cmds = ["show version | include uptime"]
+
+"""
+Filter the output of an AP session into the result types and log the session output
+verify_cache - optional VerifyCache updated with the verify result and AP uptime
+started - time.time() the session was started, used for the result duration
+log_sink - optional LogSink the output is written through, otherwise printTextFile is used
+metrics - optional RunMetrics the classify time, session time and result are recorded in
+image_manifest - optional ImageManifest the image was picked from
+triage_state - triage decision from getAPCheckCmds, an AP that was not escalated is reported as triage_clean
+retry_policy - optional RetryPolicy, a result it will retry is returned without writing the output
+attempt - attempt of the session, from 1
+Returns - APResult
+"""
+def processSSHOutput(ssh_session, ssh_out, device_ip, device_name, output_dir, exec_time, verify_cache=None,
+                     started=None, log_sink=None, metrics=None, image_manifest=None, triage_state=None,
+                     retry_policy=None, attempt=1):
+    classify_started = time.time()
+    classification = ap_classifier.classify(ssh_out)
+    status = classification.status
+    evidence = classification.evidence
+
+    verified_image = selectImage(ssh_out)
+    if image_manifest is not None and status not in ("session_terminated", "ping_failed"):
+        verified_image = image_manifest.selectFromOutput(ssh_out)
+        if verified_image is None:
+            probe = image_manifest.parseProbe(ssh_out)
+            status = "unknown_image"
+            evidence = "model " + str(probe.model) + " version " + str(probe.version) + " image " + \
+                       str(probe.running_image)
+
+    if triage_state and status not in ("session_terminated", "ping_failed", "unknown_image"):
+        if metrics is not None and triage_state["escalated"]:
+            metrics.increment("triage_escalated")
+        if not triage_state["escalated"]:
+            status = "triage_clean"
+            evidence = triage_state["reason"]
+    ssh_session.recordPhase(metrics, "classify", classify_started)
+
+    verified_hash = verified_image.image_hash if verified_image is not None else ""
+    ap_result = createResult(status, device_name, device_ip, started, evidence, "", verified_hash)
+
+    # Only the final attempt of an AP is logged, so a retried AP leaves no failed output beside its result
+    if retry_policy is not None and not retry_policy.isFinal(ap_result, attempt):
+        return ap_result
+
+    if "session_terminated" == status:
+        ap_result.output_path = writeOutput(ssh_session, log_sink, device_name, ssh_out, output_dir, exec_time,
+                                            "_session_terminated")
+    elif "ping_failed" == status:
+        ap_result.output_path = writeOutput(ssh_session, log_sink, device_name, ssh_out, output_dir, exec_time,
+                                            "_ping_failed")
+    else:
+        ap_result.output_path = writeOutput(ssh_session, log_sink, device_name, ssh_out, output_dir, exec_time)
+
+    if verify_cache is not None:
+        if "valid_image" == status:
+            verify_cache.store(device_ip, verified_image.image_file_name, verified_image.image_hash, "valid_image",
+                               verify_cache.parseUptime(ssh_out))
+        elif status in ("corrupt_image", "corrupt_flash"):
+            verify_cache.invalidate(device_ip)
+
+    print("Completed on Device " + device_name)
+
+    recordResult(metrics, ap_result)
+
+    return ap_result
+
+"""
+Write the session output through the log sink when one is in use
+suffix - added to the device name to name the output e.g. _ping_failed
+Returns - path of the output
+"""
+def writeOutput(ssh_session, log_sink, device_name, ssh_out, output_dir, exec_time, suffix=""):
+    if log_sink is not None:
+        return log_sink.printTextFile(device_name + suffix, ssh_out, device_name=device_name)
+
+    return ssh_session.printTextFile(device_name + suffix, ssh_out, output_dir, exec_time)
+
+"""
+Count the result and record the session time when metrics are being collected
+"""
+def recordResult(metrics, ap_result):
+    if metrics is None:
+        return
+
+    metrics.increment("result_" + ap_result.status)
+    if ap_result.duration is not None:
+        metrics.record("session", ap_result.duration)
+
+"""
+Result of a session that raised rather than returning its output, reported as session_terminated for the AP
+Returns - APResult
+"""
+def sessionErrorResult(ssh_session, device_ip, device_name, error):
+    ap_result = createResult("session_terminated", device_name, device_ip, None,
+                             ssh_session.sessionTerminated(device_name, error))
+    ap_result.error = str(error)
+
+    return ap_result
+
+"""
+Build the result record for an AP session
+verified_hash - hash of the image the AP was verified against, image_hash when not set
+Returns - APResult
+"""
+def createResult(status, device_name, device_ip, started, evidence="", output_path="", verified_hash=None):
+    duration = None
+    if started is not None:
+        duration = time.time() - started
+
+    error = ""
+    error_type = ""
+    if status in ("session_terminated", "ping_failed"):
+        error = evidence
+        error_type = errorType(status, evidence)
+
+    if verified_hash is None:
+        verified_hash = image_hash
+
+    return APResult(status, device_name, device_ip, started=started, duration=duration, image_hash=verified_hash,
+                    evidence=evidence, error=error, output_path=output_path, error_type=error_type)
+
+"""
+Error category of a failed session from its output line >> session_terminated,<device_name>,<category>
+Returns - string >> SSH_Paramiko.errorCategory, "unreachable" for ping_failed
+"""
+def errorType(status, evidence):
+    if "ping_failed" == status:
+        return "unreachable"
+
+    fields = evidence.split(",")
+    if len(fields) > 2 and fields[-1]:
+        return fields[-1]
+
+    return "error"
+
+"""
+Parameters for the retry of a failed run_SSHsessionAsync session, host_up is cleared so the AP is probed again and
+the attempt, the last parameter, is counted up
+offset - entries before the session parameters e.g. the job_id of a queue worker
+"""
+def retryParameters(params, offset=0):
+    host_up_index = offset + 7
+
+    return params[:host_up_index] + (None,) + params[host_up_index + 1:-1] + (params[-1] + 1,)
+
+"""
+Find a cached verify of the AP for the image it is checked against, any image in the manifest when one is used
+Returns - entry dict or None
+"""
+def lookupCached(verify_cache, device_ip, image_manifest=None):
+    if image_manifest is None:
+        return verify_cache.lookup(device_ip, image_file_name, image_hash)
+
+    return verify_cache.lookupKnown(device_ip, image_manifest.isKnown)
+
+"""
+Check the uptime output of an AP with a cached verify result
+Returns - APResult, None if the AP has reloaded and needs verifying again
+"""
+def processCachedOutput(ssh_session, ssh_out, cached, verify_cache, device_ip, device_name, output_dir, exec_time,
+                        started=None, log_sink=None, metrics=None, retry_policy=None, attempt=1):
+    if ap_classifier.classify(ssh_out).status in ("session_terminated", "ping_failed"):
+        return processSSHOutput(ssh_session, ssh_out, device_ip, device_name, output_dir, exec_time, started=started,
+                                log_sink=log_sink, metrics=metrics, retry_policy=retry_policy, attempt=attempt)
+
+    if not verify_cache.isCurrent(cached, verify_cache.parseUptime(ssh_out)):
+        return None
+
+    output_path = writeOutput(ssh_session, log_sink, device_name, ssh_out, output_dir, exec_time)
+    print("Completed on Device " + device_name + " - cached verify result")
+
+    ap_result = createResult(cached["status"], device_name, device_ip, started, "cached verify result", output_path,
+                             cached["image_hash"])
+    recordResult(metrics, ap_result)
+    if metrics is not None:
+        metrics.increment("verify_cache_hit")
+
+    return ap_result
+
+"""
+Method is used in conjunction with multiprocessing to filter output from the pool into variable types
+Uses md5 hash to verify Cisco AP image
+host_up - result of the reachability sweep, None to ping the host before connecting
+verify_cache - optional VerifyCache, APs verified within its TTL that have not reloaded are not verified again
+log_sink - optional LogSink the session output is written through
+metrics - optional RunMetrics each phase of the session is timed into
+image_manifest - optional ImageManifest, each AP is verified against the image picked for its model and version
+triage - optional FlashTriage, only APs that look suspect or are sampled are verified with md5
+multiplex - run the verify and the other probes on their own channels of one connection, see getAPCheckCmdGroups
+retry_policy - optional RetryPolicy the session will be retried by, only the final attempt logs its output
+attempt - attempt of the session from 1, counted up by retryParameters
+"""
+def run_SSHsession(user, passwd, device_ip, device_name, output_dir, exec_time, hold_time, host_up=None,
+                   verify_cache=None, log_sink=None, metrics=None, image_manifest=None, triage=None, multiplex=False,
+                   retry_policy=None, attempt=1):
+    print("Child Process id: ", os.getpid())
+
+    started = time.time()
+    ssh_session = SSH_Paramiko()
+
+    cached = None
+    if verify_cache is not None and host_up is not False:
+        cached = lookupCached(verify_cache, device_ip, image_manifest)
+
+    if cached is not None:
+        ssh_out = ssh_session.executeChannelCommands(user, passwd, device_ip, device_name, ap_uptime_cmds,
+                                                     timeout=120, prompt=SSH_Paramiko.DEVICE_PROMPT,
+                                                     cmd_timeout=cmd_timeout, session_timeout=session_timeout,
+                                                     check_host=host_up is None, metrics=metrics)
+        ap_result = processCachedOutput(ssh_session, ssh_out, cached, verify_cache, device_ip, device_name,
+                                        output_dir, exec_time, started, log_sink, metrics, retry_policy, attempt)
+        if ap_result is not None:
+            return ap_result
+
+    triage_state = {}
+    if host_up is False:
+        ssh_out = "ping_failed," + device_name
+    elif multiplex:
+        ssh_outs = ssh_session.executeMultiplexedCommands(user, passwd, device_ip, device_name,
+                                                          getAPCheckCmdGroups(passwd, image_manifest, triage,
+                                                                              triage_state),
+                                                          timeout=120, cmd_timeout=cmd_timeout,
+                                                          session_timeout=session_timeout, check_host=host_up is None,
+                                                          metrics=metrics)
+        ssh_out = joinGroupOutput(ssh_outs)
+    else:
+        ssh_out = ssh_session.executeChannelCommands(user, passwd, device_ip, device_name,
+                                                     getAPCheckCmds(passwd, image_manifest, triage, triage_state),
+                                                     timeout=120, hold_time=hold_time,
+                                                     prompt=SSH_Paramiko.DEVICE_PROMPT, cmd_timeout=cmd_timeout,
+                                                     session_timeout=session_timeout, check_host=host_up is None,
+                                                     metrics=metrics)
+
+    return processSSHOutput(ssh_session, ssh_out, device_ip, device_name, output_dir, exec_time, verify_cache,
+                            started, log_sink, metrics, image_manifest, triage_state, retry_policy, attempt)
+
+"""
+Async counterpart of run_SSHsession, used with SSH_Async.runSessions to scan many APs from one process
+"""
+async def run_SSHsessionAsync(ssh_async, user, passwd, device_ip, device_name, output_dir, exec_time, hold_time,
+                              host_up=None, verify_cache=None, log_sink=None, metrics=None, image_manifest=None,
+                              triage=None, multiplex=False, retry_policy=None, attempt=1):
+    started = time.time()
+
+    cached = None
+    if verify_cache is not None and host_up is not False:
+        cached = lookupCached(verify_cache, device_ip, image_manifest)
+
+    if cached is not None:
+        ssh_out = await ssh_async.executeChannelCommands(user, passwd, device_ip, device_name, ap_uptime_cmds,
+                                                         timeout=120, prompt=SSH_Paramiko.DEVICE_PROMPT,
+                                                         cmd_timeout=cmd_timeout, session_timeout=session_timeout,
+                                                         check_host=host_up is None, metrics=metrics)
+        ap_result = processCachedOutput(ssh_async.ssh_session, ssh_out, cached, verify_cache, device_ip, device_name,
+                                        output_dir, exec_time, started, log_sink, metrics, retry_policy, attempt)
+        if ap_result is not None:
+            return ap_result
+
+    triage_state = {}
+    if host_up is False:
+        ssh_out = "ping_failed," + device_name
+    elif multiplex:
+        ssh_outs = await ssh_async.executeMultiplexedCommands(user, passwd, device_ip, device_name,
+                                                              getAPCheckCmdGroups(passwd, image_manifest, triage,
+                                                                                  triage_state),
+                                                              timeout=120, cmd_timeout=cmd_timeout,
+                                                              session_timeout=session_timeout,
+                                                              check_host=host_up is None, metrics=metrics)
+        ssh_out = joinGroupOutput(ssh_outs)
+    else:
+        ssh_out = await ssh_async.executeChannelCommands(user, passwd, device_ip, device_name,
+                                                         getAPCheckCmds(passwd, image_manifest, triage, triage_state),
+                                                         timeout=120, hold_time=hold_time,
+                                                         prompt=SSH_Paramiko.DEVICE_PROMPT, cmd_timeout=cmd_timeout,
+                                                         session_timeout=session_timeout, check_host=host_up is None,
+                                                         metrics=metrics)
+
+    return processSSHOutput(ssh_async.ssh_session, ssh_out, device_ip, device_name, output_dir, exec_time,
+                            verify_cache, started, log_sink, metrics, image_manifest, triage_state, retry_policy,
+                            attempt)
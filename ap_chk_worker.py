@@ -0,0 +1,286 @@
+"""
+# Title: AP Check Worker
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.13
+# Purpose: Lease AP scan jobs from a ScanQueue, run them and report the results back to the coordinator
+# Notes:
+0.1 - Created the worker - Run close to the APs e.g. on a jump host in each region
+    - Connects to a coordinator started with --coordinator --listen, or to the queue file for local workers
+    - Credentials are read from creds.py on the worker host, they are never put on the queue
+0.2 - Session timings written with RunMetrics when the worker finishes
+0.3 - Sessions launched through an AdaptiveLimiter with per site limits
+0.4 - Failed sessions are retried by RetryPolicy before the job is reported - Added --no-retry
+0.5 - Added --image-manifest, the manifest is read on the worker host like the credentials
+0.6 - Added --triage and --triage-sample
+0.7 - Added --multiplex
+0.8 - Added --ssh-profile and --known-hosts, the worker saves the host keys it has seen once it finishes
+0.9 - Added --output-archive, AP output is appended to the indexed archive instead of one text file per AP
+0.10- Sessions are given the RetryPolicy and attempt so an AP's output is only written for its final attempt
+0.11- Results are also reported every report_interval seconds, each report renews the leases of the batch
+0.12- An --ssh-profile the installed paramiko cannot offer is rejected before connecting to the queue
+0.13- runJob builds the result of a session that raised with ap_chk_session.sessionErrorResult
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+from SSH_Paramiko import SSH_Paramiko
+from SSH_Async import SSH_Async
+from adaptive_limiter import AdaptiveLimiter
+from ap_chk_session import run_SSHsessionAsync, sessionErrorResult, retryParameters
+from retry_policy import RetryPolicy
+from scan_queue import ScanQueue, connectQueue, parseAddress
+from verify_cache import VerifyCache
+from image_manifest import ImageManifest
+from ap_triage import FlashTriage
+from ssh_profile import PROFILES, KnownHostsCache
+from log_sink import LogSink
+from output_archive import OutputArchive
+from run_metrics import RunMetrics
+from creds import LocalUser
+import argparse
+import os
+import socket
+import time
+
+output_dir = "_ap_corrupt_flash_"
+
+"""
+Run one leased job, an exception is reported as session_terminated rather than stopping the batch
+Returns - (job_id, APResult)
+"""
+async def runJob(ssh_async, job_id, *params):
+    try:
+        return job_id, await run_SSHsessionAsync(ssh_async, *params)
+    except Exception as error:
+        return job_id, sessionErrorResult(ssh_async.ssh_session, params[2], params[3], error)
+
+"""
+Lease batches of jobs until the queue is empty
+scan_queue - ScanQueue or a proxy from connectQueue
+batch_size - jobs leased at once, each batch is one round trip to the coordinator
+sites - only lease jobs for these sites
+report_size - results sent back to the coordinator at once
+report_interval - most seconds results are held before they are sent, reports keep the batch leased to this worker
+metrics - optional RunMetrics the sessions are timed into
+site_concurrency - most sessions in flight for one site, 0 for a fixed limit of concurrency with no site limits
+retry - retry failed sessions with RetryPolicy before the job is reported
+image_manifest - optional ImageManifest each AP is verified against
+triage - optional FlashTriage run before the md5 verify
+multiplex - run the verify and the other probes of an AP on their own channels of one connection
+ssh_profile - optional SSHProfile of the handshake algorithms
+known_hosts - optional KnownHostsCache the AP host keys are checked against, saved once the queue is empty
+output_archive - optional OutputArchive the AP output of every run is appended to
+"""
+def runWorker(scan_queue, user, passwd, worker_name, concurrency=500, batch_size=None, sites=None, hold_time=5,
+              verify_cache=None, report_size=50, poll_interval=5, probe_timeout=2, probe_concurrency=512,
+              metrics=None, site_concurrency=100, retry=True, image_manifest=None, triage=None, multiplex=False,
+              ssh_profile=None, known_hosts=None, output_archive=None, report_interval=60):
+    ssh_session = SSH_Paramiko()
+
+    # Sessions in flight grow while connects stay healthy, limited per site of the leased jobs
+    job_sites = {}
+    limiter = None
+    if site_concurrency > 0:
+        limiter = AdaptiveLimiter(initial=min(50, concurrency), max_limit=concurrency, key_func=job_sites.get,
+                                  key_initial=min(10, site_concurrency), key_max=site_concurrency)
+    ssh_async = SSH_Async(concurrency=concurrency, limiter=limiter, profile=ssh_profile, known_hosts=known_hosts)
+
+    # Retries run with the rest of the batch, the job parameters start with the job_id
+    retry_policy = None
+    if retry:
+        retry_policy = RetryPolicy(result_func=lambda result: result[1],
+                                   rebuild_func=lambda params: retryParameters(params, offset=1), metrics=metrics)
+    batch_size = batch_size or concurrency * 2
+    log_sinks = {}
+    completed = []
+    last_report = [time.time()]
+    job_count = 0
+
+    def report(ap_results=None):
+        if ap_results:
+            completed.extend(ap_results)
+
+        if completed and (ap_results is None or len(completed) >= report_size or
+                          time.time() - last_report[0] >= report_interval):
+            scan_queue.complete(worker_name, [(job_id, ap_result.toDict()) for job_id, ap_result in completed])
+            del completed[:]
+            last_report[0] = time.time()
+
+    try:
+        while True:
+            jobs = scan_queue.lease(worker_name, batch_size, sites)
+            if not jobs:
+                # Other workers may still drop leases which are handed out again
+                if scan_queue.pending() == 0:
+                    break
+
+                time.sleep(poll_interval)
+                continue
+
+            # Probe from the worker so reachability is checked close to the APs
+            started = time.time()
+            hosts_up = ssh_session.checkHostsUp([job["device_ip"] for job in jobs], timeout=probe_timeout,
+                                                concurrency=probe_concurrency)
+            ssh_session.recordPhase(metrics, "reachability_sweep", started)
+
+            parameters = []
+            for job in jobs:
+                if "default" != job["site"]:
+                    job_sites[job["device_ip"]] = job["site"]
+
+                # The coordinator run time names the output directory so every host logs the run the same way
+                log_sink = log_sinks.get(job["run"])
+                if log_sink is None:
+                    log_sink = LogSink(job["run"] + output_dir + "log", output_archive=output_archive, run=job["run"])
+                    log_sinks[job["run"]] = log_sink
+
+                parameters.append((job["job_id"], user, passwd, job["device_ip"], job["device_name"], output_dir,
+                                   job["run"], hold_time, hosts_up.get(job["device_ip"], False), verify_cache,
+                                   log_sink, metrics, image_manifest, triage, multiplex, retry_policy, 1))
+
+            ssh_async.streamSessions(runJob, parameters, lambda result: report([result]),
+                                     ip_func=lambda params: params[3], retry_policy=retry_policy)
+            report()
+
+            job_count += len(jobs)
+            print(worker_name + " completed " + str(job_count) + " jobs")
+    finally:
+        report()
+        ssh_async.close()
+        for log_sink in log_sinks.values():
+            log_sink.close()
+        if verify_cache is not None:
+            verify_cache.save()
+        if known_hosts is not None:
+            known_hosts.save()
+
+    return job_count
+
+"""
+Write the worker metrics as <metrics_path>.json and <metrics_path>.prom
+"""
+def writeMetrics(metrics, metrics_path):
+    metrics.writeJSON(metrics_path + ".json")
+    metrics.writePrometheus(metrics_path + ".prom")
+
+"""
+Entry point for local worker processes started by the coordinator, the queue file is opened in the worker
+"""
+def runLocalWorker(queue_db, user, passwd, worker_name, concurrency=500, verify_cache_path=None,
+                   verify_cache_ttl=0, metrics_path=None, retry=True, image_manifest_path=None, triage_sample=None,
+                   multiplex=False, ssh_profile="default", known_hosts_path=None, output_archive_path=None):
+    scan_queue = ScanQueue(queue_db)
+    metrics = RunMetrics()
+    verify_cache = None
+    if verify_cache_ttl > 0:
+        verify_cache = VerifyCache(verify_cache_path, ttl=verify_cache_ttl)
+    image_manifest = None
+    if image_manifest_path:
+        image_manifest = ImageManifest.fromCSV(image_manifest_path)
+    triage = None
+    if triage_sample is not None:
+        triage = FlashTriage(sample_rate=triage_sample)
+    known_hosts = None
+    if known_hosts_path:
+        known_hosts = KnownHostsCache(known_hosts_path)
+    output_archive = None
+    if output_archive_path:
+        output_archive = OutputArchive(output_archive_path)
+
+    try:
+        runWorker(scan_queue, user, passwd, worker_name, concurrency=concurrency, verify_cache=verify_cache,
+                  metrics=metrics, retry=retry, image_manifest=image_manifest, triage=triage, multiplex=multiplex,
+                  ssh_profile=PROFILES[ssh_profile], known_hosts=known_hosts, output_archive=output_archive)
+    finally:
+        scan_queue.close()
+        if output_archive is not None:
+            output_archive.close()
+        if metrics_path is not None:
+            writeMetrics(metrics, metrics_path)
+
+
+# ++++++++++++++++++++++ Main Method ++++++++++++++++++++++
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lease AP scan jobs from a coordinator")
+    parser.add_argument("--connect", help="coordinator host:port started with --listen")
+    parser.add_argument("--queue-db", help="queue file, for workers on the coordinator host")
+    parser.add_argument("--authkey", default=os.environ.get("AP_CHK_QUEUE_KEY", ""),
+                        help="coordinator key, defaults to $AP_CHK_QUEUE_KEY")
+    parser.add_argument("--name", default=socket.gethostname() + "-" + str(os.getpid()), help="worker name")
+    parser.add_argument("--site", action="append", default=[], help="only lease APs at this site, can be repeated")
+    parser.add_argument("--concurrency", type=int, default=500, help="most sessions in flight at once")
+    parser.add_argument("--site-concurrency", type=int, default=100,
+                        help="most sessions in flight for one site, 0 to hold --concurrency sessions in flight")
+    parser.add_argument("--no-retry", action="store_true",
+                        help="report failed sessions straight away instead of retrying them")
+    parser.add_argument("--metrics", default=None,
+                        help="write session timings to <metrics>.json and <metrics>.prom, defaults to the worker name")
+    parser.add_argument("--image-manifest", default=None,
+                        help="CSV of model, version, image_file_name, image_hash to pick the image each AP is verified "
+                             "against")
+    parser.add_argument("--triage", action="store_true",
+                        help="check the image size and flash logs first, only verify suspect APs with md5")
+    parser.add_argument("--triage-sample", type=float, default=0.05,
+                        help="share of APs that pass triage which are still verified with md5 (default 0.05)")
+    parser.add_argument("--multiplex", action="store_true",
+                        help="run the md5 verify and the other probes of an AP at the same time over one connection")
+    parser.add_argument("--ssh-profile", choices=sorted(PROFILES), default="default",
+                        help="key exchange, cipher and MAC preferences offered to the APs (default paramiko defaults)")
+    parser.add_argument("--known-hosts", default="ap_corrupt_flash_known_hosts",
+                        help="known_hosts file the AP host keys are checked against, \"\" to not check host keys")
+    parser.add_argument("--output-archive", default=None,
+                        help="append the per AP output to this indexed archive instead of one text file per AP")
+    parser.add_argument("--verify-cache", default="ap_corrupt_flash_verify_cache.json",
+                        help="md5 verify result cache file")
+    parser.add_argument("--verify-cache-ttl", type=float, default=7,
+                        help="days a clean md5 verify is trusted for, 0 to verify every AP (default 7)")
+    args = parser.parse_args()
+
+    try:
+        PROFILES[args.ssh_profile].check()
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.connect:
+        worker_queue = connectQueue(parseAddress(args.connect), args.authkey.encode("utf-8"))
+    elif args.queue_db:
+        worker_queue = ScanQueue(args.queue_db)
+    else:
+        parser.error("one of --connect or --queue-db is required")
+
+    local_user = LocalUser()
+    worker_cache = None
+    if args.verify_cache_ttl > 0:
+        worker_cache = VerifyCache(args.verify_cache, ttl=args.verify_cache_ttl * 86400)
+
+    worker_manifest = None
+    if args.image_manifest:
+        worker_manifest = ImageManifest.fromCSV(args.image_manifest)
+
+    worker_triage = None
+    if args.triage:
+        worker_triage = FlashTriage(sample_rate=args.triage_sample)
+
+    worker_known_hosts = None
+    if args.known_hosts:
+        worker_known_hosts = KnownHostsCache(args.known_hosts)
+
+    worker_archive = None
+    if args.output_archive:
+        worker_archive = OutputArchive(args.output_archive)
+
+    worker_metrics = RunMetrics()
+    try:
+        jobs_run = runWorker(worker_queue, local_user.user, local_user.passwd, args.name,
+                             concurrency=args.concurrency, sites=args.site, verify_cache=worker_cache,
+                             metrics=worker_metrics, site_concurrency=args.site_concurrency,
+                             retry=not args.no_retry, image_manifest=worker_manifest, triage=worker_triage,
+                             multiplex=args.multiplex, ssh_profile=PROFILES[args.ssh_profile],
+                             known_hosts=worker_known_hosts, output_archive=worker_archive)
+    finally:
+        writeMetrics(worker_metrics, args.metrics or args.name + "_metrics")
+        if worker_archive is not None:
+            worker_archive.close()
+
+    print("Completed Execution - " + str(jobs_run) + " jobs")
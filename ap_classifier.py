@@ -0,0 +1,63 @@
+"""
+# Title: AP Output Classifier
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Classify the output of an AP session into a result type in a single pass over the output
+# Notes:
+0.1 - Created APClassifier - Table of result types and patterns compiled into one regex
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import collections
+import re
+
+Classification = collections.namedtuple("Classification", ["status", "evidence"])
+
+
+class APClassifier(object):
+    # (result type, pattern) highest priority first
+    # Looking for Corrupt flash based on AireOS 8.3.133.10
+    # 684351209 : AP will not allocate clients into correct VLAN; "no bridge-group 1 unicast-flooding"
+    RULES = [("session_terminated", r"session_terminated"),
+             ("ping_failed", r"ping_failed"),
+             ("valid_image", r"Verified"),
+             ("corrupt_image", r"Computed signature")]
+
+    # Result type when none of the patterns are found
+    DEFAULT_STATUS = "corrupt_flash"
+
+    def __init__(self, rules=None, default_status=None):
+        self.rules = rules or self.RULES
+        self.default_status = default_status or self.DEFAULT_STATUS
+        self.priority = dict((status, rank) for rank, (status, pattern) in enumerate(self.rules))
+
+        # One alternation with a named group per result type, the output is only scanned once
+        self.pattern = re.compile("|".join("(?P<" + status + ">" + pattern + ")" for status, pattern in self.rules))
+
+    """
+    Find the highest priority result type in the output
+    Returns - Classification(status, evidence) >> evidence is the line the pattern matched, "" for the default
+    """
+    def classify(self, ssh_out):
+        best_rank = len(self.rules)
+        best_match = None
+
+        for match in self.pattern.finditer(ssh_out):
+            rank = self.priority[match.lastgroup]
+            if rank < best_rank:
+                best_rank = rank
+                best_match = match
+                if rank == 0:
+                    break
+
+        if best_match is None:
+            return Classification(self.default_status, "")
+
+        line_start = ssh_out.rfind("\n", 0, best_match.start()) + 1
+        line_end = ssh_out.find("\n", best_match.end())
+        if line_end == -1:
+            line_end = len(ssh_out)
+
+        return Classification(best_match.lastgroup, ssh_out[line_start:line_end].strip())
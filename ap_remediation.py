@@ -0,0 +1,317 @@
+"""
+# Title: AP Remediation Scheduler
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.5
+# Purpose: Runs the known fixes (fsck, reload, test capwap image) across many APs at once while limiting how many
+APs are taken down together overall, per site and per controller
+# Notes:
+0.1 - Created RemediationScheduler - Recovery is polled instead of holding for a fixed time after each reload
+0.2 - APs are queued as APResult records, the site and controller are taken from the record
+0.3 - Recovery polls the SSH port the session pool connects to
+0.4 - Site and controller limits are not applied to APs with no site or controller in the device list
+    - Image downloads give their slot back once the download has started instead of holding it through the poll
+    - APs waiting for a slot are queued rather than holding a worker, so work for other sites is not held up
+0.5 - Removed the blocking ReloadLimiter.acquire, slots are only taken with tryAcquire by the scheduler
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+from concurrent.futures import ThreadPoolExecutor
+import socket
+import threading
+import time
+
+
+class ReloadLimiter(object):
+    # Site and controller of APs with none in the device list, only the overall limit applies to them
+    UNLIMITED = ("", "default", None)
+
+    """
+    Counts disruptive actions (reloads and image downloads) in progress
+    A slot is only granted when the overall, site and controller counts are all below their limits
+    """
+    def __init__(self, max_reloads=10, max_site_reloads=1, max_controller_reloads=5):
+        self.max_reloads = max_reloads
+        self.max_site_reloads = max_site_reloads
+        self.max_controller_reloads = max_controller_reloads
+
+        self.reloads = 0
+        self.site_reloads = {}
+        self.controller_reloads = {}
+        self.lock = threading.Lock()
+
+    def hasSlot(self, site, controller):
+        return (self.reloads < self.max_reloads and
+                (site in self.UNLIMITED or self.site_reloads.get(site, 0) < self.max_site_reloads) and
+                (controller in self.UNLIMITED or
+                 self.controller_reloads.get(controller, 0) < self.max_controller_reloads))
+
+    def take(self, site, controller):
+        self.reloads += 1
+        if site not in self.UNLIMITED:
+            self.site_reloads[site] = self.site_reloads.get(site, 0) + 1
+        if controller not in self.UNLIMITED:
+            self.controller_reloads[controller] = self.controller_reloads.get(controller, 0) + 1
+
+    """
+    Take a slot if one is free for the site and controller
+    Returns - True if the slot was taken
+    """
+    def tryAcquire(self, site, controller):
+        with self.lock:
+            if not self.hasSlot(site, controller):
+                return False
+
+            self.take(site, controller)
+            return True
+
+    def release(self, site, controller):
+        with self.lock:
+            self.reloads -= 1
+            if site not in self.UNLIMITED:
+                self.site_reloads[site] -= 1
+            if controller not in self.UNLIMITED:
+                self.controller_reloads[controller] -= 1
+
+
+class RemediationScheduler(object):
+    """
+    ssh_pool - SSH_SessionPool with enabled shells, the fix commands are run through it
+    fix_cmds - dict of command lists {"diagnose", "reload", "cp_image", "img_verify"}
+    max_workers - APs being worked on at once, only reloads and image downloads count against the reload limits
+    recovery_timeout - seconds to wait for a reloaded AP to accept SSH again
+    down_timeout - seconds to wait for a reloaded AP to stop answering before treating it as already back
+    image_timeout - seconds to wait for test capwap image to log PASSED or FAILED
+    """
+    def __init__(self, ssh_pool, fix_cmds, max_workers=20, max_reloads=10, max_site_reloads=1,
+                 max_controller_reloads=5, recovery_timeout=900, recovery_interval=15, down_timeout=120,
+                 image_timeout=3600, image_interval=60):
+        self.ssh_pool = ssh_pool
+        self.fix_cmds = fix_cmds
+        self.recovery_timeout = recovery_timeout
+        self.recovery_interval = recovery_interval
+        self.down_timeout = down_timeout
+        self.image_timeout = image_timeout
+        self.image_interval = image_interval
+
+        self.limiter = ReloadLimiter(max_reloads, max_site_reloads, max_controller_reloads)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.futures = []
+        # (ap, slot_action, after_action) of APs waiting for a reload slot, started as slots are released
+        self.waiting = []
+        self.waiting_lock = threading.Lock()
+
+        self.lock = threading.Lock()
+        self.results = {"reloaded": [],
+                        "fsck_fixed": [],
+                        "reloaded_online": [],
+                        "reloaded_offline": [],
+                        "image_pass": [],
+                        "image_fail": [],
+                        "session_terminated": []}
+
+    def addResult(self, result_type, ap):
+        with self.lock:
+            self.results[result_type].append(ap)
+
+    """
+    Check the AP is accepting connections on the SSH port
+    """
+    def isSSHUp(self, device_ip, timeout=5):
+        try:
+            sock = socket.create_connection((device_ip, self.ssh_pool.ssh_session.ssh_port), timeout)
+            sock.close()
+            return True
+        except OSError:
+            return False
+
+    """
+    Poll a reloaded AP until it has gone down and is accepting SSH again
+    Returns - True if the AP came back within recovery_timeout
+    """
+    def waitForRecovery(self, device_ip):
+        start_time = time.time()
+        went_down = False
+
+        while time.time() - start_time < self.recovery_timeout:
+            host_up = self.isSSHUp(device_ip)
+
+            if not host_up:
+                went_down = True
+            elif went_down:
+                return True
+            elif time.time() - start_time > self.down_timeout:
+                # Never seen to go down, the reload was not accepted
+                return True
+
+            time.sleep(self.recovery_interval)
+
+        return False
+
+    """
+    Poll the AP log until the image download reports PASSED or FAILED
+    Returns - True if PASSED was logged within image_timeout
+    """
+    def waitForImage(self, device_ip, device_name):
+        end_time = time.time() + self.image_timeout
+
+        while time.time() < end_time:
+            time.sleep(self.image_interval)
+
+            ssh_out = self.ssh_pool.executeChannelCommands(device_ip, device_name, self.fix_cmds["img_verify"],
+                                                           cmd_timeout=120)
+            if "PASSED" in ssh_out:
+                return True
+            if "FAILED" in ssh_out:
+                return False
+
+            # The AP reloads onto the new image, reconnect on the next poll
+            if "session_terminated" in ssh_out:
+                self.ssh_pool.invalidate(device_ip)
+
+        return False
+
+    """
+    Run fsck on an AP with flash issues and reload it if the filesystem could not be fixed
+    """
+    def remediateFlash(self, ap):
+        device_ip = ap.device_ip
+        device_name = ap.device_name
+        site = ap.site
+        controller = ap.controller
+        print("Checking AP; ", str(ap))
+
+        # Check the flash filesystem
+        ssh_out = self.ssh_pool.executeChannelCommands(device_ip, device_name, self.fix_cmds["diagnose"],
+                                                       cmd_timeout=300)
+        if "session_terminated" in ssh_out:
+            self.addResult("session_terminated", ap)
+            return
+
+        if "Error fscking" not in ssh_out:
+            self.addResult("fsck_fixed", ap)
+            return
+
+        self.runWithSlot(ap, self.reloadAP)
+
+    """
+    Reload an AP, run holding a reload slot
+    The slot is held until the AP is back so a site never has more than its limit down at once
+    """
+    def reloadAP(self, ap):
+        device_ip = ap.device_ip
+        print("Reloading; ", str(ap))
+        self.ssh_pool.executeChannelCommands(device_ip, ap.device_name, self.fix_cmds["reload"], cmd_timeout=30)
+        self.ssh_pool.invalidate(device_ip)
+        self.addResult("reloaded", ap)
+
+        if self.waitForRecovery(device_ip):
+            print("Reloaded AP Online: ", str(ap))
+            self.addResult("reloaded_online", ap)
+        else:
+            print("Reloaded AP is buggered: ", str(ap))
+            self.addResult("reloaded_offline", ap)
+
+    """
+    Download a replacement image from the controller and wait for the result
+    Starting the download takes a reload slot, it is given back once the download has started so APs polled for
+    up to image_timeout do not hold up the downloads behind them
+    """
+    def remediateImage(self, ap):
+        self.runWithSlot(ap, self.startImage, self.checkImage)
+
+    """
+    Start the image download, run holding a reload slot
+    Returns - True if the download was started
+    """
+    def startImage(self, ap):
+        print("Running on AP; ", str(ap))
+        ssh_out = self.ssh_pool.executeChannelCommands(ap.device_ip, ap.device_name, self.fix_cmds["cp_image"],
+                                                       cmd_timeout=120)
+
+        return "session_terminated" not in ssh_out
+
+    def checkImage(self, ap, started):
+        if started and self.waitForImage(ap.device_ip, ap.device_name):
+            self.addResult("image_pass", ap)
+        else:
+            self.addResult("image_fail", ap)
+
+    """
+    Run slot_action(ap) holding a reload slot for the AP's site and controller, then after_action(ap, result) once
+    the slot is given back. While the site or controller is at its limit the AP is queued without holding a worker
+    """
+    def runWithSlot(self, ap, slot_action, after_action=None):
+        with self.waiting_lock:
+            if not self.limiter.tryAcquire(ap.site, ap.controller):
+                self.waiting.append((ap, slot_action, after_action))
+                return
+
+        self.runHoldingSlot(ap, slot_action, after_action)
+
+    def runHoldingSlot(self, ap, slot_action, after_action):
+        try:
+            result = slot_action(ap)
+        finally:
+            self.releaseSlot(ap)
+
+        if after_action is not None:
+            after_action(ap, result)
+
+    """
+    Give a slot back and start the waiting APs that now have one, oldest first
+    """
+    def releaseSlot(self, ap):
+        with self.waiting_lock:
+            self.limiter.release(ap.site, ap.controller)
+
+            still_waiting = []
+            for waiting_ap, slot_action, after_action in self.waiting:
+                if self.limiter.tryAcquire(waiting_ap.site, waiting_ap.controller):
+                    self.submit(self.runHoldingSlot, waiting_ap, slot_action, after_action)
+                else:
+                    still_waiting.append((waiting_ap, slot_action, after_action))
+            self.waiting = still_waiting
+
+    def runSafely(self, remediate, ap, *args):
+        try:
+            remediate(ap, *args)
+        except Exception as error:
+            print("Remediation failed on AP; ", str(ap), error)
+            self.addResult("session_terminated", ap)
+
+    def submit(self, remediate, ap, *args):
+        with self.lock:
+            self.futures.append(self.executor.submit(self.runSafely, remediate, ap, *args))
+
+    """
+    Queue an APResult with flash issues, its site and controller are used for the reload limits
+    """
+    def submitFlash(self, ap):
+        self.submit(self.remediateFlash, ap)
+
+    """
+    Queue an APResult with a corrupt image, its site and controller are used for the reload limits
+    """
+    def submitImage(self, ap):
+        self.submit(self.remediateImage, ap)
+
+    """
+    Wait for every queued AP to finish, including APs started as slots were given back
+    Returns - dict of lists of APs by result type
+    """
+    def join(self):
+        done = 0
+        while True:
+            with self.lock:
+                if done == len(self.futures):
+                    break
+                future = self.futures[done]
+
+            future.result()
+            done += 1
+
+        self.executor.shutdown(wait=True)
+
+        return self.results
@@ -0,0 +1,143 @@
+"""
+# Title: AP Results
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.3
+# Purpose: Typed result record for each AP and a result store indexed by result type and site
+# Notes:
+0.1 - Created APResult and ResultStore to replace the comma joined result strings and parallel result lists
+0.2 - Added error_type and attempts to APResult for the session retries
+0.3 - Added formatResults so the fix phase report builds its sections like formatSection
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import csv
+import json
+
+
+class APResult(object):
+    __slots__ = ("status", "device_name", "device_ip", "site", "controller", "started", "duration", "image_hash",
+                 "evidence", "error", "output_path", "error_type", "attempts")
+
+    """
+    error_type - SSH_Paramiko.errorCategory of a session_terminated AP, "unreachable" for a ping_failed AP
+    attempts - sessions run for the AP including retries
+    """
+    def __init__(self, status, device_name, device_ip, site="default", controller="default", started=None,
+                 duration=None, image_hash="", evidence="", error="", output_path="", error_type="", attempts=1):
+        self.status = status
+        self.device_name = device_name
+        self.device_ip = device_ip
+        self.site = site
+        self.controller = controller
+        self.started = started
+        self.duration = duration
+        self.image_hash = image_hash
+        self.evidence = evidence
+        self.error = error
+        self.output_path = output_path
+        self.error_type = error_type
+        self.attempts = attempts
+
+    """
+    Short form used in the printed and logged reports >> [status, device_name, device_ip]
+    """
+    def toList(self):
+        return [self.status, self.device_name, self.device_ip]
+
+    def toDict(self):
+        return dict((field, getattr(self, field)) for field in self.__slots__)
+
+    """
+    Build a result from toDict output, fields missing from older records take their defaults
+    """
+    @classmethod
+    def fromDict(cls, entry):
+        return cls(**dict((field, entry[field]) for field in cls.__slots__ if field in entry))
+
+    def __str__(self):
+        return str(self.toList())
+
+    def __repr__(self):
+        return "APResult(" + ", ".join(field + "=" + repr(getattr(self, field)) for field in self.__slots__) + ")"
+
+
+"""
+Report section of a list of APs, the heading followed by one AP per line and the total
+Returns - string of the report section
+"""
+def formatResults(heading, results, total_label="Total APs "):
+    lines = [heading]
+    lines.extend(str(result) for result in results)
+    lines.append(total_label + str(len(results)))
+
+    return "\n".join(lines)
+
+
+class ResultStore(object):
+    def __init__(self):
+        self.results = []
+        self.by_status = {}
+        self.by_site = {}
+
+    """
+    Add a result to the store and its status and site indexes
+    """
+    def add(self, result):
+        self.results.append(result)
+        self.by_status.setdefault(result.status, []).append(result)
+        self.by_site.setdefault(result.site, []).append(result)
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def byStatus(self, status):
+        return self.by_status.get(status, [])
+
+    def bySite(self, site):
+        return self.by_site.get(site, [])
+
+    """
+    Returns - dict {status: count}
+    """
+    def countByStatus(self):
+        return dict((status, len(results)) for status, results in self.by_status.items())
+
+    """
+    Count each result type for every site in one pass over the results
+    Returns - dict {site: {status: count}}
+    """
+    def countBySite(self):
+        site_counts = {}
+        for result in self.results:
+            status_counts = site_counts.setdefault(result.site, {})
+            status_counts[result.status] = status_counts.get(result.status, 0) + 1
+
+        return site_counts
+
+    """
+    Report section of every AP with the given status, the heading followed by one AP per line and the total
+    Returns - string of the report section
+    """
+    def formatSection(self, heading, status, total_label="Total APs "):
+        return formatResults(heading, self.byStatus(status), total_label)
+
+    """
+    Write every result as one JSON line per AP
+    """
+    def writeJSONL(self, file_path):
+        with open(file_path, "w") as results_file:
+            results_file.writelines(json.dumps(result.toDict()) + "\n" for result in self.results)
+
+    """
+    Write every result as CSV with a header row
+    """
+    def writeCSV(self, file_path):
+        with open(file_path, "w", newline="") as results_file:
+            writer = csv.writer(results_file)
+            writer.writerow(APResult.__slots__)
+            writer.writerows([getattr(result, field) for field in APResult.__slots__] for result in self.results)
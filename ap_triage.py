@@ -0,0 +1,76 @@
+"""
+# Title: AP Triage
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.2
+# Purpose: Cheap flash checks run before the md5 verify so only suspect APs pay for reading the whole image
+# Notes:
+0.1 - Created FlashTriage - dir flash: of the image, filesystem errors and show log flash errors
+    - Suspect APs and a random sample of the rest are escalated to verify /md5
+0.2 - Image files of dir flash: are matched with the padding before the size stripped by decodeSSHOutput
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import random
+import re
+
+
+class FlashTriage(object):
+    # Filesystem and flash errors in dir flash: or show log output
+    FLASH_ERRORS = re.compile(r"%FILESYS|%Error|I/O error|[Bb]ad (?:block|sector)|[Cc]orrupt(?:ed|ion)?\b")
+    # 5  -rwx  20142593  Jan 1 2018 00:08:03 +00:00  ap3g2-k9w8-mx.153-3.JF5, the size can follow the permissions
+    # directly as decodeSSHOutput strips runs of 9 spaces
+    FLASH_FILE = re.compile(r"^\s*\d+\s+-[-rwx]*\s*(\d+)\s+.*\s(\S+)\s*$", re.MULTILINE)
+
+    """
+    sample_rate - share of APs that pass triage which are still verified, catches faults triage cannot see
+    """
+    def __init__(self, sample_rate=0.05, random_func=random.random):
+        self.sample_rate = sample_rate
+        self.random_func = random_func
+
+    """
+    Commands for the cheap checks of an image
+    image_entry - ImageEntry of the image the AP should be running
+    """
+    def triageCmds(self, image_entry):
+        return ["dir flash:/" + image_entry.image_file_name + "/",
+                "show log | include FILESYS|I/O|Error|orrupt"]
+
+    """
+    Check the triage output for signs the flash or image are damaged
+    Returns - string reason the AP is suspect, "" if the checks passed
+    """
+    def assess(self, ssh_out, image_entry):
+        error = self.FLASH_ERRORS.search(ssh_out)
+        if error is not None:
+            line_start = ssh_out.rfind("\n", 0, error.start()) + 1
+            line_end = ssh_out.find("\n", error.end())
+            return "flash error - " + ssh_out[line_start:line_end if line_end != -1 else None].strip()
+
+        sizes = dict((name, int(size)) for size, name in self.FLASH_FILE.findall(ssh_out))
+        image_size = sizes.get(image_entry.image_file_name)
+        if image_size is None:
+            return "image file not in flash"
+        if 0 == image_size:
+            return "image file is empty"
+        if image_entry.image_size and image_size != image_entry.image_size:
+            return "image size " + str(image_size) + " expected " + str(image_entry.image_size)
+
+        return ""
+
+    """
+    Decide if the AP is verified with md5 after triage
+    triage_state - dict the decision is recorded in >> {"escalated": bool, "reason": string}
+    Returns - bool
+    """
+    def escalate(self, ssh_out, image_entry, triage_state):
+        reason = self.assess(ssh_out, image_entry)
+        if not reason and self.random_func() < self.sample_rate:
+            reason = "random sample"
+
+        triage_state["escalated"] = bool(reason)
+        triage_state["reason"] = reason or "image size and flash log clean"
+
+        return triage_state["escalated"]
@@ -0,0 +1,132 @@
+"""
+# Title: Debug Capture
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Hold the output of a debug capture in bounded memory while it streams from the device
+# Notes:
+0.1 - Created DebugCapture - Ring buffer of the latest output with an optional rolling capture file
+    - Optional stop pattern, the capture can end as soon as the event being debugged is seen
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import collections
+import os
+import re
+
+
+class DebugCapture(object):
+    # Characters carried between chunks so a stop pattern split across two reads is still found
+    MATCH_TAIL = 1024
+
+    """
+    max_bytes - most bytes of output held in memory, the oldest output is dropped first
+    capture_path - file every byte is written to as it arrives, None to only keep the ring buffer
+    max_file_bytes - the file is rolled to capture_path.1 once it reaches this size, 0 to never roll
+    max_files - rolled files kept, the oldest is removed
+    stop_pattern - regex, the capture stops as soon as it is seen in the output
+    """
+    def __init__(self, max_bytes=1048576, capture_path=None, max_file_bytes=10485760, max_files=3,
+                 stop_pattern=None):
+        self.max_bytes = max_bytes
+        self.capture_path = capture_path
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.stop_pattern = re.compile(stop_pattern) if isinstance(stop_pattern, str) else stop_pattern
+
+        self.chunks = collections.deque()
+        self.held_bytes = 0
+        self.total_bytes = 0
+        self.dropped_bytes = 0
+        self.tail = ""
+        self.stopped = False
+        self.stop_match = None
+
+        self.capture_file = None
+        self.file_bytes = 0
+        if capture_path is not None:
+            capture_dir = os.path.dirname(capture_path)
+            if capture_dir:
+                os.makedirs(capture_dir, exist_ok=True)
+            self.capture_file = open(capture_path, "wb")
+
+    """
+    Add output read from the channel
+    Returns - True once the stop pattern has been seen
+    """
+    def write(self, data):
+        if not data:
+            return self.stopped
+
+        self.total_bytes += len(data)
+        self.chunks.append(data)
+        self.held_bytes += len(data)
+
+        # Drop the oldest output over the cap, part of a chunk is kept so the ring is always full
+        while self.held_bytes > self.max_bytes:
+            excess = self.held_bytes - self.max_bytes
+            oldest = self.chunks[0]
+            if len(oldest) <= excess:
+                self.chunks.popleft()
+                self.held_bytes -= len(oldest)
+                self.dropped_bytes += len(oldest)
+            else:
+                self.chunks[0] = oldest[excess:]
+                self.held_bytes -= excess
+                self.dropped_bytes += excess
+
+        if self.capture_file is not None:
+            self.writeFile(data)
+
+        if self.stop_pattern is not None and not self.stopped:
+            text = self.tail + data.decode("utf-8", "replace")
+            match = self.stop_pattern.search(text)
+            if match is not None:
+                self.stopped = True
+                self.stop_match = match.group(0)
+            self.tail = text[-self.MATCH_TAIL:]
+
+        return self.stopped
+
+    def writeFile(self, data):
+        if self.max_file_bytes and self.file_bytes + len(data) > self.max_file_bytes and self.file_bytes:
+            self.rollFile()
+
+        self.capture_file.write(data)
+        self.file_bytes += len(data)
+
+    """
+    Move capture_path to capture_path.1, capture_path.1 to capture_path.2 and so on, dropping the oldest
+    """
+    def rollFile(self):
+        self.capture_file.close()
+
+        for file_number in range(self.max_files, 0, -1):
+            rolled_path = self.capture_path + "." + str(file_number)
+            previous_path = self.capture_path + ("." + str(file_number - 1) if file_number > 1 else "")
+            if file_number == self.max_files and os.path.exists(rolled_path):
+                os.remove(rolled_path)
+            if os.path.exists(previous_path):
+                os.replace(previous_path, rolled_path)
+
+        self.capture_file = open(self.capture_path, "wb")
+        self.file_bytes = 0
+
+    """
+    Keep capturing once the stop pattern has been seen, e.g. the output of the commands that turn the debug off
+    """
+    def clearStop(self):
+        self.stopped = False
+        self.stop_pattern = None
+
+    """
+    Returns - bytes of the output held in memory, the latest max_bytes of the capture
+    """
+    def getvalue(self):
+        return b"".join(self.chunks)
+
+    def close(self):
+        if self.capture_file is not None:
+            self.capture_file.close()
+            self.capture_file = None
@@ -0,0 +1,134 @@
+"""
+# Title: Device Inventory
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Stream the device list CSV, filter it and split it into shards for multiple scanner hosts
+# Notes:
+0.1 - Created DeviceInventory - Rows are read one at a time and filtered by name, site, model and subnet
+    - Devices are deduped by IP and assigned to a shard by a hash of the IP so every host picks the same split
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import collections
+import csv
+import ipaddress
+import re
+import zlib
+
+# name, ip, optional site, controller and model columns of the device list
+Device = collections.namedtuple("Device", ["name", "ip", "site", "controller", "model"])
+
+
+class DeviceInventory(object):
+    """
+    csv_path - device list CSV, one device per row >> name, ip, site, controller, model
+    include - regex the device name must match
+    exclude - regex of device names to skip
+    sites - sites to keep, all sites when empty
+    models - models to keep, all models when empty
+    subnets - IP subnets to keep e.g. "10.1.0.0/16", all addresses when empty
+    shard - shard of the device list to keep from 1 to shards
+    shards - number of shards the device list is split into
+    """
+    def __init__(self, csv_path, include=None, exclude=None, sites=None, models=None, subnets=None, shard=1,
+                 shards=1):
+        if not 1 <= shard <= shards:
+            raise ValueError("shard must be between 1 and " + str(shards))
+
+        self.csv_path = csv_path
+        self.include = re.compile(include) if include else None
+        self.exclude = re.compile(exclude) if exclude else None
+        self.sites = set(sites or [])
+        self.models = set(models or [])
+        self.subnets = [ipaddress.ip_network(subnet, strict=False) for subnet in subnets or []]
+        self.shard = shard
+        self.shards = shards
+
+        # Rows skipped on the last pass >> {reason: count}
+        self.skipped = collections.Counter()
+
+    """
+    Parse a shard given as "i/N"
+    Returns - (i, N)
+    """
+    @staticmethod
+    def parseShard(shard):
+        try:
+            index, count = [int(part) for part in shard.split("/")]
+        except ValueError:
+            raise ValueError("shard must be given as i/N e.g. 1/4")
+
+        return index, count
+
+    """
+    Shard a device IP belongs to, crc32 is used as it is stable between hosts and python versions
+    Returns - int shard from 1 to shards
+    """
+    def shardOf(self, device_ip):
+        return zlib.crc32(device_ip.encode("utf-8")) % self.shards + 1
+
+    """
+    Check a device against the filters
+    Returns - reason the device is skipped, None to keep it
+    """
+    def filterDevice(self, device):
+        if self.include is not None and self.include.search(device.name) is None:
+            return "include"
+
+        if self.exclude is not None and self.exclude.search(device.name) is not None:
+            return "exclude"
+
+        if self.sites and device.site not in self.sites:
+            return "site"
+
+        if self.models and device.model not in self.models:
+            return "model"
+
+        if self.shards > 1 and self.shardOf(device.ip) != self.shard:
+            return "shard"
+
+        if self.subnets:
+            try:
+                address = ipaddress.ip_address(device.ip)
+            except ValueError:
+                return "invalid_ip"
+
+            if not any(address in subnet for subnet in self.subnets):
+                return "subnet"
+
+        return None
+
+    """
+    Read the device list one row at a time
+    Returns - generator of Device for every row that passes the filters, the first row seen for each IP is kept
+    """
+    def __iter__(self):
+        self.skipped = collections.Counter()
+        seen = set()
+
+        with open(self.csv_path, "r", newline="") as csv_file:
+            for row in csv.reader(csv_file, delimiter=","):
+                if len(row) < 2 or not row[1].strip():
+                    self.skipped["short_row"] += 1
+                    continue
+
+                row = [column.strip() for column in row]
+                device = Device(row[0],
+                                row[1],
+                                row[2] if len(row) > 2 and row[2] else "default",
+                                row[3] if len(row) > 3 and row[3] else "default",
+                                row[4] if len(row) > 4 else "")
+
+                reason = self.filterDevice(device)
+                if reason is not None:
+                    self.skipped[reason] += 1
+                    continue
+
+                if device.ip in seen:
+                    self.skipped["duplicate"] += 1
+                    continue
+
+                seen.add(device.ip)
+                yield device
@@ -0,0 +1,683 @@
+"""
+# Title: Fake AP Server
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.5
+# Purpose: Simulated Cisco APs served with paramiko server mode so the scanner can be run without real APs
+# Notes:
+0.1 - Created FakeAPServer - Each AP listens on its own loopback address e.g. 127.0.1.1 to 127.0.16.160
+    - Emulates enable, verify /md5, show version, fsck flash:, reload, test capwap image capwap and show log
+    - FakeAPProfile sets the latency, corruption rates, hangs and disconnects
+    - Every connection is served on its own thread, raise the open file limit for thousands of sessions
+0.2 - APs run a model and image from FakeAPProfile.models, show version and dir flash: report them
+    - verify /md5 of an image the AP does not have fails to open - Added writeManifest and --mixed-models
+0.3 - dir flash: lists the image file, corrupt images are short and corrupt flash logs filesystem errors
+0.4 - Other debug commands stream debug_rate lines a second until no debug all, for debug capture runs
+0.5 - Every shell and exec channel opened on a connection is served on its own thread, for multiplexed sessions
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import argparse
+import csv
+import hashlib
+import ipaddress
+import logging
+import random
+import re
+import selectors
+import socket
+import threading
+import time
+import paramiko
+import queue
+
+# (model, version, image) an AP can run, the first is the image checked by ap_chk_session without a manifest
+FAKE_MODELS = [("AIR-CAP3702I-E-K9", "15.3(3)JD17", "ap3g2-k9w8-mx.ap_smr3_esc.201712191345"),
+               ("AIR-CAP2702I-E-K9", "15.3(3)JF5", "ap3g3-k9w8-mx.153-3.JF5"),
+               ("AIR-CAP1602I-E-K9", "15.3(3)JF5", "ap1g2-k9w7-mx.153-3.JF5")]
+
+
+class FakeAPProfile(object):
+    """
+    latency - seconds before each command is answered
+    md5_time - seconds verify /md5 takes to read the image
+    corrupt_image_rate - share of APs whose image fails verify /md5
+    corrupt_flash_rate - share of APs whose flash cannot be read
+    hang_rate - share of APs that stop answering part way through a session
+    disconnect_rate - share of APs that drop the connection part way through a session
+    auth_delay - seconds before the password is accepted
+    reload_time - seconds an AP is down for after a reload
+    image_time - seconds test capwap image capwap takes to download the image
+    fix_rate - share of corrupt APs fixed by fsck, reload or an image download
+    seed - APs get the same faults for the same seed
+    models - list of (model, version, image) each AP runs one of, the first of FAKE_MODELS when not set
+    debug_rate - lines a second sent while a debug is on
+    """
+    def __init__(self, latency=0.05, md5_time=2.0, corrupt_image_rate=0.01, corrupt_flash_rate=0.01, hang_rate=0.0,
+                 disconnect_rate=0.0, auth_delay=0.0, reload_time=30, image_time=60, fix_rate=0.9, seed=0,
+                 models=None, debug_rate=200):
+        self.latency = latency
+        self.md5_time = md5_time
+        self.corrupt_image_rate = corrupt_image_rate
+        self.corrupt_flash_rate = corrupt_flash_rate
+        self.hang_rate = hang_rate
+        self.disconnect_rate = disconnect_rate
+        self.auth_delay = auth_delay
+        self.reload_time = reload_time
+        self.image_time = image_time
+        self.fix_rate = fix_rate
+        self.seed = seed
+        self.models = models or FAKE_MODELS[:1]
+        self.debug_rate = debug_rate
+
+
+class FakeAP(object):
+    def __init__(self, device_ip, device_name, profile):
+        self.device_ip = device_ip
+        self.device_name = device_name
+        self.random = random.Random(str(profile.seed) + device_ip)
+
+        draw = self.random.random()
+        if draw < profile.corrupt_flash_rate:
+            self.status = "corrupt_flash"
+        elif draw < profile.corrupt_flash_rate + profile.corrupt_image_rate:
+            self.status = "corrupt_image"
+        else:
+            self.status = "valid_image"
+
+        draw = self.random.random()
+        if draw < profile.hang_rate:
+            self.fault = "hang"
+        elif draw < profile.hang_rate + profile.disconnect_rate:
+            self.fault = "disconnect"
+        else:
+            self.fault = None
+
+        self.booted_at = time.time() - self.random.randint(3600, 8640000)
+        self.model, self.version, self.image = self.random.choice(profile.models)
+        self.image_ready_at = None
+        self.image_passed = False
+        self.lock = threading.Lock()
+
+    def fix(self, fix_rate):
+        with self.lock:
+            if self.random.random() < fix_rate:
+                self.status = "valid_image"
+
+    """
+    Returns - string >> AP-1 uptime is 2 days, 3 hours, 4 minutes
+    """
+    def uptime(self):
+        seconds = int(time.time() - self.booted_at)
+        return (self.device_name + " uptime is " + str(seconds // 86400) + " days, " + str(seconds % 86400 // 3600) +
+                " hours, " + str(seconds % 3600 // 60) + " minutes")
+
+    def showVersion(self):
+        return "\n".join(["Cisco IOS Software, C3700 Software (" + self.image.split(".")[0].upper() + "), Version " +
+                          self.version + ", RELEASE SOFTWARE (fc1)",
+                          "Technical Support: http://www.cisco.com/techsupport",
+                          "",
+                          "ROM: Bootstrap program is C3700 boot loader",
+                          self.uptime(),
+                          "System returned to ROM by power-on",
+                          "System image file is \"flash:/" + self.image + "/" + self.image + "\"",
+                          "",
+                          "cisco " + self.model + " (PowerPC) processor (revision A0) with 376810K/134656K bytes",
+                          "",
+                          "Model Number                    : " + self.model])
+
+    """
+    Size of the image file, a corrupt image was cut short when it was copied
+    """
+    def imageSize(self):
+        if "corrupt_image" == self.status:
+            return fakeImageSize(self.image) // 2
+
+        return fakeImageSize(self.image)
+
+    def dirFlash(self, path="flash:"):
+        image_dir = path.split(":", 1)[-1].strip("/")
+        if image_dir:
+            if "corrupt_flash" == self.status:
+                return "%Error opening flash:/" + image_dir + "/ (I/O error)"
+            if image_dir != self.image:
+                return "%Error opening flash:/" + image_dir + "/ (No such file or directory)"
+
+            return "\n".join(["Directory of flash:/" + image_dir + "/",
+                              "",
+                              "    5  -rwx    " + str(self.imageSize()) + "   Jan 1 2018 00:08:03 +00:00  " + self.image,
+                              "    6  -rwx         482   Jan 1 2018 00:08:03 +00:00  info",
+                              "",
+                              "31936512 bytes total (14532608 bytes free)"])
+
+        return "\n".join(["Directory of flash:/",
+                          "",
+                          "    2  -rwx         360   Jan 1 2018 00:01:11 +00:00  private-config",
+                          "    3  drwx         128   Jan 1 2018 00:08:03 +00:00  " + self.image,
+                          "    4  -rwx        2048   Jan 1 2018 00:01:12 +00:00  env_vars",
+                          "",
+                          "31936512 bytes total (14532608 bytes free)"])
+
+
+class FakeAPInterface(paramiko.ServerInterface):
+    def __init__(self, user, passwd, profile):
+        self.user = user
+        self.passwd = passwd
+        self.profile = profile
+        # (channel, command) of each shell and exec request, command is None for a shell
+        self.channel_requests = queue.Queue()
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        if self.profile.auth_delay:
+            time.sleep(self.profile.auth_delay)
+
+        if username == self.user and password == self.passwd:
+            return paramiko.AUTH_SUCCESSFUL
+
+        return paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        if "session" == kind:
+            return paramiko.OPEN_SUCCEEDED
+
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self.channel_requests.put((channel, None))
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        self.channel_requests.put((channel, command.decode("utf-8", "replace").strip()))
+        return True
+
+
+class FakeAPShell(object):
+    def __init__(self, fake_ap, channel, profile, passwd):
+        self.fake_ap = fake_ap
+        self.channel = channel
+        self.profile = profile
+        self.passwd = passwd
+        self.enabled = False
+        self.exec_mode = False
+        self.pending = None
+        self.commands = 0
+        self.debugging = threading.Event()
+
+        # Hung and dropped sessions fail on a random command after the login
+        self.fault_at = fake_ap.random.randint(1, 8)
+
+    def prompt(self):
+        # Exec channels answer the command and close without a prompt
+        if self.exec_mode:
+            return ""
+
+        return self.fake_ap.device_name + ("#" if self.enabled else ">")
+
+    def send(self, text):
+        self.channel.sendall(text.replace("\n", "\r\n").encode("utf-8"))
+
+    """
+    Read lines from the channel and answer each one until the client closes the channel
+    Returns - "reload" if the AP was reloaded
+    """
+    def run(self):
+        self.send("\n" + self.prompt())
+        line_buffer = b""
+
+        while True:
+            data = self.channel.recv(4096)
+            if not data:
+                return None
+
+            line_buffer += data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+            while b"\n" in line_buffer:
+                line, line_buffer = line_buffer.split(b"\n", 1)
+
+                result = self.handleLine(line.decode("utf-8", errors="replace").strip())
+                if result is not None:
+                    return result
+
+    """
+    Answer the single command of an exec channel then close the channel
+    Returns - "reload" if the AP was reloaded
+    """
+    def runExec(self, command):
+        self.exec_mode = True
+        result = self.handleLine(command)
+        if result is None:
+            self.channel.send_exit_status(0)
+        self.channel.close()
+
+        return result
+
+    def handleLine(self, line):
+        self.commands += 1
+
+        if self.fake_ap.fault is not None and self.commands >= self.fault_at:
+            if "hang" == self.fake_ap.fault:
+                # Never answer again, the client has to time the session out
+                while not self.channel.closed:
+                    time.sleep(1)
+                return "hang"
+
+            return "disconnect"
+
+        if self.profile.latency:
+            time.sleep(self.profile.latency)
+
+        # Answer to a Password: or [confirm] prompt
+        if self.pending is not None:
+            pending, self.pending = self.pending, None
+            return pending(line)
+
+        if not line:
+            self.send("\n" + self.prompt())
+            return None
+
+        return self.handleCommand(line)
+
+    def handleCommand(self, line):
+        if "enable" == line:
+            self.send("\nPassword: ")
+            self.pending = self.enable
+            return None
+
+        if line.startswith("verify /md5"):
+            self.send("\n" + self.verify(line) + "\n" + self.prompt())
+        elif line.startswith("show version"):
+            self.send("\n" + self.include(line, self.fake_ap.showVersion()) + "\n" + self.prompt())
+        elif line.startswith("dir flash:"):
+            self.send("\n" + self.fake_ap.dirFlash(line.split()[1]) + "\n" + self.prompt())
+        elif line.startswith("terminal length"):
+            self.send("\n" + self.prompt())
+        elif line.startswith("show log"):
+            self.send("\n" + self.include(line, self.imageLog() + self.flashLog()) + "\n" + self.prompt())
+        elif line.startswith("debug capwap console cli"):
+            self.send("\ndebug capwap console cli is ON\n" + self.prompt())
+        elif line.startswith("no debug all"):
+            self.debugging.clear()
+            self.send("\nAll possible debugging has been turned off\n" + self.prompt())
+        elif line.startswith("debug "):
+            self.send("\n" + line[len("debug "):] + " debugging is on\n" + self.prompt())
+            self.startDebug()
+        elif line.startswith("fsck flash:"):
+            self.send("\nFsck operation may take a while. Continue? [confirm]")
+            self.pending = self.fsck
+        elif line.startswith("reload"):
+            self.send("\nProceed with reload? [confirm]")
+            self.pending = self.reload
+        elif line.startswith("test capwap image capwap"):
+            with self.fake_ap.lock:
+                self.fake_ap.image_ready_at = time.time() + self.profile.image_time
+                self.fake_ap.image_passed = self.fake_ap.random.random() < self.profile.fix_rate
+            self.send("\nAP image download started\n" + self.prompt())
+        else:
+            self.send("\n         ^\n% Invalid input detected at '^' marker.\n\n" + self.prompt())
+
+        return None
+
+    """
+    Stream debug lines from a background thread until no debug all or the channel closes
+    """
+    def startDebug(self):
+        if self.debugging.is_set():
+            return
+        self.debugging.set()
+
+        def stream():
+            line_number = 0
+            while self.debugging.is_set() and not self.channel.closed:
+                line_number += 1
+                try:
+                    self.send("\n*Mar  1 00:%02d:%02d.%03d: %%DOT11-6-ASSOC: Interface Dot11Radio0, Station %s "
+                              "0000.1111.%04x Associated KEY_MGMT[NONE]" %
+                              (line_number // 60000 % 60, line_number // 1000 % 60, line_number % 1000,
+                               self.fake_ap.device_name, line_number % 65536))
+                except (OSError, EOFError):
+                    return
+                time.sleep(1.0 / self.profile.debug_rate)
+
+        streamer = threading.Thread(target=stream, name="FakeAPDebug")
+        streamer.daemon = True
+        streamer.start()
+
+    def enable(self, line):
+        if line == self.passwd:
+            self.enabled = True
+            self.send("\n" + self.prompt())
+        else:
+            self.send("\n% Bad secrets\n\n" + self.prompt())
+
+        return None
+
+    """
+    Lines of the output matching the regex after | include e.g. show log | include FILESYS|I/O
+    """
+    def include(self, line, output):
+        if "| include" not in line:
+            return output
+
+        pattern = line.split("| include", 1)[1].strip().strip("\"")
+
+        return "\n".join(output_line for output_line in output.split("\n") if re.search(pattern, output_line))
+
+    def verify(self, line):
+        parts = line.split()
+        image_path = parts[2] if len(parts) > 2 else "flash:"
+        image_hash = parts[3] if len(parts) > 3 else ""
+
+        if self.fake_ap.image not in image_path:
+            return "%Error opening " + image_path + " (No such file or directory)"
+
+        time.sleep(self.profile.md5_time)
+
+        if "corrupt_flash" == self.fake_ap.status:
+            return "%Error opening " + image_path + " (I/O error)"
+
+        if "corrupt_image" == self.fake_ap.status:
+            computed = hashlib.md5((self.fake_ap.device_ip + image_path).encode("utf-8")).hexdigest()
+            return (".........Done!\nComputed signature = " + computed + "\nSubmitted signature = " + image_hash +
+                    "\n%Error verifying " + image_path)
+
+        return ".........Done!\nVerified (" + image_path + ") = " + image_hash
+
+    def fsck(self, line):
+        if "corrupt_flash" == self.fake_ap.status:
+            self.fake_ap.fix(self.profile.fix_rate)
+
+        if "corrupt_flash" == self.fake_ap.status:
+            self.send("\nError fscking flash: (I/O error)\n" + self.prompt())
+        else:
+            self.send("\nFsck of flash: complete (0 lost clusters)\n" + self.prompt())
+
+        return None
+
+    def reload(self, line):
+        if "corrupt_flash" == self.fake_ap.status:
+            self.fake_ap.fix(self.profile.fix_rate)
+
+        return "reload"
+
+    """
+    Log lines of a damaged flash
+    """
+    def flashLog(self):
+        if "corrupt_flash" != self.fake_ap.status:
+            return ""
+
+        return "\n*Mar  1 00:00:21.447: %FILESYS-3-FLASH: flash:/ I/O error reading sector 2048"
+
+    def imageLog(self):
+        with self.fake_ap.lock:
+            if self.fake_ap.image_ready_at is None:
+                return ""
+
+            if time.time() < self.fake_ap.image_ready_at:
+                return "*AP image download in progress"
+
+            if self.fake_ap.image_passed:
+                self.fake_ap.status = "valid_image"
+                return "*AP image integrity check PASSED"
+
+            return "*AP image integrity check FAILED"
+
+
+class FakeAPServer(object):
+    """
+    count - number of APs to serve
+    base_ip - address of the first AP, each AP listens on the next loopback address
+    port - SSH port every AP listens on, use SSH_Paramiko.SSH_PORT = port in the client
+    host_key - paramiko key, a new RSA key is generated when not set
+    """
+    def __init__(self, count=100, base_ip="127.0.1.1", port=2222, profile=None, user="admin", passwd="admin",
+                 host_key=None):
+        self.profile = profile or FakeAPProfile()
+        self.port = port
+        self.user = user
+        self.passwd = passwd
+        self.host_key = host_key or paramiko.RSAKey.generate(2048)
+        self.selector = selectors.DefaultSelector()
+        self.listeners = {}
+        self.running = False
+        self.lock = threading.Lock()
+
+        self.aps = [FakeAP(device_ip, device_name, self.profile) for device_ip, device_name in
+                    fakeAPAddresses(count, base_ip)]
+
+    """
+    Start listening for every AP, connections are accepted on a background thread
+    """
+    def start(self):
+        # Reachability probes connect and close without an SSH handshake, do not log each one
+        logging.getLogger("paramiko.transport").setLevel(logging.CRITICAL)
+
+        for fake_ap in self.aps:
+            self.listen(fake_ap)
+
+        self.running = True
+        self.acceptor = threading.Thread(target=self.acceptLoop, name="FakeAPAccept")
+        self.acceptor.daemon = True
+        self.acceptor.start()
+
+    def listen(self, fake_ap):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((fake_ap.device_ip, self.port))
+        listener.listen(128)
+        listener.setblocking(False)
+
+        with self.lock:
+            self.listeners[fake_ap.device_ip] = listener
+            self.selector.register(listener, selectors.EVENT_READ, fake_ap)
+
+    def acceptLoop(self):
+        while self.running:
+            for key, mask in self.selector.select(timeout=0.5):
+                try:
+                    sock, address = key.fileobj.accept()
+                except OSError:
+                    continue
+
+                sock.setblocking(True)
+                handler = threading.Thread(target=self.handleConnection, args=(sock, key.data))
+                handler.daemon = True
+                handler.start()
+
+    def handleConnection(self, sock, fake_ap):
+        transport = paramiko.Transport(sock)
+        transport.add_server_key(self.host_key)
+        interface = FakeAPInterface(self.user, self.passwd, self.profile)
+
+        try:
+            transport.start_server(server=interface)
+
+            # Each channel is answered on its own thread until the client closes the connection
+            channel_threads = []
+            while transport.is_active():
+                try:
+                    channel, command = interface.channel_requests.get(timeout=1)
+                except queue.Empty:
+                    if channel_threads and not any(thread.is_alive() for thread in channel_threads):
+                        break
+                    continue
+
+                channel_thread = threading.Thread(target=self.serveChannel, args=(fake_ap, channel, command))
+                channel_thread.daemon = True
+                channel_thread.start()
+                channel_threads.append(channel_thread)
+        except (paramiko.SSHException, EOFError, OSError):
+            pass
+        finally:
+            transport.close()
+
+    """
+    Answer a shell or exec channel, the AP reloads once a channel has confirmed a reload
+    """
+    def serveChannel(self, fake_ap, channel, command):
+        fake_shell = FakeAPShell(fake_ap, channel, self.profile, self.passwd)
+        try:
+            if command is None:
+                result = fake_shell.run()
+            else:
+                result = fake_shell.runExec(command)
+        except (paramiko.SSHException, EOFError, OSError):
+            return
+
+        if "reload" == result:
+            self.reloadAP(fake_ap)
+
+        # A reload or dropped connection ends every channel of the connection
+        if result in ("reload", "disconnect"):
+            channel.get_transport().close()
+
+    """
+    Stop the AP accepting connections for reload_time seconds, the AP comes back with a new uptime
+    """
+    def reloadAP(self, fake_ap):
+        with self.lock:
+            listener = self.listeners.pop(fake_ap.device_ip, None)
+            if listener is None:
+                return
+
+            self.selector.unregister(listener)
+            listener.close()
+
+        def boot():
+            fake_ap.booted_at = time.time()
+            if self.running:
+                self.listen(fake_ap)
+
+        timer = threading.Timer(self.profile.reload_time, boot)
+        timer.daemon = True
+        timer.start()
+
+    def stop(self):
+        self.running = False
+        with self.lock:
+            for listener in self.listeners.values():
+                self.selector.unregister(listener)
+                listener.close()
+            self.listeners = {}
+
+    """
+    Write the APs as a device list CSV >> name, ip, site, controller, model
+    sites - APs are spread across this many sites
+    """
+    def writeDeviceList(self, csv_path, sites=10):
+        with open(csv_path, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            for ap_number, fake_ap in enumerate(self.aps):
+                site = "site-" + str(ap_number % sites)
+                writer.writerow([fake_ap.device_name, fake_ap.device_ip, site, "wlc-" + str(ap_number % sites // 5),
+                                 fake_ap.model])
+
+    """
+    Write the image manifest of the APs models >> model, version, image_file_name, image_hash
+    """
+    def writeManifest(self, csv_path):
+        with open(csv_path, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(["model", "version", "image_file_name", "image_hash", "image_size"])
+            for model, version, image in self.profile.models:
+                writer.writerow([model.split("-")[0] + "-" + model.split("-")[1], version, image,
+                                 hashlib.md5(image.encode("utf-8")).hexdigest(), fakeImageSize(image)])
+
+    """
+    Returns - dict {status: count} of the APs as they were served
+    """
+    def expectedResults(self):
+        expected = {}
+        for fake_ap in self.aps:
+            status = fake_ap.status
+            if fake_ap.fault is not None:
+                status = "session_terminated"
+            expected[status] = expected.get(status, 0) + 1
+
+        return expected
+
+
+"""
+Addresses and names of the APs served from base_ip
+Returns - list of (device_ip, device_name)
+"""
+def fakeAPAddresses(count, base_ip="127.0.1.1"):
+    first_ip = ipaddress.ip_address(base_ip)
+
+    return [(str(first_ip + ap_number), "AP-" + str(ap_number + 1)) for ap_number in range(count)]
+
+
+"""
+Size of a simulated image file in bytes, the same for every AP running the image
+"""
+def fakeImageSize(image):
+    return 16000000 + int(hashlib.md5(image.encode("utf-8")).hexdigest()[:6], 16)
+
+
+"""
+Raise the soft open file limit to the hard limit so thousands of APs and sessions can be open
+"""
+def raiseFileLimit():
+    try:
+        import resource
+    except ImportError:
+        return
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+# ++++++++++++++++++++++ Main Method ++++++++++++++++++++++
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve simulated Cisco APs on loopback addresses")
+    parser.add_argument("--count", type=int, default=100, help="number of APs")
+    parser.add_argument("--base-ip", default="127.0.1.1", help="address of the first AP")
+    parser.add_argument("--port", type=int, default=2222, help="SSH port of every AP")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--passwd", default="admin")
+    parser.add_argument("--device-list", default=None, help="write the APs as a device list CSV")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds before each command is answered")
+    parser.add_argument("--md5-time", type=float, default=2.0, help="seconds verify /md5 takes")
+    parser.add_argument("--corrupt-image-rate", type=float, default=0.01)
+    parser.add_argument("--corrupt-flash-rate", type=float, default=0.01)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--auth-delay", type=float, default=0.0)
+    parser.add_argument("--reload-time", type=float, default=30)
+    parser.add_argument("--image-time", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mixed-models", action="store_true", help="APs run one of several models and images")
+    parser.add_argument("--manifest", default=None, help="write the image manifest of the APs models as CSV")
+    args = parser.parse_args()
+
+    raiseFileLimit()
+
+    fake_profile = FakeAPProfile(latency=args.latency, md5_time=args.md5_time,
+                                 corrupt_image_rate=args.corrupt_image_rate,
+                                 corrupt_flash_rate=args.corrupt_flash_rate, hang_rate=args.hang_rate,
+                                 disconnect_rate=args.disconnect_rate, auth_delay=args.auth_delay,
+                                 reload_time=args.reload_time, image_time=args.image_time, seed=args.seed,
+                                 models=FAKE_MODELS if args.mixed_models else None)
+    fake_server = FakeAPServer(args.count, args.base_ip, args.port, fake_profile, args.user, args.passwd)
+
+    if args.device_list:
+        fake_server.writeDeviceList(args.device_list)
+    if args.manifest:
+        fake_server.writeManifest(args.manifest)
+
+    fake_server.start()
+    print("Serving " + str(args.count) + " APs from " + args.base_ip + " on port " + str(args.port))
+    print("Expected results " + str(fake_server.expectedResults()))
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        fake_server.stop()
@@ -0,0 +1,142 @@
+"""
+# Title: Fake SMTP Server
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Stand-in mail relay that keeps the messages it receives, so the run emails can be checked without a relay
+# Notes:
+0.1 - Created FakeSMTPServer - HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP and QUIT on a background thread
+    - Optional delay before each reply and a share of messages refused, to act like a slow or failing relay
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import argparse
+import random
+import socketserver
+import threading
+import time
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        self.wfile.write((line + "\r\n").encode("utf-8"))
+
+    def handle(self):
+        self.reply("220 fake-smtp ESMTP ready")
+        sender = None
+        receivers = []
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+
+            command = line.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb in ("HELO", "EHLO"):
+                self.reply("250 fake-smtp")
+            elif "MAIL" == verb:
+                sender = command.split(":", 1)[-1].strip()
+                receivers = []
+                self.reply("250 OK")
+            elif "RCPT" == verb:
+                receivers.append(command.split(":", 1)[-1].strip())
+                self.reply("250 OK")
+            elif "DATA" == verb:
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = self.readData()
+                if self.server.random.random() < self.server.fail_rate:
+                    self.reply("451 Requested action aborted: local error in processing")
+                else:
+                    self.server.received(sender, receivers, data)
+                    self.reply("250 OK queued")
+            elif "RSET" == verb:
+                sender = None
+                receivers = []
+                self.reply("250 OK")
+            elif "NOOP" == verb:
+                self.reply("250 OK")
+            elif "QUIT" == verb:
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+    """
+    Read the message after DATA up to the line with a single dot
+    Returns - string of the message
+    """
+    def readData(self):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b".\r\n", b".\n"):
+                break
+
+            # Lines starting with a dot have the extra dot added by the client removed
+            if line.startswith(b".."):
+                line = line[1:]
+            lines.append(line.decode("utf-8", "replace"))
+
+        return "".join(lines).replace("\r\n", "\n")
+
+
+class FakeSMTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    """
+    delay - seconds before each reply, e.g. a relay that is slow to answer
+    fail_rate - share of messages refused with a 451 after DATA
+    verbose - print each message as it is received
+    """
+    def __init__(self, host="127.0.0.1", port=2525, delay=0.0, fail_rate=0.0, seed=0, verbose=False):
+        socketserver.TCPServer.__init__(self, (host, port), FakeSMTPHandler)
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.verbose = verbose
+        # (sender, receivers, message) of every message accepted
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def received(self, sender, receivers, data):
+        with self.lock:
+            self.messages.append((sender, receivers, data))
+
+        if self.verbose:
+            print("Message from " + str(sender) + " to " + ", ".join(receivers) + "\n" + data)
+
+    """
+    Serve on a background thread
+    """
+    def start(self):
+        self.server_thread = threading.Thread(target=self.serve_forever, name="FakeSMTP")
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+# ++++++++++++++++++++++ Main Method ++++++++++++++++++++++
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a stand-in SMTP relay that prints the messages it receives")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds before each reply")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of messages refused")
+    args = parser.parse_args()
+
+    fake_smtp = FakeSMTPServer(args.host, args.port, args.delay, args.fail_rate, verbose=True)
+    print("Serving SMTP on " + args.host + ":" + str(args.port))
+    try:
+        fake_smtp.serve_forever()
+    except KeyboardInterrupt:
+        fake_smtp.server_close()
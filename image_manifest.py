@@ -0,0 +1,120 @@
+"""
+# Title: Image Manifest
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.3
+# Purpose: Known good AP image names and md5 hashes for each AP model and software version, so one scan can
+verify every model in a mixed estate
+# Notes:
+0.1 - Created ImageManifest - Loaded once from a CSV and indexed by image name and software version
+    - Picks the image to verify from the show version and dir flash: output of each AP
+0.2 - Optional image_size column, the size of the image file checked by FlashTriage
+0.3 - Image directories of dir flash: are matched with the padding before the size stripped by decodeSSHOutput
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import collections
+import csv
+import re
+
+# image_size - bytes of the image file, None when not known
+ImageEntry = collections.namedtuple("ImageEntry", ["model", "version", "image_file_name", "image_hash", "image_size"])
+
+# What an AP reports about itself >> flash_images is every image directory listed by dir flash:
+ImageProbe = collections.namedtuple("ImageProbe", ["model", "version", "running_image", "flash_images"])
+
+
+class ImageManifest(object):
+    # System image file is "flash:/ap3g2-k9w8-mx.153-3.JF5/ap3g2-k9w8-mx.153-3.JF5"
+    RUNNING_IMAGE = re.compile(r"System image file is \"?[^:\s\"]+:/?([^/\s\"]+)")
+    # Cisco IOS Software, C2600 Software (AP3G2-K9W8-M), Version 15.3(3)JF5, RELEASE SOFTWARE (fc2)
+    VERSION = re.compile(r"Software \([^)]*\), (?:Experimental )?Version ([^\s,]+)")
+    # Model Number : AIR-CAP2602I-E-K9 or Product/Model Number : AIR-AP2802I-E-K9
+    MODEL = re.compile(r"Model Number\s*:\s*(\S+)")
+    # 3  drwx  128  Mar 1 2002 00:08:03 +00:00  ap3g2-k9w8-mx.153-3.JF5, decodeSSHOutput strips runs of 9 spaces
+    # so a padded size can follow the permissions directly >> 3  drwx128  Mar 1 2002 ...
+    FLASH_DIRECTORY = re.compile(r"^\s*\d+\s+d[-rwx]*\s*\d+\s.*\s(\S+)\s*$", re.MULTILINE)
+
+    def __init__(self, entries=()):
+        self.entries = []
+        self.by_image = {}
+        self.by_version = {}
+
+        for entry in entries:
+            self.add(entry)
+
+    """
+    Load the manifest from a CSV with the columns model, version, image_file_name, image_hash and optionally
+    image_size. model is the start of the model number e.g. AIR-CAP2602 and can be left blank to match any model
+    """
+    @classmethod
+    def fromCSV(cls, csv_path):
+        with open(csv_path, "r", newline="") as csv_file:
+            reader = csv.DictReader(csv_file)
+            return cls(ImageEntry((row.get("model") or "").strip(), (row.get("version") or "").strip(),
+                                  row["image_file_name"].strip(), row["image_hash"].strip().lower(),
+                                  int(row["image_size"]) if (row.get("image_size") or "").strip() else None)
+                       for row in reader if (row.get("image_file_name") or "").strip())
+
+    """
+    Manifest of a single image, how the scan ran before manifests
+    """
+    @classmethod
+    def single(cls, image_file_name, image_hash, image_size=None):
+        return cls([ImageEntry("", "", image_file_name, image_hash, image_size)])
+
+    def add(self, entry):
+        self.entries.append(entry)
+        self.by_image.setdefault(entry.image_file_name, entry)
+        self.by_version.setdefault(entry.version, []).append(entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    """
+    Check an image name and hash are in the manifest, used to trust a cached verify of the image
+    """
+    def isKnown(self, image_file_name, image_hash):
+        entry = self.by_image.get(image_file_name)
+
+        return entry is not None and entry.image_hash == image_hash
+
+    """
+    Read the model, version and images from the show version and dir flash: output of an AP
+    Returns - ImageProbe, fields not found are None
+    """
+    def parseProbe(self, ssh_out):
+        running_image = self.RUNNING_IMAGE.search(ssh_out)
+        version = self.VERSION.search(ssh_out)
+        model = self.MODEL.search(ssh_out)
+
+        return ImageProbe(model.group(1) if model else None,
+                          version.group(1) if version else None,
+                          running_image.group(1) if running_image else None,
+                          self.FLASH_DIRECTORY.findall(ssh_out))
+
+    """
+    Pick the image to verify for an AP, the running image first, then the model and version, then any image
+    in flash that is in the manifest
+    Returns - ImageEntry, None if the AP has no image in the manifest
+    """
+    def select(self, probe):
+        if probe.running_image in self.by_image:
+            return self.by_image[probe.running_image]
+
+        if probe.version in self.by_version:
+            # The longest matching model prefix is the most specific entry
+            candidates = [entry for entry in self.by_version[probe.version]
+                          if not entry.model or (probe.model or "").startswith(entry.model)]
+            if candidates:
+                return max(candidates, key=lambda entry: len(entry.model))
+
+        for flash_image in probe.flash_images:
+            if flash_image in self.by_image:
+                return self.by_image[flash_image]
+
+        return None
+
+    def selectFromOutput(self, ssh_out):
+        return self.select(self.parseProbe(ssh_out))
@@ -0,0 +1,128 @@
+"""
+# Title: Log Sink
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.2
+# Purpose: Writes the per device output for a run from a background thread into one run directory
+# Notes:
+0.1 - Created LogSink - Run directory created once, writes queued with a bounded buffer
+    - Optional archive mode packs the device outputs into a single tar.gz for the run
+0.2 - Optional OutputArchive the device outputs are appended to, indexed by run and device, instead of text files
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import io
+import os
+import queue
+import tarfile
+import threading
+import time
+
+
+class LogSink(object):
+    """
+    log_dir - run directory, created once when the sink is opened
+    archive - pack device outputs written with write_method "write" into <log_dir>.tar.gz
+    max_pending - writes buffered before printTextFile blocks the caller
+    output_archive - optional OutputArchive device outputs written with write_method "write" are appended to, it
+                     can be shared by several sinks and is closed by its owner
+    run - run name the outputs are archived under, the log_dir name when not set
+    """
+    def __init__(self, log_dir, archive=False, max_pending=1000, output_archive=None, run=None):
+        self.log_dir = log_dir
+        self.archive = archive
+        self.output_archive = output_archive
+        self.run = run or os.path.basename(log_dir.rstrip(os.sep))
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.errors = []
+        self.tar = None
+
+        os.makedirs(log_dir, exist_ok=True)
+
+        if archive:
+            self.archive_path = log_dir.rstrip(os.sep) + ".tar.gz"
+            self.tar = tarfile.open(self.archive_path, "w:gz")
+
+        self.writer = threading.Thread(target=self.writeLoop, name="LogSink")
+        self.writer.daemon = True
+        self.writer.start()
+
+    """
+    Queue a string to be written to <log_dir>/<f_nme>.txt, same arguments as SSH_Paramiko.printTextFile
+    Appended files are always written as plain files so they can be added to during the run
+    device_name - device the output is archived under in the output archive, f_nme when not set
+    Returns - path of the text file, inside the archive when archive mode is used
+    """
+    def printTextFile(self, f_nme, input, write_method="write", device_name=None):
+        if self.output_archive is not None and "write" == write_method:
+            self.pending.put((f_nme, input, "archive", device_name or f_nme))
+            return self.output_archive.archive_dir + ":" + self.run + "/" + f_nme
+
+        f_nme = f_nme + ".txt"
+        self.pending.put((f_nme, input, write_method, None))
+
+        if self.tar is not None and "write" == write_method:
+            return self.archive_path + ":" + f_nme
+
+        return os.path.join(self.log_dir, f_nme)
+
+    def writeLoop(self):
+        while True:
+            item = self.pending.get()
+            try:
+                if item is None:
+                    return
+
+                self.writeItem(*item)
+
+                # Archived outputs are indexed once the writes queued so far are done
+                if self.output_archive is not None and self.pending.empty():
+                    self.output_archive.commit()
+            except Exception as error:
+                self.errors.append(error)
+                print("Log write failed: ", error)
+            finally:
+                self.pending.task_done()
+
+    def writeItem(self, f_nme, input, write_method, device_name):
+        if "archive" == write_method:
+            self.output_archive.add(self.run, device_name, f_nme, input)
+            return
+
+        if self.tar is not None and "write" == write_method:
+            data = input.encode("utf-8") if isinstance(input, str) else input
+            tar_info = tarfile.TarInfo(f_nme)
+            tar_info.size = len(data)
+            tar_info.mtime = time.time()
+            self.tar.addfile(tar_info, io.BytesIO(data))
+            return
+
+        if "write" == write_method:
+            f_write = "w"
+        else:
+            f_write = "a"
+
+        with open(os.path.join(self.log_dir, f_nme), f_write) as results:
+            results.write(input)
+
+    """
+    Block until every queued write has been written
+    """
+    def flush(self):
+        self.pending.join()
+
+    """
+    Write everything queued, stop the writer and close the archive, the output archive is committed but left open
+    """
+    def close(self):
+        if self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join()
+
+        if self.output_archive is not None:
+            self.output_archive.commit()
+
+        if self.tar is not None:
+            self.tar.close()
+            self.tar = None
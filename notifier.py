@@ -0,0 +1,186 @@
+"""
+# Title: Notifier
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.2
+# Purpose: Sends the run emails from a background thread so a slow or unreachable mail relay never holds up a scan
+# Notes:
+0.1 - Created Notifier - Messages queued and sent on a background thread, connecting to the relay for each send
+    - Interim digests of the APs found so far, failed sends retried and then written to a file so none are lost
+0.2 - close without a timeout stops the retries before waiting for the sender, each queued message is tried once
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+from email.message import EmailMessage
+import queue
+import smtplib
+import threading
+import time
+
+
+class Notifier(object):
+    # Most device names listed for each category in a digest
+    DIGEST_NAMES = 50
+
+    """
+    smtp_host - mail relay, connected to when a message is sent rather than held open for the run
+    sender - from address
+    receivers - to address or list of addresses
+    digest_interval - seconds between interim digests of the recorded events, 0 for no digests
+    max_attempts - sends tried for each message before it is written to undelivered_path
+    retry_delay - seconds between sends of a message that failed
+    undelivered_path - file messages that could not be sent are appended to, None to only print them
+    subject_prefix - added to the start of every subject
+    smtp_factory - called with (smtp_host, smtp_port, timeout) to connect e.g. smtplib.SMTP_SSL
+    """
+    def __init__(self, smtp_host, sender, receivers, smtp_port=25, digest_interval=1800, timeout=30, max_attempts=3,
+                 retry_delay=30, undelivered_path=None, subject_prefix="AP Corrupt Flash", smtp_factory=smtplib.SMTP):
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+        self.sender = sender
+        self.receivers = [receivers] if isinstance(receivers, str) else list(receivers)
+        self.digest_interval = digest_interval
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.undelivered_path = undelivered_path
+        self.subject_prefix = subject_prefix
+        self.smtp_factory = smtp_factory
+
+        # {category: [device_name]} recorded since the last digest and the totals for the run
+        self.recorded = {}
+        self.totals = {}
+        self.sent = 0
+        self.undelivered = 0
+        self.lock = threading.Lock()
+
+        self.pending = queue.Queue()
+        self.stopped = threading.Event()
+        self.sender_thread = threading.Thread(target=self.sendLoop, name="Notifier")
+        self.sender_thread.daemon = True
+        self.sender_thread.start()
+
+    """
+    Queue a message, returns straight away
+    """
+    def notify(self, subject, body):
+        self.pending.put((subject, body))
+
+    """
+    Record an event for the next digest e.g. record("corrupt_flash", "AP-1")
+    """
+    def record(self, category, device_name):
+        with self.lock:
+            self.recorded.setdefault(category, []).append(device_name)
+            self.totals[category] = self.totals.get(category, 0) + 1
+
+    """
+    Take the events recorded since the last digest
+    Returns - (subject, body), None if nothing has been recorded
+    """
+    def takeDigest(self):
+        with self.lock:
+            if not self.recorded:
+                return None
+            recorded, self.recorded = self.recorded, {}
+            totals = dict(self.totals)
+
+        lines = []
+        for category in sorted(totals):
+            new_names = recorded.get(category, [])
+            lines.append(str(totals[category]) + " " + category + " found so far, " + str(len(new_names)) +
+                         " since the last update")
+            for device_name in new_names[:self.DIGEST_NAMES]:
+                lines.append("  " + device_name)
+            if len(new_names) > self.DIGEST_NAMES:
+                lines.append("  and " + str(len(new_names) - self.DIGEST_NAMES) + " more")
+
+        summary = ", ".join(str(totals[category]) + " " + category for category in sorted(totals))
+
+        return "Update - " + summary, "\n".join(lines)
+
+    def sendLoop(self):
+        next_digest = time.time() + self.digest_interval
+
+        while True:
+            wait = None
+            if self.digest_interval > 0:
+                wait = max(next_digest - time.time(), 0)
+
+            try:
+                item = self.pending.get(timeout=wait)
+            except queue.Empty:
+                item = False
+
+            if self.digest_interval > 0 and time.time() >= next_digest:
+                next_digest = time.time() + self.digest_interval
+                digest = self.takeDigest()
+                if digest is not None:
+                    self.deliver(*digest)
+
+            if item is None:
+                return
+            if item:
+                self.deliver(*item)
+
+    """
+    Send a message, retried up to max_attempts then written to undelivered_path
+    """
+    def deliver(self, subject, body):
+        message = EmailMessage()
+        message["Subject"] = self.subject_prefix + " - " + subject if self.subject_prefix else subject
+        message["From"] = self.sender
+        message["To"] = ", ".join(self.receivers)
+        message.set_content(body)
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.send(message)
+                self.sent += 1
+                return
+            except (smtplib.SMTPException, OSError) as error:
+                print("Email Failed (attempt " + str(attempt) + " of " + str(self.max_attempts) + "): ", error)
+                # Closing down does not wait out the retries, the message is kept in undelivered_path instead
+                if attempt < self.max_attempts and not self.stopped.wait(self.retry_delay):
+                    continue
+                break
+
+        self.undelivered += 1
+        self.writeUndelivered(message)
+
+    """
+    Connect to the relay, send and disconnect, so no connection is left idle for the relay to time out
+    """
+    def send(self, message):
+        smtp_server = self.smtp_factory(self.smtp_host, self.smtp_port, timeout=self.timeout)
+        try:
+            smtp_server.send_message(message)
+        finally:
+            try:
+                smtp_server.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp_server.close()
+
+    def writeUndelivered(self, message):
+        if self.undelivered_path is None:
+            print(message.as_string())
+            return
+
+        with open(self.undelivered_path, "a") as undelivered_file:
+            undelivered_file.write(message.as_string() + "\n")
+
+    """
+    Send everything queued then stop the sender, no further digests are sent so the last message queued e.g. the
+    results of the run should cover everything recorded
+    timeout - seconds failed sends are retried for, each message still queued is tried once when not set
+    """
+    def close(self, timeout=None):
+        if not self.sender_thread.is_alive():
+            return
+
+        self.pending.put(None)
+        if timeout is not None:
+            self.sender_thread.join(timeout)
+        self.stopped.set()
+        self.sender_thread.join()
@@ -0,0 +1,333 @@
+"""
+# Title: Output Archive
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Keeps the AP session output of every run in compressed segment files with an index by run and device,
+so one AP's output or every AP that logged an error can be found without walking thousands of text files
+# Notes:
+0.1 - Created OutputArchive - Each output is compressed on its own and appended to a segment file, segments are
+      rolled at max_segment_bytes and read back through mmap
+    - SQLite index of the segment and offset of each output by run and device, indexed rows committed in batches
+    - Token index of common error strings matched as each output is written, searched without reading the output
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import argparse
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class OutputArchive(object):
+    # Error strings indexed as each output is written >> token name: pattern
+    TOKENS = {"fsck_error": r"Error fscking",
+              "filesys_error": r"%FILESYS",
+              "io_error": r"I/O error",
+              "bad_block": r"[Bb]ad (?:block|sector)",
+              "corrupt": r"[Cc]orrupt(?:ed|ion)?\b",
+              "signature_mismatch": r"Computed signature",
+              "session_terminated": r"session_terminated",
+              "ping_failed": r"ping_failed"}
+
+    # Preset dictionary of text common to AP output, outputs are a few KB so on their own zlib has little to go on.
+    # Text every output has is last where zlib finds it cheapest. Saved in the index when the archive is created
+    # and read back from there, so outputs stay readable if it is changed
+    ZDICT = ("Cisco Wireless Lan Controller AIR-CAP3702I-E-K9 AIR-AP1832I-E-K9 AIR-AP2802I-E-K9 Model Number  : "
+             "processor (revision A0) with K bytes of memory. ROM: Bootstrap program is C3700 boot loader "
+             "System returned to ROM by power-on reload System image file is \"flash:/ap3g2-k9w8-mx. "
+             "Cisco IOS Software, C3700 Software (AP3G2-K9W8-MX), Version 15.3(3)JD, RELEASE SOFTWARE (fc1)\n"
+             "Technical Support: http://www.cisco.com/techsupport\n uptime is days, hours, minutes\n"
+             "show version | include uptime\nshow log | include \"AP image\"\nterminal length 0\n"
+             "debug capwap console cli\nno debug all\nfsck flash:\nError fscking\n%FILESYS-3-FLASH: \n"
+             "%Error opening flash: (I/O error)\nComputed signature = \nSubmitted signature = \n"
+             "Directory of flash:/\n  -rwx  drwx   Jan 1 2018 00:01:12 +00:00  private-config env_vars\n"
+             "bytes total ( bytes free)\nverify /md5 flash:ap3g2-k9w8-mx.ap_smr3_esc/ap3g2-k9w8-mx.ap_smr3_esc "
+             ".......................................Done!\nverify /md5 (flash:) = \nVerified (flash:) = \n"
+             "enable\nPassword: \nsession_terminated ping_failed\n").encode("utf-8")
+
+    SCHEMA = ["CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value BLOB)",
+              "CREATE TABLE IF NOT EXISTS records (id INTEGER PRIMARY KEY, run TEXT, device TEXT, name TEXT, "
+              "segment TEXT, offset INTEGER, length INTEGER, size INTEGER, crc INTEGER, written REAL)",
+              "CREATE INDEX IF NOT EXISTS records_device ON records (device, run)",
+              "CREATE INDEX IF NOT EXISTS records_run ON records (run)",
+              "CREATE INDEX IF NOT EXISTS records_written ON records (written)",
+              "CREATE TABLE IF NOT EXISTS tokens (token TEXT, record_id INTEGER, PRIMARY KEY (token, record_id)) "
+              "WITHOUT ROWID"]
+
+    FIELDS = ("id", "run", "device", "name", "segment", "offset", "length", "size", "crc", "written")
+
+    """
+    archive_dir - directory of the segment files and index.db, shared by every run
+    tokens - dict {token name: pattern} matched as each output is written, TOKENS when not set, {} for no token index
+    max_segment_bytes - compressed bytes written to a segment before the next segment is started
+    compress_level - zlib level each output is compressed with
+    batch_size - outputs written before their index rows are committed, commit() commits the rest
+    """
+    def __init__(self, archive_dir, tokens=None, max_segment_bytes=64 * 1024 * 1024, compress_level=6,
+                 batch_size=500):
+        self.archive_dir = archive_dir
+        self.tokens = self.TOKENS if tokens is None else tokens
+        self.max_segment_bytes = max_segment_bytes
+        self.compress_level = compress_level
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+
+        # One alternation with a named group per token, each output is only scanned once
+        self.token_pattern = None
+        if self.tokens:
+            self.token_pattern = re.compile("|".join("(?P<" + token + ">" + pattern + ")"
+                                                     for token, pattern in self.tokens.items()))
+
+        os.makedirs(archive_dir, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(archive_dir, "index.db"), timeout=60, isolation_level=None,
+                                  check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        for statement in self.SCHEMA:
+            self.db.execute(statement)
+        self.db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('zdict', ?)", (self.ZDICT,))
+        self.zdict = bytes(self.db.execute("SELECT value FROM meta WHERE key = 'zdict'").fetchone()[0])
+
+        # Segments are named by the process writing them so workers sharing the archive never append to one file
+        self.segment_prefix = time.strftime("%y%m%d%H%M%S") + "-" + str(os.getpid())
+        self.segment_count = 0
+        self.segment = None
+        self.segment_file = None
+        self.segment_size = 0
+        self.pending = []
+
+        # {segment: mmap} of the segments read from
+        self.views = {}
+
+    def startSegment(self):
+        if self.segment_file is not None:
+            self.segment_file.close()
+
+        self.segment_count += 1
+        self.segment = self.segment_prefix + "-" + "%04d" % self.segment_count + ".seg"
+        self.segment_file = open(os.path.join(self.archive_dir, self.segment), "ab")
+        self.segment_size = 0
+
+    """
+    Compress and append an output to the current segment, its index rows are committed with the batch
+    run - name of the run e.g. the exec_time of the scan
+    device - device name the output is looked up by
+    name - name of the output e.g. AP-1_ping_failed
+    Returns - string >> archive_dir:run/name
+    """
+    def add(self, run, device, name, data):
+        text = data if isinstance(data, str) else data.decode("utf-8", "replace")
+        data = text.encode("utf-8")
+        tokens = set()
+        if self.token_pattern is not None:
+            tokens = set(match.lastgroup for match in self.token_pattern.finditer(text))
+        compressor = zlib.compressobj(self.compress_level, zdict=self.zdict)
+        compressed = compressor.compress(data) + compressor.flush()
+
+        with self.lock:
+            if self.segment_file is None or self.segment_size + len(compressed) > self.max_segment_bytes:
+                self.startSegment()
+
+            offset = self.segment_size
+            self.segment_file.write(compressed)
+            self.segment_size += len(compressed)
+            self.pending.append((run, device, name, self.segment, offset, len(compressed), len(data),
+                                 zlib.crc32(data), time.time(), tokens))
+
+            if len(self.pending) >= self.batch_size:
+                self.commitPending()
+
+        return self.archive_dir + ":" + run + "/" + name
+
+    """
+    Commit the index rows of the outputs written since the last commit
+    """
+    def commit(self):
+        with self.lock:
+            self.commitPending()
+
+    def commitPending(self):
+        if not self.pending:
+            return
+
+        # The outputs are on disk before their index rows, a crash leaves unindexed bytes rather than bad rows
+        self.segment_file.flush()
+
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            for row in self.pending:
+                record_id = self.db.execute("INSERT INTO records (run, device, name, segment, offset, length, size, "
+                                            "crc, written) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row[:9]).lastrowid
+                self.db.executemany("INSERT OR IGNORE INTO tokens (token, record_id) VALUES (?, ?)",
+                                    [(token, record_id) for token in row[9]])
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+
+        self.pending = []
+
+    """
+    Records in the index, every filter that is set must match
+    device - device name, run - run name, token - token name from tokens
+    since - time.time() the record was written at or after
+    Returns - list of record dicts in segment and offset order, so reading them moves forward through each segment
+    """
+    def records(self, device=None, run=None, token=None, since=None):
+        query = "SELECT " + ", ".join("records." + field for field in self.FIELDS) + " FROM records"
+        conditions = []
+        params = []
+        if token is not None:
+            query += " JOIN tokens ON tokens.record_id = records.id AND tokens.token = ?"
+            params.append(token)
+        if device is not None:
+            conditions.append("records.device = ?")
+            params.append(device)
+        if run is not None:
+            conditions.append("records.run = ?")
+            params.append(run)
+        if since is not None:
+            conditions.append("records.written >= ?")
+            params.append(since)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY records.segment, records.offset"
+
+        with self.lock:
+            return [dict(zip(self.FIELDS, row)) for row in self.db.execute(query, params).fetchall()]
+
+    """
+    Returns - memory map of a segment, mapped again if the segment has grown past the end of the last map
+    """
+    def segmentView(self, segment, end):
+        view = self.views.get(segment)
+        if view is None or len(view) < end:
+            if view is not None:
+                view.close()
+
+            with open(os.path.join(self.archive_dir, segment), "rb") as segment_file:
+                view = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.views[segment] = view
+
+        return view
+
+    """
+    Read an output back from its segment
+    record - record dict from records()
+    Returns - string of the output
+    Raises - ValueError if the output does not match the checksum it was written with
+    """
+    def read(self, record):
+        with self.lock:
+            if record["segment"] == self.segment:
+                self.segment_file.flush()
+            view = self.segmentView(record["segment"], record["offset"] + record["length"])
+            compressed = view[record["offset"]:record["offset"] + record["length"]]
+
+        data = zlib.decompressobj(zdict=self.zdict).decompress(compressed)
+
+        if zlib.crc32(data) != record["crc"]:
+            raise ValueError("Output " + record["run"] + "/" + record["name"] + " in " + record["segment"] +
+                             " is corrupt")
+
+        return data.decode("utf-8", "replace")
+
+    """
+    Every output of a device, oldest run first
+    Returns - list of (record dict, output string)
+    """
+    def lookup(self, device, run=None):
+        records = sorted(self.records(device=device, run=run), key=lambda record: record["id"])
+
+        return [(record, self.read(record)) for record in records]
+
+    """
+    Search the outputs for a regex, narrowed first through the index
+    pattern - regex matched against each line, None to return every record the filters select
+    device, run, token, since - filters as records()
+    Yields - (record dict, list of matching lines)
+    """
+    def search(self, pattern=None, device=None, run=None, token=None, since=None):
+        line_pattern = re.compile(pattern) if pattern is not None else None
+
+        for record in self.records(device=device, run=run, token=token, since=since):
+            if line_pattern is None:
+                yield record, []
+                continue
+
+            # Most outputs do not match, only those that do are split into lines
+            output = self.read(record)
+            if line_pattern.search(output) is None:
+                continue
+
+            yield record, [line for line in output.splitlines() if line_pattern.search(line)]
+
+    """
+    Returns - dict {token: number of outputs it was found in}
+    """
+    def tokenCounts(self, since=None):
+        query = "SELECT token, COUNT(*) FROM tokens"
+        params = []
+        if since is not None:
+            query += " JOIN records ON records.id = tokens.record_id WHERE records.written >= ?"
+            params.append(since)
+        query += " GROUP BY token"
+
+        with self.lock:
+            return dict(self.db.execute(query, params).fetchall())
+
+    """
+    Commit the index and close the segment and the maps
+    """
+    def close(self):
+        with self.lock:
+            self.commitPending()
+            if self.segment_file is not None:
+                self.segment_file.close()
+                self.segment_file = None
+                self.segment = None
+
+            for view in self.views.values():
+                view.close()
+            self.views = {}
+            self.db.close()
+
+
+# ++++++++++++++++++++++ Main Method ++++++++++++++++++++++
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Look up and search the AP output archive")
+    parser.add_argument("--archive", default="ap_corrupt_flash_archive", help="output archive directory")
+    parser.add_argument("--device", default=None, help="only outputs of this device")
+    parser.add_argument("--run", default=None, help="only outputs of this run")
+    parser.add_argument("--token", default=None, help="only outputs with this indexed error string")
+    parser.add_argument("--days", type=float, default=None, help="only outputs written in the last days")
+    parser.add_argument("--grep", default=None, help="regex, print the matching lines of each output")
+    parser.add_argument("--show", action="store_true", help="print the whole of each output")
+    parser.add_argument("--list-tokens", action="store_true", help="count the outputs with each indexed error string")
+    args = parser.parse_args()
+
+    output_archive = OutputArchive(args.archive)
+    since = None if args.days is None else time.time() - args.days * 86400
+
+    if args.list_tokens:
+        for token_name, count in sorted(output_archive.tokenCounts(since).items()):
+            print(token_name + " " + str(count))
+    else:
+        matched = 0
+        for found, found_lines in output_archive.search(args.grep, device=args.device, run=args.run, token=args.token,
+                                                        since=since):
+            matched += 1
+            print(found["run"] + " " + found["device"] + " " + found["name"])
+            if args.show:
+                print(output_archive.read(found))
+            for found_line in found_lines:
+                print("    " + found_line)
+        print(str(matched) + " outputs")
+
+    output_archive.close()
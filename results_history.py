@@ -0,0 +1,263 @@
+"""
+# Title: Results History
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.2
+# Purpose: SQLite history of every AP result indexed by device and run, so the changes since the last scan can be
+reported without reading back the logs of past runs
+# Notes:
+0.1 - Created ResultsHistory - Each run's results are inserted in one transaction
+    - Delta report of newly corrupt, newly fixed, still offline and flapping APs written as CSV or JSON
+    - Results JSON lines of past runs can be imported to backfill the history
+0.2 - unknown_image is stored as unverified and skipped when comparing with an AP's previous result, an AP
+      whose image is not in the manifest is neither newly fixed nor newly corrupt
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+import threading
+import time
+
+
+class ResultsHistory(object):
+    # Results are compared by state so an AP moving between e.g. valid_image and triage_clean is not a change.
+    # An unknown_image AP was not verified so it says nothing about whether the AP is corrupt
+    STATES = {"corrupt_flash": "corrupt",
+              "corrupt_image": "corrupt",
+              "ping_failed": "offline",
+              "session_terminated": "offline",
+              "unknown_image": "unverified"}
+
+    CHANGES = ("newly_corrupt", "newly_fixed", "still_offline", "flapping")
+
+    FIELDS = ("change", "device_ip", "device_name", "site", "status", "error_type", "previous_status",
+              "previous_run", "changes")
+
+    # The device_ip, run_id key gives each AP's previous result with one index seek, the state index gives the APs
+    # of a run in a state without reading the rest of the run
+    SCHEMA = ["CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, name TEXT UNIQUE, started REAL, "
+              "aps INTEGER)",
+              "CREATE TABLE IF NOT EXISTS results (device_ip TEXT, run_id INTEGER, device_name TEXT, site TEXT, "
+              "status TEXT, state TEXT, error_type TEXT, image_hash TEXT, started REAL, "
+              "PRIMARY KEY (device_ip, run_id)) WITHOUT ROWID",
+              "CREATE INDEX IF NOT EXISTS results_run_state ON results (run_id, state)"]
+
+    # Each AP's result in the run joined to its result in the last run it was scanned in before, an AP out of a
+    # shard or filter for a run is compared with the last time it was scanned. Unverified results are skipped so an
+    # AP is compared with the last time its image was verified
+    DELTA_QUERY = ("SELECT cur.device_ip, cur.device_name, cur.site, cur.status, cur.error_type, prev.status, "
+                   "prev_run.name FROM results cur "
+                   "LEFT JOIN results prev ON prev.device_ip = cur.device_ip AND prev.run_id = "
+                   "(SELECT earlier.run_id FROM results earlier WHERE earlier.device_ip = cur.device_ip "
+                   "AND earlier.run_id < cur.run_id AND earlier.state != 'unverified' "
+                   "ORDER BY earlier.run_id DESC LIMIT 1) "
+                   "LEFT JOIN runs prev_run ON prev_run.id = prev.run_id "
+                   "WHERE cur.run_id = ? AND ")
+
+    """
+    db_path - SQLite file, created if missing
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+
+        # Transactions are explicit so a run is either stored whole or not at all
+        self.db = sqlite3.connect(db_path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        for statement in self.SCHEMA:
+            self.db.execute(statement)
+
+    @classmethod
+    def state(cls, status):
+        return cls.STATES.get(status, "ok")
+
+    """
+    Store the results of a run, storing a run again replaces its results
+    run - name of the run e.g. the exec_time of the scan
+    results - iterable of APResult e.g. a ResultStore
+    Returns - number of results stored
+    """
+    def addRun(self, run, results, started=None):
+        rows = [(result.device_ip, result.device_name, result.site, result.status, self.state(result.status),
+                 result.error_type, result.image_hash, result.started) for result in results]
+
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.db.execute("SELECT id FROM runs WHERE name = ?", (run,)).fetchone()
+                if row is None:
+                    run_id = self.db.execute("INSERT INTO runs (name, started, aps) VALUES (?, ?, ?)",
+                                             (run, started or time.time(), len(rows))).lastrowid
+                else:
+                    run_id = row[0]
+                    self.db.execute("UPDATE runs SET aps = ? WHERE id = ?", (len(rows), run_id))
+                    self.db.execute("DELETE FROM results WHERE run_id = ?", (run_id,))
+
+                self.db.executemany("INSERT OR REPLACE INTO results (device_ip, run_id, device_name, site, status, "
+                                    "state, error_type, image_hash, started) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                    [(row[0], run_id) + row[1:] for row in rows])
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+
+        return len(rows)
+
+    """
+    Returns - list of (run name, started, aps) oldest first, the last count runs when count is set
+    """
+    def runs(self, count=None):
+        with self.lock:
+            rows = self.db.execute("SELECT name, started, aps FROM runs ORDER BY id DESC LIMIT ?",
+                                   (-1 if count is None else count,)).fetchall()
+
+        return rows[::-1]
+
+    def runId(self, run=None):
+        if run is None:
+            row = self.db.execute("SELECT id FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+        else:
+            row = self.db.execute("SELECT id FROM runs WHERE name = ?", (run,)).fetchone()
+
+        if row is None:
+            raise KeyError("No run " + str(run) + " in " + self.db_path)
+
+        return row[0]
+
+    def deltaRows(self, change, run_id, condition, params=()):
+        return [dict(zip(self.FIELDS, (change,) + row + (None,)))
+                for row in self.db.execute(self.DELTA_QUERY + condition, (run_id,) + params).fetchall()]
+
+    """
+    APs whose state changed at least flap_changes times over the last flap_runs runs up to and including run_id
+    """
+    def flappingRows(self, run_id, flap_runs, flap_changes):
+        first_run = self.db.execute("SELECT MIN(id) FROM (SELECT id FROM runs WHERE id <= ? ORDER BY id DESC "
+                                    "LIMIT ?)", (run_id, flap_runs)).fetchone()[0]
+
+        # Each result in the window joined to the AP's result before it, the first result in the window is
+        # compared with the AP's last result before the window. Unverified results are not a change of state.
+        # Only APs with a result in run_id are reported
+        query = ("SELECT cur.device_ip, cur.device_name, cur.site, cur.status, cur.error_type, flaps.changes FROM "
+                 "(SELECT scan.device_ip, SUM(scan.state != prev.state) AS changes FROM results scan "
+                 "JOIN results prev ON prev.device_ip = scan.device_ip AND prev.run_id = "
+                 "(SELECT earlier.run_id FROM results earlier WHERE earlier.device_ip = scan.device_ip "
+                 "AND earlier.run_id < scan.run_id AND earlier.state != 'unverified' "
+                 "ORDER BY earlier.run_id DESC LIMIT 1) "
+                 "WHERE scan.run_id BETWEEN ? AND ? AND scan.state != 'unverified' "
+                 "GROUP BY scan.device_ip HAVING changes >= ?) flaps "
+                 "JOIN results cur ON cur.device_ip = flaps.device_ip AND cur.run_id = ?")
+
+        return [dict(zip(self.FIELDS, ("flapping",) + row[:5] + (None, None, row[5])))
+                for row in self.db.execute(query, (first_run, run_id, flap_changes, run_id)).fetchall()]
+
+    """
+    Changes of a run against each AP's previous result
+    run - name of the run, the latest run when not set
+    flap_runs - runs looked back over for flapping APs
+    flap_changes - state changes within flap_runs for an AP to be flapping
+    Returns - dict {run, newly_corrupt, newly_fixed, still_offline, flapping} each a list of row dicts
+    """
+    def deltaReport(self, run=None, flap_runs=7, flap_changes=3):
+        with self.lock:
+            run_id = self.runId(run)
+            run_name = self.db.execute("SELECT name FROM runs WHERE id = ?", (run_id,)).fetchone()[0]
+
+            report = {"run": run_name,
+                      "newly_corrupt": self.deltaRows("newly_corrupt", run_id,
+                                                      "cur.state = 'corrupt' AND prev.state IS NOT 'corrupt'"),
+                      "newly_fixed": self.deltaRows("newly_fixed", run_id,
+                                                    "cur.state = 'ok' AND prev.state = 'corrupt'"),
+                      "still_offline": self.deltaRows("still_offline", run_id,
+                                                      "cur.state = 'offline' AND prev.state = 'offline'"),
+                      "flapping": self.flappingRows(run_id, flap_runs, flap_changes)}
+
+        return report
+
+    """
+    Returns - string of one line with the count of each change
+    """
+    @classmethod
+    def formatSummary(cls, report):
+        return ("Changes since the last scan: " +
+                ", ".join(str(len(report[change])) + " " + change.replace("_", " ") for change in cls.CHANGES))
+
+    @classmethod
+    def writeJSON(cls, report, report_file):
+        json.dump(report, report_file, indent=2)
+        report_file.write("\n")
+
+    """
+    Write every change as one CSV row per AP with a header row
+    """
+    @classmethod
+    def writeCSV(cls, report, report_file):
+        writer = csv.writer(report_file)
+        writer.writerow(("run",) + cls.FIELDS)
+        for change in cls.CHANGES:
+            writer.writerows([report["run"]] + [row[field] for field in cls.FIELDS] for row in report[change])
+
+    """
+    Write the report to a file
+    report_format - csv or json, taken from the file extension when not set
+    """
+    @classmethod
+    def writeReport(cls, report, file_path, report_format=None):
+        if report_format is None:
+            report_format = "csv" if file_path.endswith(".csv") else "json"
+
+        with open(file_path, "w", newline="") as report_file:
+            if "csv" == report_format:
+                cls.writeCSV(report, report_file)
+            else:
+                cls.writeJSON(report, report_file)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+# ++++++++++++++++++++++ Main Method ++++++++++++++++++++++
+if __name__ == "__main__":
+    from ap_results import APResult
+
+    parser = argparse.ArgumentParser(description="Report the AP changes between scans from the results history")
+    parser.add_argument("--history", default="ap_corrupt_flash_history.db", help="results history file")
+    parser.add_argument("--run", default=None, help="run to report on, the latest run when not set")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    parser.add_argument("--output", default=None, help="report file, printed when not set")
+    parser.add_argument("--flap-runs", type=int, default=7, help="runs looked back over for flapping APs")
+    parser.add_argument("--flap-changes", type=int, default=3, help="state changes for an AP to be flapping")
+    parser.add_argument("--import", dest="import_paths", action="append", default=[], metavar="RUN=RESULTS",
+                        help="store a run from its ap_chk_cisco_bugs_results.jsonl, can be repeated oldest first")
+    parser.add_argument("--list-runs", action="store_true", help="list the stored runs")
+    args = parser.parse_args()
+
+    history = ResultsHistory(args.history)
+
+    for import_path in args.import_paths:
+        run, results_path = import_path.split("=", 1)
+        with open(results_path) as results_file:
+            imported = [APResult.fromDict(json.loads(line)) for line in results_file if line.strip()]
+        print("Imported " + str(history.addRun(run, imported)) + " results for run " + run, file=sys.stderr)
+
+    if args.list_runs:
+        for run, started, aps in history.runs():
+            print(run + " " + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started)) + " " + str(aps) + " APs")
+    elif history.runs(1):
+        report = history.deltaReport(args.run, flap_runs=args.flap_runs, flap_changes=args.flap_changes)
+        if args.output:
+            ResultsHistory.writeReport(report, args.output, args.format)
+        elif "csv" == args.format:
+            ResultsHistory.writeCSV(report, sys.stdout)
+        else:
+            ResultsHistory.writeJSON(report, sys.stdout)
+        print(ResultsHistory.formatSummary(report), file=sys.stderr)
+
+    history.close()
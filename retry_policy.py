@@ -0,0 +1,110 @@
+"""
+# Title: Retry Policy
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.2
+# Purpose: Decide if and when an AP whose session failed is scanned again, by why the session failed
+# Notes:
+0.1 - Created RetryPolicy - Retry rules per error category with jittered exponential backoff
+    - Used by SSH_Async.iterSessions, retries are queued and run alongside the rest of the scan
+0.2 - Added isFinal so a session can tell if its result will be retried before it logs the result
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import random
+
+
+class RetryRule(object):
+    """
+    max_attempts - sessions run for the AP including the first, 1 for no retries
+    base_delay - seconds before the first retry, doubled for each retry after
+    max_delay - most seconds before a retry
+    """
+    def __init__(self, max_attempts, base_delay, max_delay):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+
+class RetryPolicy(object):
+    # Errors that clear by themselves are retried more often than ones that need someone to act
+    # auth - a wrong password would lock the account out, retried once in case the AAA server was overloaded
+    # unreachable - ping_failed or a refused connect, retried once in case the AP was reloading
+    RULES = {"timeout": RetryRule(3, 30, 300),
+             "reset": RetryRule(3, 10, 120),
+             "unreachable": RetryRule(2, 60, 120),
+             "auth": RetryRule(2, 60, 60)}
+
+    """
+    rules - dict {category: RetryRule}, RULES when not set, categories without a rule are not retried
+    category_func - returns the error category of an APResult, None if the result is final
+    result_func - returns the APResult of a session result, for sessions that return more than the APResult
+    rebuild_func - returns the parameters for the retry from the failed session parameters
+    metrics - optional RunMetrics, "retry_<category>" is counted for each retry
+    """
+    def __init__(self, rules=None, category_func=None, result_func=None, rebuild_func=None, metrics=None,
+                 random_func=random.random):
+        self.rules = self.RULES if rules is None else rules
+        self.category_func = category_func or self.resultCategory
+        self.result_func = result_func
+        self.rebuild_func = rebuild_func
+        self.metrics = metrics
+        self.random_func = random_func
+
+    """
+    Error category of an APResult, None for an AP that was scanned
+    """
+    @staticmethod
+    def resultCategory(ap_result):
+        if ap_result.status not in ("session_terminated", "ping_failed"):
+            return None
+
+        return ap_result.error_type or "error"
+
+    """
+    Check if an attempt's result is the last for the AP, the same rule retry() applies
+    attempt - the attempt that gave the result, from 1
+    Returns - True if the result will not be retried
+    """
+    def isFinal(self, ap_result, attempt):
+        category = self.category_func(ap_result)
+        rule = None if category is None else self.rules.get(category)
+
+        return rule is None or attempt >= rule.max_attempts
+
+    """
+    Seconds to wait before the next attempt, half the backoff plus up to half again at random so the APs that
+    failed together are not all retried together
+    attempt - the attempt that just failed, from 1
+    Returns - float seconds, None when the rule has no attempts left
+    """
+    def delay(self, category, attempt):
+        rule = self.rules.get(category)
+        if rule is None or attempt >= rule.max_attempts:
+            return None
+
+        backoff = min(rule.max_delay, rule.base_delay * 2 ** (attempt - 1))
+
+        return backoff / 2.0 + self.random_func() * backoff / 2.0
+
+    """
+    Called by SSH_Async.iterSessions as each session completes
+    Returns - (delay, params) to run the session again after delay seconds, None if the result is final
+    """
+    def retry(self, params, result, attempt):
+        ap_result = result if self.result_func is None else self.result_func(result)
+        category = self.category_func(ap_result)
+        retry_delay = None if category is None else self.delay(category, attempt)
+
+        if retry_delay is None:
+            ap_result.attempts = attempt
+            return None
+
+        if self.metrics is not None:
+            self.metrics.increment("retry_" + category)
+
+        if self.rebuild_func is not None:
+            params = self.rebuild_func(params)
+
+        return retry_delay, params
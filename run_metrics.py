@@ -0,0 +1,163 @@
+"""
+# Title: Run Metrics
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Time each phase of the AP sessions in a run and report the throughput of the run as it progresses
+# Notes:
+0.1 - Created RunMetrics - Phase timings with percentiles written as JSON and Prometheus text format
+    - Created ProgressCounter - Completed APs, rate and ETA printed as results come in
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import json
+import math
+import threading
+import time
+
+
+class RunMetrics(object):
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    """
+    prefix - metric name prefix used in the Prometheus output
+    """
+    def __init__(self, prefix="ap_chk"):
+        self.prefix = prefix
+        self.started = time.time()
+        self.samples = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    """
+    Record the seconds a phase took
+    """
+    def record(self, phase, seconds):
+        with self.lock:
+            self.samples.setdefault(phase, []).append(seconds)
+
+    def increment(self, counter, value=1):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    """
+    Nearest rank percentile of a sorted list
+    """
+    @staticmethod
+    def percentile(ordered, quantile):
+        rank = max(int(math.ceil(quantile * len(ordered))) - 1, 0)
+
+        return ordered[rank]
+
+    """
+    Returns - dict {phase: {count, sum, min, max, mean, p50, p90, p99}}
+    """
+    def summary(self):
+        with self.lock:
+            samples = dict((phase, sorted(values)) for phase, values in self.samples.items())
+
+        phases = {}
+        for phase, ordered in samples.items():
+            stats = {"count": len(ordered),
+                     "sum": sum(ordered),
+                     "min": ordered[0],
+                     "max": ordered[-1]}
+            stats["mean"] = stats["sum"] / stats["count"]
+
+            for quantile in self.QUANTILES:
+                stats["p" + str(int(quantile * 100))] = self.percentile(ordered, quantile)
+
+            phases[phase] = stats
+
+        return phases
+
+    def toDict(self):
+        with self.lock:
+            counters = dict(self.counters)
+
+        return {"started": self.started,
+                "elapsed": time.time() - self.started,
+                "counters": counters,
+                "phases": self.summary()}
+
+    def writeJSON(self, file_path):
+        with open(file_path, "w") as metrics_file:
+            json.dump(self.toDict(), metrics_file, indent=2, sort_keys=True)
+
+    """
+    Write the phases as a Prometheus summary and the counters as Prometheus counters
+    """
+    def writePrometheus(self, file_path):
+        metrics = self.toDict()
+        phase_metric = self.prefix + "_phase_seconds"
+        counter_metric = self.prefix + "_events_total"
+
+        lines = ["# HELP " + phase_metric + " Seconds taken by each phase of an AP session",
+                 "# TYPE " + phase_metric + " summary"]
+        for phase, stats in sorted(metrics["phases"].items()):
+            for quantile in self.QUANTILES:
+                lines.append(phase_metric + '{phase="' + phase + '",quantile="' + str(quantile) + '"} ' +
+                             repr(stats["p" + str(int(quantile * 100))]))
+            lines.append(phase_metric + '_sum{phase="' + phase + '"} ' + repr(stats["sum"]))
+            lines.append(phase_metric + '_count{phase="' + phase + '"} ' + str(stats["count"]))
+
+        lines.append("# HELP " + counter_metric + " Count of each event in the run")
+        lines.append("# TYPE " + counter_metric + " counter")
+        for counter, value in sorted(metrics["counters"].items()):
+            lines.append(counter_metric + '{event="' + counter + '"} ' + str(value))
+
+        lines.append("# HELP " + self.prefix + "_run_seconds Seconds since the run started")
+        lines.append("# TYPE " + self.prefix + "_run_seconds gauge")
+        lines.append(self.prefix + "_run_seconds " + repr(metrics["elapsed"]))
+
+        with open(file_path, "w") as metrics_file:
+            metrics_file.write("\n".join(lines) + "\n")
+
+
+class ProgressCounter(object):
+    """
+    total - number of APs in the run
+    interval - seconds between progress lines
+    """
+    def __init__(self, total, interval=10, label="APs"):
+        self.total = total
+        self.interval = interval
+        self.label = label
+        self.done = 0
+        self.started = time.time()
+        self.last_print = self.started
+        self.lock = threading.Lock()
+
+    """
+    Count completed APs, a progress line is printed at most every interval seconds and when the run completes
+    """
+    def update(self, count=1):
+        with self.lock:
+            self.done += count
+            now = time.time()
+            if now - self.last_print < self.interval and self.done < self.total:
+                return
+
+            self.last_print = now
+            progress = self.format(now)
+
+        print(progress)
+
+    """
+    Returns - string >> Progress 1200/5000 APs (24.0%) - 35.2/s - ETA 0:01:48
+    """
+    def format(self, now=None):
+        elapsed = (now or time.time()) - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+
+        progress = "Progress " + str(self.done) + "/" + str(self.total) + " " + self.label
+        if self.total:
+            progress += " (" + "%.1f" % (100.0 * self.done / self.total) + "%)"
+        progress += " - " + "%.1f" % rate + "/s"
+
+        if rate > 0 and self.done < self.total:
+            eta = int((self.total - self.done) / rate)
+            progress += " - ETA " + "%d:%02d:%02d" % (eta // 3600, eta % 3600 // 60, eta % 60)
+
+        return progress
@@ -0,0 +1,81 @@
+"""
+# Title: Scan Journal
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.3
+# Purpose: Append only record of each AP result as it completes so an interrupted scan can be resumed
+# Notes:
+0.1 - Created ScanJournal - One JSON line per AP, flushed and synced to disk as each result is written
+0.2 - Journal APResult records
+0.3 - triage_clean and unknown_image results are classified
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import json
+import os
+import threading
+import time
+
+
+class ScanJournal(object):
+    # Results that are final, ping_failed and session_terminated APs are scanned again on resume
+    CLASSIFIED = ("valid_image", "corrupt_image", "corrupt_flash", "triage_clean", "unknown_image")
+
+    def __init__(self, journal_path):
+        self.journal_path = journal_path
+        self.journal = open(journal_path, "a")
+        self.lock = threading.Lock()
+
+        # Start on a new line if the last run was killed part way through a write
+        if self.journal.tell() > 0:
+            with open(journal_path, "rb") as journal:
+                journal.seek(-1, os.SEEK_END)
+                if journal.read(1) != b"\n":
+                    self.journal.write("\n")
+
+    """
+    Append an APResult to the journal
+    """
+    def record(self, ap_result, exec_time=""):
+        entry = ap_result.toDict()
+        entry["time"] = time.time()
+        entry["run"] = exec_time
+
+        with self.lock:
+            self.journal.write(json.dumps(entry) + "\n")
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+
+    def close(self):
+        with self.lock:
+            self.journal.close()
+
+    """
+    Read the journal back, skipping a partly written last line left by a crash
+    Returns - dict {device_ip: entry} of the latest classified result for each AP within window seconds
+    """
+    def loadRecent(self, window):
+        recent = {}
+        oldest = time.time() - window
+
+        if not os.path.isfile(self.journal_path):
+            return recent
+
+        with open(self.journal_path, "r") as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+
+                if entry["time"] < oldest:
+                    continue
+
+                if entry["status"] in self.CLASSIFIED:
+                    recent[entry["device_ip"]] = entry
+                else:
+                    # A later failure means the AP needs scanning again
+                    recent.pop(entry["device_ip"], None)
+
+        return recent
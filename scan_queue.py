@@ -0,0 +1,288 @@
+"""
+# Title: Scan Queue
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.4
+# Purpose: SQLite work queue of AP scan jobs shared by a coordinator and local or remote workers
+# Notes:
+0.1 - Created ScanQueue - Workers lease jobs in batches, leases that expire are handed to another worker
+    - ScanQueueManager serves the queue over a socket so workers on other hosts can lease jobs
+    - Jobs only hold the AP details, workers use their own credentials
+0.2 - Queueing a run expires the jobs left by earlier runs, so workers only lease and wait on the current run
+0.3 - Reporting results renews the worker's other leases, a batch is only handed out again once its worker goes quiet
+0.4 - iterResults fails the jobs no worker has leased within stall_timeout and hands out the leases of exited workers
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+from multiprocessing.managers import BaseManager
+import json
+import sqlite3
+import threading
+import time
+
+
+class ScanQueue(object):
+    SCHEMA = ["CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY, run TEXT, device_ip TEXT, "
+              "device_name TEXT, site TEXT, state TEXT, worker TEXT, leased_until REAL, attempts INTEGER)",
+              "CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, run)",
+              "CREATE TABLE IF NOT EXISTS results (id INTEGER PRIMARY KEY, job_id INTEGER, run TEXT, worker TEXT, "
+              "result TEXT)",
+              "CREATE INDEX IF NOT EXISTS results_run ON results (run, id)"]
+
+    """
+    db_path - SQLite file, local workers open the same file
+    lease_timeout - seconds a worker has to report a result before its leased jobs are handed to another worker
+    max_attempts - leases of a job before it is failed as session_terminated
+    """
+    def __init__(self, db_path, lease_timeout=1800, max_attempts=3):
+        self.db_path = db_path
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+
+        # Transactions are explicit, BEGIN IMMEDIATE stops two workers leasing the same job
+        self.db = sqlite3.connect(db_path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        for statement in self.SCHEMA:
+            self.db.execute(statement)
+
+    def transaction(self, statements):
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self.db)
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+
+        return result
+
+    """
+    Queue a job for each device, jobs of earlier runs that were not done e.g. from an interrupted coordinator are
+    expired so they are not leased again or waited on
+    devices - iterable of DeviceInventory Device
+    Returns - number of jobs queued
+    """
+    def put(self, run, devices):
+        rows = [(run, device.ip, device.name, device.site, "pending", "", 0, 0) for device in devices]
+
+        def insert(db):
+            db.execute("UPDATE jobs SET state = 'expired' WHERE state IN ('pending', 'leased') AND run != ?", (run,))
+            db.executemany("INSERT INTO jobs (run, device_ip, device_name, site, state, worker, leased_until, "
+                           "attempts) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+        self.transaction(insert)
+
+        return len(rows)
+
+    """
+    Lease up to count jobs, pending jobs and jobs whose lease has expired are handed out oldest first
+    sites - only lease jobs for these sites, so a worker close to a region takes that region's APs
+    Returns - list of job dicts >> job_id, run, device_ip, device_name, site, attempts
+    """
+    def lease(self, worker, count, sites=None):
+        now = time.time()
+        query = ("SELECT id, run, device_ip, device_name, site, attempts FROM jobs "
+                 "WHERE (state = 'pending' OR (state = 'leased' AND leased_until < ?))")
+        params = [now]
+        if sites:
+            query += " AND site IN (" + ", ".join("?" for site in sites) + ")"
+            params.extend(sites)
+        query += " ORDER BY id LIMIT ?"
+        params.append(count)
+
+        def leaseJobs(db):
+            jobs = []
+            for job_id, run, device_ip, device_name, site, attempts in db.execute(query, params).fetchall():
+                if attempts >= self.max_attempts:
+                    # Every worker that leased this AP has failed to report back
+                    self.failJob(db, job_id, run, device_ip, device_name)
+                    continue
+
+                jobs.append({"job_id": job_id, "run": run, "device_ip": device_ip, "device_name": device_name,
+                             "site": site, "attempts": attempts + 1})
+
+            db.executemany("UPDATE jobs SET state = 'leased', worker = ?, leased_until = ?, attempts = attempts + 1 "
+                           "WHERE id = ?", [(worker, now + self.lease_timeout, job["job_id"]) for job in jobs])
+            return jobs
+
+        return self.transaction(leaseJobs)
+
+    def failJob(self, db, job_id, run, device_ip, device_name, error=None):
+        result = {"status": "session_terminated", "device_name": device_name, "device_ip": device_ip,
+                  "error": error or "lease expired " + str(self.max_attempts) + " times"}
+        db.execute("UPDATE jobs SET state = 'done' WHERE id = ?", (job_id,))
+        db.execute("INSERT INTO results (job_id, run, worker, result) VALUES (?, ?, ?, ?)",
+                   (job_id, run, "", json.dumps(result)))
+
+    """
+    Report the results of leased jobs
+    results - list of (job_id, result dict), results for jobs this worker no longer holds the lease for are dropped
+    Returns - number of results accepted
+    """
+    def complete(self, worker, results):
+        def completeJobs(db):
+            # The worker is still scanning, the rest of its batch is not handed out while it keeps reporting
+            db.execute("UPDATE jobs SET leased_until = ? WHERE state = 'leased' AND worker = ?",
+                       (time.time() + self.lease_timeout, worker))
+
+            accepted = 0
+            for job_id, result in results:
+                row = db.execute("SELECT run FROM jobs WHERE id = ? AND state = 'leased' AND worker = ?",
+                                 (job_id, worker)).fetchone()
+                if row is None:
+                    continue
+
+                db.execute("UPDATE jobs SET state = 'done' WHERE id = ?", (job_id,))
+                db.execute("INSERT INTO results (job_id, run, worker, result) VALUES (?, ?, ?, ?)",
+                           (job_id, row[0], worker, json.dumps(result)))
+                accepted += 1
+
+            return accepted
+
+        return self.transaction(completeJobs)
+
+    """
+    Returns - number of jobs pending or leased, for one run or every run
+    """
+    def pending(self, run=None):
+        with self.lock:
+            if run is None:
+                return self.db.execute("SELECT COUNT(*) FROM jobs WHERE state IN ('pending', 'leased')").fetchone()[0]
+
+            return self.db.execute("SELECT COUNT(*) FROM jobs WHERE state IN ('pending', 'leased') AND run = ?",
+                                   (run,)).fetchone()[0]
+
+    """
+    Returns - number of jobs of the run a worker holds a lease on that has not expired
+    """
+    def leased(self, run):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM jobs WHERE state = 'leased' AND run = ? AND leased_until >= ?",
+                                   (run, time.time())).fetchone()[0]
+
+    """
+    Expire the leases of a worker that has exited so its jobs are handed out again straight away
+    """
+    def release(self, worker):
+        self.transaction(lambda db: db.execute("UPDATE jobs SET leased_until = 0 WHERE state = 'leased' AND worker = ?",
+                                               (worker,)))
+
+    """
+    Fail the jobs of a run that no worker holds a live lease on, they are reported as session_terminated
+    Returns - number of jobs failed
+    """
+    def failUnleased(self, run, error):
+        def failJobs(db):
+            rows = db.execute("SELECT id, run, device_ip, device_name FROM jobs WHERE run = ? AND (state = 'pending' "
+                              "OR (state = 'leased' AND leased_until < ?))", (run, time.time())).fetchall()
+            for job_id, job_run, device_ip, device_name in rows:
+                self.failJob(db, job_id, job_run, device_ip, device_name, error)
+
+            return len(rows)
+
+        return self.transaction(failJobs)
+
+    """
+    Returns - list of (result_id, worker, result dict) for the run after result_id
+    """
+    def fetchResults(self, run, after_id=0, limit=1000):
+        with self.lock:
+            rows = self.db.execute("SELECT id, worker, result FROM results WHERE run = ? AND id > ? ORDER BY id "
+                                   "LIMIT ?", (run, after_id, limit)).fetchall()
+
+        return [(result_id, worker, json.loads(result)) for result_id, worker, result in rows]
+
+    """
+    Yield each result of the run as workers report it until every job of the run is done
+    stall_timeout - seconds without a result or a live lease before the jobs left are failed, None to wait for workers
+    dead_workers - returns the names of workers that have exited, their leases are handed out again
+    Returns - generator of (worker, result dict)
+    """
+    def iterResults(self, run, poll_interval=2, stall_timeout=None, dead_workers=None):
+        after_id = 0
+        last_active = time.time()
+        while True:
+            # Check before fetching so results reported while fetching are not missed
+            remaining = self.pending(run)
+            results = self.fetchResults(run, after_id)
+
+            for result_id, worker, result in results:
+                after_id = result_id
+                yield worker, result
+
+            if results:
+                last_active = time.time()
+                continue
+
+            if remaining == 0:
+                return
+
+            # A worker that has exited never reports the jobs it leased
+            if dead_workers is not None:
+                for worker in dead_workers():
+                    self.release(worker)
+
+            if self.leased(run) > 0:
+                last_active = time.time()
+            elif stall_timeout is not None and time.time() - last_active >= stall_timeout:
+                # Every worker has gone or none was started, nothing is left to lease the jobs
+                self.failUnleased(run, "not leased by a worker for " + str(int(stall_timeout)) + " seconds")
+                continue
+
+            time.sleep(poll_interval)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class ScanQueueManager(BaseManager):
+    pass
+
+
+# Workers use their own manager class so a coordinator can serve and connect from one process
+class ScanQueueClient(BaseManager):
+    pass
+
+
+ScanQueueClient.register("getQueue")
+
+
+"""
+Serve a ScanQueue on address (host, port) from a background thread for workers on other hosts
+Returns - the manager server
+"""
+def serveQueue(scan_queue, address, authkey):
+    ScanQueueManager.register("getQueue", callable=lambda: scan_queue)
+    server = ScanQueueManager(address=address, authkey=authkey).get_server()
+
+    server_thread = threading.Thread(target=server.serve_forever, name="ScanQueueServer")
+    server_thread.daemon = True
+    server_thread.start()
+
+    return server
+
+
+"""
+Connect to a ScanQueue served by serveQueue
+Returns - proxy with the ScanQueue lease, complete and pending methods
+"""
+def connectQueue(address, authkey):
+    manager = ScanQueueClient(address=address, authkey=authkey)
+    manager.connect()
+
+    return manager.getQueue()
+
+
+"""
+Parse "host:port"
+Returns - (host, port)
+"""
+def parseAddress(address):
+    host, port = address.rsplit(":", 1)
+
+    return host, int(port)
@@ -0,0 +1,212 @@
+"""
+# Title: SSH Profile
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.3
+# Purpose: Algorithm preferences and known host keys for the SSH connections of a run, so the key exchange
+each scan pays for thousands of times can be picked and host keys are checked without a per connection file read
+# Notes:
+0.1 - Created SSHProfile - kex, cipher, MAC, host key and compression preferences applied to each Transport
+    - Created KnownHostsCache - known_hosts loaded once, new host keys are written back in bulk at the end of a run
+0.2 - A known host offering a key of a type that is not cached for it is refused rather than added
+0.3 - Added requires - A profile whose target algorithms the installed paramiko lacks is refused instead of silently
+      negotiating something else, ap-ios also offers diffie-hellman-group1-sha1
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import threading
+import paramiko
+
+
+class SSHProfile(object):
+    # Host key algorithms a cached key of each type is checked with, the cached type is offered first
+    KEY_ALGORITHMS = {"ssh-rsa": ("rsa-sha2-512", "rsa-sha2-256", "ssh-rsa"),
+                      "ssh-ed25519": ("ssh-ed25519",),
+                      "ecdsa-sha2-nistp256": ("ecdsa-sha2-nistp256",),
+                      "ecdsa-sha2-nistp384": ("ecdsa-sha2-nistp384",),
+                      "ecdsa-sha2-nistp521": ("ecdsa-sha2-nistp521",)}
+
+    # Transport tables of the algorithms the installed paramiko supports, some releases no longer have the sha1 kex
+    # or ssh-rsa
+    SUPPORTED = {"kex": "_kex_info",
+                 "ciphers": "_cipher_info",
+                 "digests": "_mac_info",
+                 "key_types": "_key_info"}
+
+    """
+    name - name the profile is picked by e.g. --ssh-profile
+    kex, ciphers, digests, key_types - algorithms in order of preference, None to keep the paramiko default.
+                                       Algorithms the installed paramiko does not support are left out
+    compression - True to offer zlib, False to only offer none, None to keep the paramiko default
+    requires - dict {option: algorithms} the devices the profile is for need one of, e.g. the sha1 kex of old IOS
+    """
+    def __init__(self, name, kex=None, ciphers=None, digests=None, key_types=None, compression=None, requires=None):
+        self.name = name
+        self.preferences = {}
+        for option, preferred in (("kex", kex), ("ciphers", ciphers), ("digests", digests),
+                                  ("key_types", key_types)):
+            if preferred is None:
+                continue
+
+            supported = getattr(paramiko.Transport, self.SUPPORTED[option])
+            self.preferences[option] = tuple(algorithm for algorithm in preferred if algorithm in supported)
+            if not self.preferences[option]:
+                raise ValueError("None of the " + option + " of SSH profile " + name + " are supported by paramiko " +
+                                 paramiko.__version__)
+
+        self.compression = compression
+
+        # Options the installed paramiko cannot offer any of the required algorithms for
+        self.unsupported = {}
+        for option, required in (requires or {}).items():
+            supported = getattr(paramiko.Transport, self.SUPPORTED[option])
+            if not any(algorithm in supported for algorithm in required):
+                self.unsupported[option] = tuple(required)
+
+    """
+    Raises - ValueError if the installed paramiko cannot offer the algorithms the profile is for
+    """
+    def check(self):
+        if not self.unsupported:
+            return
+
+        needs = " and ".join("one of the " + option + " " + ", ".join(required)
+                             for option, required in self.unsupported.items())
+        raise ValueError("SSH profile " + self.name + " needs " + needs + ", paramiko " + paramiko.__version__ +
+                         " does not support them")
+
+    """
+    Set the preferences on a transport before start_client
+    host_key_type - type of the key cached for the host e.g. ssh-rsa, offered first so the cached key is used
+    """
+    def apply(self, transport, host_key_type=None):
+        # Negotiating other algorithms would fail against the devices the profile is for, or not be what was asked
+        self.check()
+
+        security_options = transport.get_security_options()
+        for option, preferred in self.preferences.items():
+            setattr(security_options, option, preferred)
+
+        if self.compression is not None:
+            security_options.compression = ("zlib@openssh.com", "zlib", "none") if self.compression else ("none",)
+
+        if host_key_type in self.KEY_ALGORITHMS:
+            key_types = security_options.key_types
+            cached_types = [key_type for key_type in self.KEY_ALGORITHMS[host_key_type] if key_type in key_types]
+            security_options.key_types = tuple(cached_types + [key_type for key_type in key_types
+                                                               if key_type not in cached_types])
+
+
+# Profiles picked by name
+# default - paramiko negotiation as before
+# ap-ios - the sha1 DH key exchange, ssh-rsa host keys, AES-CTR and HMAC-SHA1 offered by the AP IOS 15.x builds,
+#          the 2048 bit group first for no group exchange round trip. Refused by paramiko releases without the sha1
+#          kex or ssh-rsa, as those builds offer nothing newer
+# fast - elliptic curve key exchange, far less CPU than a 2048 bit DH group, for APs whose image offers it
+PROFILES = {"default": SSHProfile("default"),
+            "ap-ios": SSHProfile("ap-ios",
+                                 kex=("diffie-hellman-group14-sha1", "diffie-hellman-group14-sha256",
+                                      "diffie-hellman-group-exchange-sha1", "diffie-hellman-group-exchange-sha256",
+                                      "diffie-hellman-group1-sha1"),
+                                 ciphers=("aes128-ctr", "aes256-ctr", "aes128-cbc", "aes256-cbc"),
+                                 digests=("hmac-sha1", "hmac-sha2-256"),
+                                 key_types=("rsa-sha2-256", "rsa-sha2-512", "ssh-rsa"),
+                                 compression=False,
+                                 requires={"kex": ("diffie-hellman-group14-sha1", "diffie-hellman-group-exchange-sha1",
+                                                   "diffie-hellman-group1-sha1"),
+                                           "key_types": ("ssh-rsa",)}),
+            "fast": SSHProfile("fast",
+                               kex=("curve25519-sha256@libssh.org", "ecdh-sha2-nistp256",
+                                    "diffie-hellman-group14-sha1", "diffie-hellman-group14-sha256"),
+                               ciphers=("aes128-ctr", "aes128-gcm@openssh.com", "aes256-ctr"),
+                               digests=("hmac-sha2-256", "hmac-sha1"),
+                               key_types=("ssh-ed25519", "ecdsa-sha2-nistp256", "rsa-sha2-256", "rsa-sha2-512",
+                                          "ssh-rsa"),
+                               compression=False)}
+
+
+class KnownHostsCache(object):
+    """
+    known_hosts_path - OpenSSH known_hosts file the keys are loaded from and saved to
+    A host seen for the first time is trusted and its key saved, a host whose key has changed or that offers a key
+    type not cached for it is refused
+    """
+    def __init__(self, known_hosts_path):
+        self.known_hosts_path = known_hosts_path
+        self.host_keys = self.load()
+        self.added = 0
+        self.lock = threading.Lock()
+
+    """
+    Returns - paramiko.HostKeys of the known_hosts file, empty if it is missing
+    """
+    def load(self):
+        host_keys = paramiko.HostKeys()
+        if os.path.isfile(self.known_hosts_path):
+            host_keys.load(self.known_hosts_path)
+
+        return host_keys
+
+    """
+    Name of the host in known_hosts >> 10.1.1.1, or [10.1.1.1]:2222 for a port other than 22
+    """
+    @staticmethod
+    def hostName(device_ip, port=22):
+        if 22 == port:
+            return device_ip
+
+        return "[" + device_ip + "]:" + str(port)
+
+    """
+    Returns - type of the first key cached for the host e.g. ssh-rsa, None if the host is not known
+    """
+    def keyType(self, host_name):
+        with self.lock:
+            known_keys = self.host_keys.lookup(host_name)
+            if not known_keys:
+                return None
+
+            return list(known_keys.keys())[0]
+
+    """
+    Check the key the host offered against the cache, a new host is added to be saved at the end of the run
+    Raises - paramiko.BadHostKeyException if the host offered a different key or key type to the one cached
+    """
+    def check(self, host_name, host_key):
+        with self.lock:
+            known_keys = self.host_keys.lookup(host_name)
+            if not known_keys:
+                self.host_keys.add(host_name, host_key.get_name(), host_key)
+                self.added += 1
+                return
+
+            # A device answering with a new key type could be impersonating the AP, so it is not trusted on sight
+            known_key = known_keys.get(host_key.get_name())
+            if known_key is None:
+                raise paramiko.BadHostKeyException(host_name, host_key, list(known_keys.values())[0])
+
+            if known_key != host_key:
+                raise paramiko.BadHostKeyException(host_name, host_key, known_key)
+
+    """
+    Write the keys added during the run in one go, merged with keys saved by other processes sharing the file
+    e.g. local queue workers
+    """
+    def save(self):
+        with self.lock:
+            if not self.added:
+                return
+
+            saved_keys = self.load()
+            for host_name in self.host_keys.keys():
+                for key_type, host_key in self.host_keys[host_name].items():
+                    saved_keys.add(host_name, key_type, host_key)
+
+            temp_path = self.known_hosts_path + ".tmp"
+            saved_keys.save(temp_path)
+            self.host_keys = saved_keys
+            self.added = 0
+
+        os.replace(temp_path, self.known_hosts_path)
@@ -0,0 +1,83 @@
+"""
+# Title: Test Fixtures
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.2
+# Purpose: Simulated APs from fake_ap_server.py for the tests that need an AP to connect to
+# Notes:
+0.1 - Created the fake_aps fixture
+0.2 - Added the run_scan fixture to run the main script against the simulated APs
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import builtins
+import os
+import runpy
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Paramiko import SSH_Paramiko
+import creds
+from fake_ap_server import FakeAPServer, FakeAPProfile
+
+FAKE_PORT = 2232
+FAKE_BASE_IP = "127.0.3.1"
+SCAN_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "ap_chk_cisco_corrupt_flash-mp.py")
+
+
+"""
+Start simulated APs on FAKE_BASE_IP onwards, sessions connect to FAKE_PORT and every host is up
+Returns - function called with the AP count and FakeAPProfile settings that returns the started FakeAPServer
+"""
+@pytest.fixture
+def fake_aps(monkeypatch):
+    servers = []
+    monkeypatch.setattr(SSH_Paramiko, "SSH_PORT", FAKE_PORT)
+    monkeypatch.setattr(SSH_Paramiko, "checkHostUp", lambda self, device_ip: True)
+
+    def start(count=1, **settings):
+        settings.setdefault("latency", 0.01)
+        settings.setdefault("md5_time", 0.1)
+        fake_server = FakeAPServer(count, FAKE_BASE_IP, FAKE_PORT, FakeAPProfile(**settings))
+        fake_server.start()
+        servers.append(fake_server)
+
+        return fake_server
+
+    yield start
+
+    for fake_server in servers:
+        fake_server.stop()
+
+
+"""
+Run ap_chk_cisco_corrupt_flash-mp.py in tmp_path as admin/admin, answering "no" to the fix prompt
+Returns - function called with the APs for the device list and the script arguments
+"""
+@pytest.fixture
+def run_scan(fake_aps, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    def localUser(local_user):
+        local_user.user = "admin"
+        local_user.passwd = "admin"
+
+    monkeypatch.setattr(creds.LocalUser, "__init__", localUser)
+    monkeypatch.setattr(builtins, "input", lambda *prompt: "no")
+
+    def run(aps, *args):
+        with open("devices.csv", "w") as device_list:
+            for fake_ap in aps:
+                device_list.write(fake_ap.device_name + "," + fake_ap.device_ip + "\n")
+
+        # Runs are named by the second they start in
+        time.sleep(1.1)
+        monkeypatch.setattr(sys, "argv", [SCAN_SCRIPT, "--device-list", "devices.csv"] + list(args))
+        runpy.run_path(SCAN_SCRIPT, run_name="__main__")
+
+    return run
@@ -0,0 +1,102 @@
+"""
+# Title: Adaptive Limiter Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check AdaptiveLimiter grows the limit while connects are healthy and cuts it when they degrade
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adaptive_limiter import AdaptiveLimiter
+
+
+"""
+Fill the limit then record a window of connects, failed_count of them failed
+"""
+def observeWindow(limiter, latency=0.1, failed_count=0, device_ip="10.0.0.1"):
+    limit = limiter.limits()["total"]
+    for session in range(limit):
+        limiter.acquire(device_ip)
+    for session in range(limit):
+        limiter.observe(device_ip, latency, failed=session < failed_count)
+    for session in range(limit):
+        limiter.release(device_ip)
+
+
+def test_slow_start_doubles_the_limit():
+    limiter = AdaptiveLimiter(initial=10, max_limit=100)
+
+    observeWindow(limiter)
+    observeWindow(limiter)
+
+    assert 40 == limiter.limits()["total"]
+
+
+def test_limit_not_grown_unless_reached():
+    limiter = AdaptiveLimiter(initial=10, max_limit=100)
+
+    for session in range(10):
+        limiter.observe("10.0.0.1", 0.1)
+
+    assert 10 == limiter.limits()["total"]
+
+
+def test_errors_cut_the_limit_then_grow_it_slowly():
+    limiter = AdaptiveLimiter(initial=40, min_limit=5, max_limit=100)
+
+    observeWindow(limiter, failed_count=10)
+    assert 20 == limiter.limits()["total"]
+
+    observeWindow(limiter)
+    assert 25 == limiter.limits()["total"]
+
+
+def test_slow_connects_cut_the_limit():
+    limiter = AdaptiveLimiter(initial=10, max_limit=100)
+    observeWindow(limiter, latency=0.1)
+
+    observeWindow(limiter, latency=2.0)
+
+    assert 10 == limiter.limits()["total"]
+
+
+def test_limit_stays_within_bounds():
+    limiter = AdaptiveLimiter(initial=10, min_limit=8, max_limit=15)
+
+    observeWindow(limiter)
+    assert 15 == limiter.limits()["total"]
+
+    observeWindow(limiter, failed_count=15)
+    assert 8 == limiter.limits()["total"]
+
+
+def test_subnet_limits():
+    limiter = AdaptiveLimiter(initial=100, key_func=AdaptiveLimiter.subnetKey(24), key_initial=2)
+
+    limiter.acquire("10.1.1.1")
+    limiter.acquire("10.1.1.2")
+
+    assert not limiter.hasSlot("10.1.1.3")
+    assert limiter.hasSlot("10.1.2.1")
+    assert limiter.hasSlot()
+
+    limiter.release("10.1.1.1")
+    assert limiter.hasSlot("10.1.1.3")
+    assert 2 == limiter.limits()["10.1.1.0/24"]
+
+
+def test_fixed_limiter_never_adjusts():
+    limiter = AdaptiveLimiter.fixed(10)
+
+    observeWindow(limiter)
+    observeWindow(limiter, failed_count=10)
+
+    assert 10 == limiter.limits()["total"]
@@ -0,0 +1,56 @@
+"""
+# Title: Async Sessions Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check SSH_Async streams every session result and keeps going when one session raises
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Async import SSH_Async
+from ap_chk_session import sessionErrorResult
+
+PARAMETERS = [("10.1.1." + str(index), "AP-" + str(index)) for index in range(1, 9)]
+
+
+async def session(ssh_async, device_ip, device_name):
+    await asyncio.sleep(0.01)
+    if "AP-3" == device_name:
+        raise OSError("Connection reset by peer")
+
+    return device_name
+
+
+def test_failed_session_does_not_end_the_scan():
+    ssh_async = SSH_Async(concurrency=4)
+    results = []
+
+    ssh_async.streamSessions(session, PARAMETERS, results.append, ip_func=lambda params: params[0],
+                             error_func=lambda params, error: sessionErrorResult(ssh_async.ssh_session, params[0],
+                                                                                 params[1], error))
+    ssh_async.close()
+
+    failed = [result for result in results if not isinstance(result, str)]
+    assert 8 == len(results)
+    assert 1 == len(failed)
+    assert "session_terminated" == failed[0].status
+    assert "reset" == failed[0].error_type
+
+
+def test_failed_session_raises_without_error_func():
+    ssh_async = SSH_Async(concurrency=4)
+
+    with pytest.raises(OSError):
+        ssh_async.streamSessions(session, PARAMETERS, lambda result: None)
+    ssh_async.close()
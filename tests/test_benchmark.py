@@ -0,0 +1,43 @@
+"""
+# Title: Benchmark Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check the benchmark engines classify the simulated APs as fake_ap_server.py set them up
+# Notes:
+0.1 - Created the tests against fake_ap_server.py
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ap_benchmark
+
+
+@pytest.mark.parametrize("engine", ["async", "adaptive", "threads"])
+def test_engine_results_match_the_fake_aps(fake_aps, tmp_path, engine):
+    fake_server = fake_aps(6, corrupt_image_rate=0.3, corrupt_flash_rate=0.3, seed=6)
+    hosts = [(fake_ap.device_ip, fake_ap.device_name) for fake_ap in fake_server.aps]
+
+    result = ap_benchmark.benchmarkEngine(engine, hosts, "admin", "admin", 4, 0.1, str(tmp_path))
+
+    assert fake_server.expectedResults() == result["results"]
+    assert 6 == result["latency"]["count"]
+    assert result["devices_per_sec"] > 0
+
+
+def test_handshakes(fake_aps):
+    fake_server = fake_aps(2)
+    hosts = [(fake_ap.device_ip, fake_ap.device_name) for fake_ap in fake_server.aps]
+
+    result = ap_benchmark.benchmarkHandshakes("default", hosts, "admin", "admin", 4, 2)
+
+    assert 4 == result["completed"]
+    assert 4 == result["latency"]["count"]
+    assert 4 == sum(result["algorithms"].values())
@@ -0,0 +1,67 @@
+"""
+# Title: AP Classifier Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check APClassifier picks the highest priority result type and the line that matched
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Paramiko import SSH_Paramiko
+from ap_classifier import APClassifier
+
+IMAGE_PATH = "flash:/ap3g2-k9w8-mx.153-3.JF5/ap3g2-k9w8-mx.153-3.JF5"
+
+
+def decodedOutput(text):
+    return SSH_Paramiko().decodeSSHOutput(text.replace("\n", "\r\n").encode("utf-8"))
+
+
+def test_verified_image():
+    ssh_out = decodedOutput("AP-1#verify /md5 " + IMAGE_PATH + "\n.........Done!\nVerified (" + IMAGE_PATH +
+                            ") = 1f2e\nAP-1#")
+
+    classification = APClassifier().classify(ssh_out)
+
+    assert "valid_image" == classification.status
+    assert "Verified (" + IMAGE_PATH + ") = 1f2e" == classification.evidence
+
+
+def test_corrupt_image():
+    ssh_out = decodedOutput(".........Done!\nComputed signature = 9a8b\nSubmitted signature = 1f2e\n"
+                            "%Error verifying " + IMAGE_PATH + "\nAP-1#")
+
+    classification = APClassifier().classify(ssh_out)
+
+    assert "corrupt_image" == classification.status
+    assert "Computed signature = 9a8b" == classification.evidence
+
+
+def test_no_verify_result_is_corrupt_flash():
+    classification = APClassifier().classify("%Error opening " + IMAGE_PATH + " (I/O error)\nAP-1#")
+
+    assert ("corrupt_flash", "") == classification
+
+
+def test_highest_priority_wins():
+    # A session that ended after the verify printed is still a terminated session
+    classification = APClassifier().classify("Verified (" + IMAGE_PATH + ") = 1f2e\nsession_terminated,AP-1,reset")
+
+    assert "session_terminated" == classification.status
+    assert "session_terminated,AP-1,reset" == classification.evidence
+
+
+def test_custom_rules():
+    classifier = APClassifier(rules=[("bridge_flooding", r"bridge-group 1 unicast-flooding")],
+                              default_status="valid_image")
+
+    assert "bridge_flooding" == classifier.classify(" bridge-group 1 unicast-flooding\n").status
+    assert "valid_image" == classifier.classify("no issues").status
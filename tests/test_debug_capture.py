@@ -0,0 +1,75 @@
+"""
+# Title: Debug Capture Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check DebugCapture holds a bounded tail of the output, rolls its file and stops on its stop pattern
+# Notes:
+0.1 - Created the tests, the streamed capture is run against fake_ap_server.py
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Paramiko import SSH_Paramiko
+from debug_capture import DebugCapture
+
+
+def test_memory_is_bounded():
+    capture = DebugCapture(max_bytes=10)
+
+    for chunk in (b"0123", b"4567", b"89ab", b"cdef"):
+        capture.write(chunk)
+
+    assert b"6789abcdef" == capture.getvalue()
+    assert (16, 6, 10) == (capture.total_bytes, capture.dropped_bytes, capture.held_bytes)
+
+
+def test_stop_pattern_split_across_reads():
+    capture = DebugCapture(stop_pattern=r"LWAPP-3-\w+")
+
+    assert not capture.write(b"*Mar  1 00:00:01: %LWA")
+    assert capture.write(b"PP-3-CLIENTERRORLOG: join failed\n")
+    assert "LWAPP-3-CLIENTERRORLOG" == capture.stop_match
+
+    capture.clearStop()
+    assert not capture.write(b"LWAPP-3-AGAIN")
+
+
+def test_capture_file_rolls(tmp_path):
+    capture_path = str(tmp_path / "debug" / "AP-1.txt")
+    capture = DebugCapture(max_bytes=4, capture_path=capture_path, max_file_bytes=8, max_files=2)
+
+    for chunk in (b"aaaa", b"bbbb", b"cccc", b"dddd", b"eeee", b"ffff", b"gggg"):
+        capture.write(chunk)
+    capture.close()
+
+    with open(capture_path, "rb") as capture_file:
+        assert b"gggg" == capture_file.read()
+    with open(capture_path + ".1", "rb") as capture_file:
+        assert b"eeeeffff" == capture_file.read()
+    with open(capture_path + ".2", "rb") as capture_file:
+        assert b"ccccdddd" == capture_file.read()
+    assert not os.path.exists(capture_path + ".3")
+
+
+def test_streamed_debug_stops_on_pattern(fake_aps, tmp_path):
+    fake_ap = fake_aps(1, debug_rate=500).aps[0]
+    capture = DebugCapture(max_bytes=8192, capture_path=str(tmp_path / "AP-1_debug.txt"),
+                           stop_pattern=r"Station AP-1 0000\.1111\.0190")
+
+    started = time.time()
+    ssh_out = SSH_Paramiko().executeCollectDebugSSH("admin", "admin", fake_ap.device_ip, fake_ap.device_name,
+                                                    ["enable", "admin", "debug dot11 events"], timer=30,
+                                                    capture=capture)
+
+    assert time.time() - started < 15
+    assert "0000.1111.0190" in ssh_out
+    assert len(ssh_out) <= 8192
+    assert capture.total_bytes > capture.held_bytes
+    assert capture.total_bytes == os.path.getsize(str(tmp_path / "AP-1_debug.txt"))
@@ -0,0 +1,82 @@
+"""
+# Title: Device Inventory Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check DeviceInventory filters, dedupes and shards the device list
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from device_inventory import Device, DeviceInventory
+
+DEVICE_LIST = ("AP-NORTH-1,10.1.0.1,north,wlc-1,AIR-CAP3702I\n"
+               "AP-NORTH-2,10.1.0.2,north,wlc-1,AIR-AP2802I\n"
+               "AP-SOUTH-1,10.2.0.1,south,wlc-2,AIR-CAP3702I\n"
+               "AP-SOUTH-LAB,10.2.0.2,south,wlc-2,AIR-CAP3702I\n"
+               "AP-NORTH-1-DUP,10.1.0.1,north,wlc-1,AIR-CAP3702I\n"
+               "AP-NO-SITE, 10.3.0.1 \n"
+               "short row\n")
+
+
+def deviceList(tmp_path, devices=DEVICE_LIST):
+    csv_path = str(tmp_path / "devices.csv")
+    with open(csv_path, "w") as csv_file:
+        csv_file.write(devices)
+
+    return csv_path
+
+
+def deviceNames(inventory):
+    return [device.name for device in inventory]
+
+
+def test_rows_are_read_and_deduped(tmp_path):
+    inventory = DeviceInventory(deviceList(tmp_path))
+
+    devices = list(inventory)
+
+    assert ["AP-NORTH-1", "AP-NORTH-2", "AP-SOUTH-1", "AP-SOUTH-LAB", "AP-NO-SITE"] == [device.name
+                                                                                        for device in devices]
+    assert Device("AP-NO-SITE", "10.3.0.1", "default", "default", "") == devices[-1]
+    assert {"duplicate": 1, "short_row": 1} == dict(inventory.skipped)
+
+
+def test_filters(tmp_path):
+    csv_path = deviceList(tmp_path)
+
+    assert ["AP-SOUTH-1"] == deviceNames(DeviceInventory(csv_path, include="^AP-SOUTH", exclude="LAB"))
+    assert ["AP-NORTH-1", "AP-NORTH-2"] == deviceNames(DeviceInventory(csv_path, sites=["north"]))
+    assert ["AP-NORTH-2"] == deviceNames(DeviceInventory(csv_path, models=["AIR-AP2802I"]))
+    assert ["AP-SOUTH-1", "AP-SOUTH-LAB", "AP-NO-SITE"] == deviceNames(
+        DeviceInventory(csv_path, subnets=["10.2.0.0/16", "10.3.0.0/24"]))
+
+
+def test_shards_split_the_list(tmp_path):
+    csv_path = deviceList(tmp_path, "".join("AP-" + str(index) + ",10.0." + str(index // 256) + "." +
+                                            str(index % 256) + "\n" for index in range(1000)))
+
+    shards = [deviceNames(DeviceInventory(csv_path, shard=shard, shards=4)) for shard in range(1, 5)]
+
+    assert 1000 == sum(len(names) for names in shards)
+    assert 1000 == len(set(name for names in shards for name in names))
+    assert all(150 < len(names) < 350 for names in shards)
+    assert shards[1] == deviceNames(DeviceInventory(csv_path, shard=2, shards=4))
+
+
+def test_parse_shard():
+    assert (2, 4) == DeviceInventory.parseShard("2/4")
+
+    with pytest.raises(ValueError):
+        DeviceInventory.parseShard("2")
+    with pytest.raises(ValueError):
+        DeviceInventory("devices.csv", shard=5, shards=4)
@@ -0,0 +1,53 @@
+"""
+# Title: Image Manifest Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.2
+# Purpose: Check ImageManifest and FlashTriage read dir flash: output as the scan decodes it
+# Notes:
+0.1 - Created the tests against fake_ap_server.py
+0.2 - Added the FlashTriage image size check of a padded dir flash: listing
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Paramiko import SSH_Paramiko
+from fake_ap_server import FakeAP, FakeAPProfile
+from image_manifest import ImageManifest, ImageEntry
+from ap_triage import FlashTriage
+
+
+def decodedOutput(text):
+    return SSH_Paramiko().decodeSSHOutput(text.replace("\n", "\r\n").encode("utf-8"))
+
+
+def test_probe_reads_fake_ap_flash_listing():
+    fake_ap = FakeAP("127.0.3.1", "AP-1", FakeAPProfile())
+    ssh_out = decodedOutput(fake_ap.showVersion() + "\nAP-1#dir flash:\n" + fake_ap.dirFlash() + "\nAP-1#")
+
+    probe = ImageManifest().parseProbe(ssh_out)
+
+    assert "drwx128" in ssh_out
+    assert fake_ap.model == probe.model
+    assert fake_ap.version == probe.version
+    assert [fake_ap.image] == probe.flash_images
+
+
+def test_probe_skips_files():
+    ssh_out = decodedOutput("    2  -rwx         360   Jan 1 2018 00:01:11 +00:00  private-config\n"
+                            "    3  drwx  128  Mar 1 2002 00:08:03 +00:00  ap3g2-k9w8-mx.153-3.JF5\n")
+
+    assert ["ap3g2-k9w8-mx.153-3.JF5"] == ImageManifest().parseProbe(ssh_out).flash_images
+
+
+def test_triage_reads_padded_image_size():
+    image_entry = ImageEntry("", "", "ap3g2-k9w8-mx.153-3.JF5", "", 482)
+    ssh_out = decodedOutput("Directory of flash:/ap3g2-k9w8-mx.153-3.JF5/\n\n"
+                            "    5  -rwx         482   Jan 1 2018 00:08:03 +00:00  ap3g2-k9w8-mx.153-3.JF5\n")
+
+    assert "" == FlashTriage().assess(ssh_out, image_entry)
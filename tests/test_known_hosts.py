@@ -0,0 +1,56 @@
+"""
+# Title: Known Hosts Cache Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check the host keys KnownHostsCache trusts and refuses
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+
+import paramiko
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Paramiko import SSH_Paramiko
+from ssh_profile import KnownHostsCache
+
+HOST_NAME = "10.1.1.1"
+
+
+def knownHost(tmp_path):
+    known_hosts = KnownHostsCache(str(tmp_path / "known_hosts"))
+    known_hosts.check(HOST_NAME, paramiko.RSAKey.generate(1024))
+
+    return known_hosts
+
+
+def test_new_host_is_added(tmp_path):
+    known_hosts = knownHost(tmp_path)
+
+    assert 1 == known_hosts.added
+    assert "ssh-rsa" == known_hosts.keyType(HOST_NAME)
+
+
+def test_changed_key_is_refused(tmp_path):
+    known_hosts = knownHost(tmp_path)
+
+    with pytest.raises(paramiko.BadHostKeyException):
+        known_hosts.check(HOST_NAME, paramiko.RSAKey.generate(1024))
+
+
+def test_new_key_type_is_refused(tmp_path):
+    known_hosts = knownHost(tmp_path)
+
+    with pytest.raises(paramiko.BadHostKeyException) as error:
+        known_hosts.check(HOST_NAME, paramiko.ECDSAKey.generate())
+
+    assert "host_key" == SSH_Paramiko().errorCategory(error.value)
+    assert 1 == known_hosts.added
+    assert ["ssh-rsa"] == list(known_hosts.host_keys.lookup(HOST_NAME).keys())
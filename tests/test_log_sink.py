@@ -0,0 +1,62 @@
+"""
+# Title: Log Sink Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check LogSink writes the device outputs into the run directory or its tar.gz from the writer thread
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+import tarfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_sink import LogSink
+
+
+def test_writes_into_run_directory(tmp_path):
+    working_dir = os.getcwd()
+    log_sink = LogSink(str(tmp_path / "run_log"))
+
+    output_path = log_sink.printTextFile("AP-1_valid_image", "show version")
+    log_sink.printTextFile("run_log", "first\n", write_method="append")
+    log_sink.printTextFile("run_log", "second\n", write_method="append")
+    log_sink.close()
+
+    assert working_dir == os.getcwd()
+    assert str(tmp_path / "run_log" / "AP-1_valid_image.txt") == output_path
+    with open(output_path) as output_file:
+        assert "show version" == output_file.read()
+    with open(str(tmp_path / "run_log" / "run_log.txt")) as log_file:
+        assert "first\nsecond\n" == log_file.read()
+    assert [] == log_sink.errors
+
+
+def test_archive_mode_packs_device_outputs(tmp_path):
+    log_sink = LogSink(str(tmp_path / "run_log"), archive=True)
+
+    output_path = log_sink.printTextFile("AP-1_corrupt_image", "Computed signature")
+    log_path = log_sink.printTextFile("run_log", "appended", write_method="append")
+    log_sink.close()
+
+    assert str(tmp_path / "run_log.tar.gz") + ":AP-1_corrupt_image.txt" == output_path
+    with tarfile.open(str(tmp_path / "run_log.tar.gz")) as tar:
+        assert ["AP-1_corrupt_image.txt"] == tar.getnames()
+        assert b"Computed signature" == tar.extractfile("AP-1_corrupt_image.txt").read()
+    assert os.path.isfile(log_path)
+
+
+def test_flush_waits_for_queued_writes(tmp_path):
+    log_sink = LogSink(str(tmp_path / "run_log"), max_pending=2)
+
+    for index in range(20):
+        log_sink.printTextFile("AP-" + str(index), str(index))
+    log_sink.flush()
+
+    assert 20 == len(os.listdir(str(tmp_path / "run_log")))
+    log_sink.close()
@@ -0,0 +1,66 @@
+"""
+# Title: Multiplexed Channels Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check command groups run at the same time on their own channels over one connection to the AP
+# Notes:
+0.1 - Created the tests against fake_ap_server.py
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Paramiko import SSH_Paramiko
+from run_metrics import RunMetrics
+import ap_chk_session
+
+
+def test_groups_share_one_handshake(fake_aps):
+    fake_ap = fake_aps(1, md5_time=1.0, corrupt_image_rate=0.0, corrupt_flash_rate=0.0).aps[0]
+    verify_cmd = "verify /md5 flash:/" + fake_ap.image + "/" + fake_ap.image
+    metrics = RunMetrics()
+
+    started = time.time()
+    ssh_outs = SSH_Paramiko().executeMultiplexedCommands("admin", "admin", fake_ap.device_ip, fake_ap.device_name,
+                                                         [["enable", "admin", verify_cmd],
+                                                          ["enable", "admin", verify_cmd],
+                                                          "show version"],
+                                                         cmd_timeout=10, metrics=metrics)
+    elapsed = time.time() - started
+
+    assert 3 == len(ssh_outs)
+    assert all("Verified (" in ssh_out for ssh_out in ssh_outs[:2])
+    assert "Model Number" in ssh_outs[2]
+    assert 1 == metrics.summary()["ssh_handshake"]["count"]
+    # The two verifies ran side by side
+    assert elapsed < 1.9
+
+
+def test_failed_connect_fails_every_group(fake_aps):
+    fake_ap = fake_aps(1).aps[0]
+
+    ssh_outs = SSH_Paramiko().executeMultiplexedCommands("admin", "wrong", fake_ap.device_ip, fake_ap.device_name,
+                                                         [["enable", "wrong", "show version"], "show version"],
+                                                         timeout=10)
+
+    assert 2 == len(ssh_outs)
+    assert ssh_outs[0] == ssh_outs[1]
+    assert ssh_outs[0].startswith("session_terminated," + fake_ap.device_name + ",")
+
+
+def test_multiplexed_scan_matches_single_shell(fake_aps, tmp_path):
+    fake_server = fake_aps(6, corrupt_image_rate=0.3, corrupt_flash_rate=0.3, seed=6)
+
+    for fake_ap in fake_server.aps:
+        statuses = [ap_chk_session.run_SSHsession("admin", "admin", fake_ap.device_ip, fake_ap.device_name,
+                                                  "_test_", str(tmp_path / mode) + os.sep, 0.1, host_up=True,
+                                                  multiplex="multiplex" == mode).status
+                    for mode in ("shell", "multiplex")]
+
+        assert [fake_ap.status, fake_ap.status] == statuses
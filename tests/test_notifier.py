@@ -0,0 +1,51 @@
+"""
+# Title: Notifier Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check Notifier closes down without waiting out the retries of a relay that is down
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notifier import Notifier
+
+
+def relayDown(smtp_host, smtp_port, timeout=None):
+    raise OSError("Connection refused")
+
+
+def createNotifier(tmp_path):
+    return Notifier("127.0.0.1", "scan@example.com", "noc@example.com", digest_interval=0, retry_delay=30,
+                    undelivered_path=str(tmp_path / "undelivered.txt"), smtp_factory=relayDown)
+
+
+def test_close_does_not_wait_out_retries(tmp_path):
+    notifier = createNotifier(tmp_path)
+    notifier.notify("Results", "1 corrupt_flash")
+
+    started = time.time()
+    notifier.close()
+
+    assert time.time() - started < 5
+    assert 1 == notifier.undelivered
+    assert "1 corrupt_flash" in (tmp_path / "undelivered.txt").read_text()
+
+
+def test_close_with_timeout_stops_retrying_at_timeout(tmp_path):
+    notifier = createNotifier(tmp_path)
+    notifier.notify("Results", "1 corrupt_flash")
+
+    started = time.time()
+    notifier.close(timeout=0.5)
+
+    assert 0.5 <= time.time() - started < 5
+    assert 1 == notifier.undelivered
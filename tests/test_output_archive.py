@@ -0,0 +1,87 @@
+"""
+# Title: Output Archive Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check OutputArchive reads back, indexes and searches the AP outputs of every run
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_sink import LogSink
+from output_archive import OutputArchive
+
+VALID_OUT = ("AP-1#verify /md5 flash:/ap3g2-k9w8-mx.153-3.JF5/ap3g2-k9w8-mx.153-3.JF5\n"
+             ".......................................Done!\n"
+             "Verified (flash:/ap3g2-k9w8-mx.153-3.JF5/ap3g2-k9w8-mx.153-3.JF5) = 1f2e\nAP-1#")
+FLASH_OUT = ("AP-2#dir flash:/ap3g2-k9w8-mx.153-3.JF5/\n"
+             "%Error opening flash:/ap3g2-k9w8-mx.153-3.JF5/ (I/O error)\n"
+             "*Mar  1 00:00:21.447: %FILESYS-3-FLASH: flash:/ I/O error reading sector 2048\nAP-2#")
+
+
+def archiveRuns(archive_dir, **settings):
+    output_archive = OutputArchive(archive_dir, **settings)
+    for run in ("run-1", "run-2"):
+        output_archive.add(run, "AP-1", "AP-1_valid_image", VALID_OUT + " " + run)
+        output_archive.add(run, "AP-2", "AP-2", FLASH_OUT)
+    output_archive.commit()
+
+    return output_archive
+
+
+def test_lookup_reads_back_every_run(tmp_path):
+    output_archive = archiveRuns(str(tmp_path / "archive"))
+
+    found = output_archive.lookup("AP-1")
+
+    assert ["run-1", "run-2"] == [record["run"] for record, output in found]
+    assert [VALID_OUT + " run-1", VALID_OUT + " run-2"] == [output for record, output in found]
+    assert all(record["length"] < record["size"] for record, output in found)
+    output_archive.close()
+
+
+def test_token_index_and_search(tmp_path):
+    output_archive = archiveRuns(str(tmp_path / "archive"))
+
+    io_errors = output_archive.records(token="io_error")
+    found = list(output_archive.search(r"FILESYS", run="run-2"))
+
+    assert ["AP-2", "AP-2"] == [record["device"] for record in io_errors]
+    assert {"io_error": 2, "filesys_error": 2} == output_archive.tokenCounts()
+    assert 1 == len(found)
+    assert ["*Mar  1 00:00:21.447: %FILESYS-3-FLASH: flash:/ I/O error reading sector 2048"] == found[0][1]
+    assert [] == list(output_archive.search(r"FILESYS", device="AP-1"))
+    output_archive.close()
+
+
+def test_segments_roll_and_reopen(tmp_path):
+    archive_dir = str(tmp_path / "archive")
+    archiveRuns(archive_dir, max_segment_bytes=200).close()
+
+    output_archive = OutputArchive(archive_dir)
+    found = output_archive.lookup("AP-2", run="run-2")
+
+    assert 1 < len([name for name in os.listdir(archive_dir) if name.endswith(".seg")])
+    assert [FLASH_OUT] == [output for record, output in found]
+    output_archive.close()
+
+
+def test_log_sink_writes_into_the_archive(tmp_path):
+    output_archive = OutputArchive(str(tmp_path / "archive"))
+    log_sink = LogSink(str(tmp_path / "run_log"), output_archive=output_archive, run="run-1")
+
+    output_path = log_sink.printTextFile("AP-2", FLASH_OUT, device_name="AP-2")
+    log_sink.printTextFile("run_log", "Executed: run-1", write_method="append")
+    log_sink.close()
+
+    assert str(tmp_path / "archive") + ":run-1/AP-2" == output_path
+    assert [FLASH_OUT] == [output for record, output in output_archive.lookup("AP-2")]
+    assert ["run_log.txt"] == os.listdir(str(tmp_path / "run_log"))
+    output_archive.close()
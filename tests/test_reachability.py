@@ -0,0 +1,30 @@
+"""
+# Title: Reachability Sweep Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check checkHostsUp sweeps a device list with TCP connects to the SSH port
+# Notes:
+0.1 - Created the tests against fake_ap_server.py
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Paramiko import SSH_Paramiko
+
+OFFLINE_IP = "127.0.3.200"
+
+
+def test_sweep_finds_listening_aps(fake_aps):
+    fake_server = fake_aps(3)
+    device_ips = [fake_ap.device_ip for fake_ap in fake_server.aps]
+
+    host_states = SSH_Paramiko().checkHostsUp(device_ips + [OFFLINE_IP, device_ips[0]], timeout=1)
+
+    assert dict([(device_ip, True) for device_ip in device_ips] + [(OFFLINE_IP, False)]) == host_states
+
@@ -0,0 +1,99 @@
+"""
+# Title: Remediation Scheduler Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check the reload limits of RemediationScheduler with a session pool that records the fix commands run
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ap_remediation import RemediationScheduler
+from ap_results import APResult
+
+FIX_CMDS = {"diagnose": ["fsck flash:"], "reload": ["reload"], "cp_image": ["test capwap image capwap"],
+            "img_verify": ["show log"]}
+
+
+class RecordingPool(object):
+    """
+    Stand in for SSH_SessionPool, fsck always fails and image downloads pass after image_time seconds
+    """
+    def __init__(self, image_time=0.0):
+        self.image_time = image_time
+        self.events = []
+        self.downloads = {}
+        self.lock = threading.Lock()
+
+    def executeChannelCommands(self, device_ip, device_name, cmds, cmd_timeout=None):
+        with self.lock:
+            self.events.append((time.time(), device_name, cmds[0]))
+            if FIX_CMDS["cp_image"] == cmds:
+                self.downloads[device_ip] = time.time()
+
+        if FIX_CMDS["diagnose"] == cmds:
+            return "Error fscking flash:"
+        if FIX_CMDS["img_verify"] == cmds and time.time() - self.downloads[device_ip] >= self.image_time:
+            return "AP image integrity check PASSED"
+
+        return device_name + "#"
+
+    def invalidate(self, device_ip):
+        pass
+
+
+def test_image_downloads_run_together_without_a_site():
+    pool = RecordingPool(image_time=0.3)
+    scheduler = RemediationScheduler(pool, FIX_CMDS, max_workers=10, max_reloads=10, max_site_reloads=1,
+                                     max_controller_reloads=10, image_interval=0.05)
+    for ap_id in range(5):
+        scheduler.submitImage(APResult("corrupt_image", "AP-" + str(ap_id), "10.0.0." + str(ap_id)))
+
+    started = time.time()
+    results = scheduler.join()
+
+    assert 5 == len(results["image_pass"])
+    # One at a time would take 5 x image_time
+    assert time.time() - started < 1.0
+
+
+def test_image_slot_given_back_once_download_started():
+    pool = RecordingPool(image_time=0.5)
+    scheduler = RemediationScheduler(pool, FIX_CMDS, max_workers=10, max_reloads=10, max_site_reloads=1,
+                                     max_controller_reloads=10, image_interval=0.05)
+    for ap_id in range(3):
+        scheduler.submitImage(APResult("corrupt_image", "AP-" + str(ap_id), "10.0.0." + str(ap_id), site="site-a"))
+
+    results = scheduler.join()
+    assert 3 == len(results["image_pass"])
+
+    download_starts = sorted(event[0] for event in pool.events if FIX_CMDS["cp_image"][0] == event[2])
+    assert download_starts[-1] - download_starts[0] < 0.5
+
+
+def test_waiting_site_does_not_hold_up_other_sites():
+    pool = RecordingPool()
+    scheduler = RemediationScheduler(pool, FIX_CMDS, max_workers=2, max_reloads=10, max_site_reloads=1,
+                                     max_controller_reloads=10)
+    scheduler.waitForRecovery = lambda device_ip: time.sleep(0.3) or True
+
+    scheduler.submitFlash(APResult("corrupt_flash", "AP-A1", "10.0.1.1", site="site-a"))
+    time.sleep(0.05)
+    scheduler.submitFlash(APResult("corrupt_flash", "AP-A2", "10.0.1.2", site="site-a"))
+    scheduler.submitFlash(APResult("corrupt_flash", "AP-B1", "10.0.2.1", site="site-b"))
+    results = scheduler.join()
+
+    assert 3 == len(results["reloaded_online"])
+    reloads = dict((device_name, event_time) for event_time, device_name, cmd in pool.events if "reload" == cmd)
+    # AP-A2 waits for AP-A1 to come back, AP-B1 is reloaded while AP-A1 is still recovering
+    assert reloads["AP-A1"] < reloads["AP-B1"] < reloads["AP-A1"] + 0.3
+    assert reloads["AP-A2"] >= reloads["AP-A1"] + 0.3
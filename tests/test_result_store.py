@@ -0,0 +1,81 @@
+"""
+# Title: Result Store Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check ResultStore indexes, counts, reports and writes the AP results
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import csv
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ap_results import APResult, ResultStore
+
+
+def resultStore():
+    result_store = ResultStore()
+    result_store.add(APResult("valid_image", "AP-1", "10.0.0.1", site="north"))
+    result_store.add(APResult("corrupt_image", "AP-2", "10.0.0.2", site="north", image_hash="1f2e"))
+    result_store.add(APResult("corrupt_image", "AP-3", "10.0.0.3", site="south"))
+    result_store.add(APResult("ping_failed", "AP-4", "10.0.0.4", site="south", error_type="unreachable"))
+
+    return result_store
+
+
+def test_indexes_and_counts():
+    result_store = resultStore()
+
+    assert 4 == len(result_store)
+    assert ["AP-2", "AP-3"] == [result.device_name for result in result_store.byStatus("corrupt_image")]
+    assert [] == result_store.byStatus("corrupt_flash")
+    assert ["AP-3", "AP-4"] == [result.device_name for result in result_store.bySite("south")]
+    assert {"valid_image": 1, "corrupt_image": 2, "ping_failed": 1} == result_store.countByStatus()
+    assert {"north": {"valid_image": 1, "corrupt_image": 1},
+            "south": {"corrupt_image": 1, "ping_failed": 1}} == result_store.countBySite()
+
+
+def test_format_section():
+    section = resultStore().formatSection("APs with corrupt images", "corrupt_image")
+
+    assert ("APs with corrupt images\n"
+            "['corrupt_image', 'AP-2', '10.0.0.2']\n"
+            "['corrupt_image', 'AP-3', '10.0.0.3']\n"
+            "Total APs 2") == section
+
+
+def test_jsonl_round_trip(tmp_path):
+    results_path = str(tmp_path / "results.jsonl")
+    resultStore().writeJSONL(results_path)
+
+    with open(results_path) as results_file:
+        results = [APResult.fromDict(json.loads(line)) for line in results_file]
+
+    assert ["AP-1", "AP-2", "AP-3", "AP-4"] == [result.device_name for result in results]
+    assert "1f2e" == results[1].image_hash
+    assert "unreachable" == results[3].error_type
+
+
+def test_older_records_take_defaults():
+    ap_result = APResult.fromDict({"status": "valid_image", "device_name": "AP-1", "device_ip": "10.0.0.1"})
+
+    assert 1 == ap_result.attempts
+    assert "" == ap_result.error_type
+
+
+def test_csv_header_and_rows(tmp_path):
+    results_path = str(tmp_path / "results.csv")
+    resultStore().writeCSV(results_path)
+
+    with open(results_path, newline="") as results_file:
+        rows = list(csv.DictReader(results_file))
+
+    assert list(APResult.__slots__) == list(rows[0])
+    assert "south" == rows[3]["site"]
@@ -0,0 +1,78 @@
+"""
+# Title: Results History Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check the changes ResultsHistory reports between runs
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ap_results import APResult
+from results_history import ResultsHistory
+
+
+def runHistory(tmp_path, runs):
+    history = ResultsHistory(str(tmp_path / "history.db"))
+    for run, statuses in enumerate(runs):
+        history.addRun("run-" + str(run), [APResult(status, "AP-" + str(index), "10.0.0." + str(index))
+                                           for index, status in enumerate(statuses, 1)])
+
+    return history
+
+
+def changedAPs(report, change):
+    return [row["device_name"] for row in report[change]]
+
+
+def test_delta_report_changes(tmp_path):
+    history = runHistory(tmp_path, [("corrupt_image", "valid_image", "ping_failed", "valid_image"),
+                                    ("valid_image", "corrupt_flash", "session_terminated", "triage_clean")])
+
+    report = history.deltaReport()
+    history.close()
+
+    assert "run-1" == report["run"]
+    assert ["AP-2"] == changedAPs(report, "newly_corrupt")
+    assert ["AP-1"] == changedAPs(report, "newly_fixed")
+    assert ["AP-3"] == changedAPs(report, "still_offline")
+    assert "run-0" == report["newly_fixed"][0]["previous_run"]
+
+
+def test_unknown_image_is_not_a_change(tmp_path):
+    history = runHistory(tmp_path, [("corrupt_image", "valid_image"),
+                                    ("unknown_image", "unknown_image")])
+
+    report = history.deltaReport()
+
+    assert [] == changedAPs(report, "newly_fixed")
+    assert [] == changedAPs(report, "newly_corrupt")
+
+    # The next verified result is compared with the last verified one
+    history.addRun("run-2", [APResult("corrupt_image", "AP-1", "10.0.0.1"),
+                             APResult("valid_image", "AP-2", "10.0.0.2")])
+    report = history.deltaReport()
+    history.close()
+
+    assert [] == changedAPs(report, "newly_corrupt")
+    assert [] == changedAPs(report, "newly_fixed")
+
+
+def test_flapping_ap(tmp_path):
+    history = runHistory(tmp_path, [("valid_image", "valid_image"),
+                                    ("corrupt_image", "unknown_image"),
+                                    ("valid_image", "valid_image"),
+                                    ("corrupt_image", "unknown_image")])
+
+    report = history.deltaReport(flap_changes=3)
+    history.close()
+
+    assert ["AP-1"] == changedAPs(report, "flapping")
+    assert 3 == report["flapping"][0]["changes"]
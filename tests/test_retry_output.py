@@ -0,0 +1,61 @@
+"""
+# Title: Retry Output Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check a session attempt that RetryPolicy will retry writes no output and is not counted
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Paramiko import SSH_Paramiko
+from retry_policy import RetryPolicy
+from run_metrics import RunMetrics
+import ap_chk_session
+
+SSH_OUT = "session_terminated,AP-1,timeout"
+
+
+def processAttempt(tmp_path, metrics, attempt):
+    return ap_chk_session.processSSHOutput(SSH_Paramiko(), SSH_OUT, "127.0.0.1", "AP-1", "_test_",
+                                           str(tmp_path) + os.sep, metrics=metrics, retry_policy=RetryPolicy(),
+                                           attempt=attempt)
+
+
+def test_retried_attempt_writes_nothing(tmp_path):
+    metrics = RunMetrics()
+
+    ap_result = processAttempt(tmp_path, metrics, 1)
+
+    assert "session_terminated" == ap_result.status
+    assert "" == ap_result.output_path
+    assert [] == os.listdir(str(tmp_path))
+    assert {} == metrics.counters
+
+
+def test_final_attempt_writes_output(tmp_path):
+    metrics = RunMetrics()
+
+    ap_result = processAttempt(tmp_path, metrics, RetryPolicy.RULES["timeout"].max_attempts)
+
+    assert os.path.isfile(ap_result.output_path)
+    assert ap_result.output_path.endswith("AP-1_session_terminated.txt")
+    assert {"result_session_terminated": 1} == metrics.counters
+
+
+def test_retry_parameters_count_the_attempt():
+    params = ("admin", "admin", "127.0.0.1", "AP-1", "_test_", "", 5, True, None, None, None, None, None, False,
+              None, 1)
+
+    retry_params = ap_chk_session.retryParameters(params)
+
+    assert retry_params[7] is None
+    assert 2 == retry_params[-1]
+    assert params[:7] + params[8:-1] == retry_params[:7] + retry_params[8:-1]
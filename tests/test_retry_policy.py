@@ -0,0 +1,67 @@
+"""
+# Title: Retry Policy Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check RetryPolicy backs off by error category and SSH_Async runs the retries alongside the scan
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Async import SSH_Async
+from ap_results import APResult
+from retry_policy import RetryPolicy, RetryRule
+from run_metrics import RunMetrics
+
+
+def test_jittered_backoff():
+    low = RetryPolicy(random_func=lambda: 0.0)
+    high = RetryPolicy(random_func=lambda: 1.0)
+
+    assert (15.0, 30.0) == (low.delay("timeout", 1), high.delay("timeout", 1))
+    assert (30.0, 60.0) == (low.delay("timeout", 2), high.delay("timeout", 2))
+    assert low.delay("timeout", 3) is None
+    assert low.delay("host_key", 1) is None
+
+
+def test_scanned_ap_is_final():
+    ap_result = APResult("corrupt_image", "AP-1", "10.0.0.1")
+
+    assert RetryPolicy().retry(("AP-1",), ap_result, 1) is None
+    assert RetryPolicy().isFinal(ap_result, 1)
+    assert not RetryPolicy().isFinal(APResult("session_terminated", "AP-1", "10.0.0.1", error_type="reset"), 1)
+
+
+def test_failed_session_is_run_again():
+    attempts = {}
+
+    async def session(ssh_async, device_name):
+        attempts[device_name] = attempts.get(device_name, 0) + 1
+        if "AP-2" == device_name and attempts[device_name] < 3:
+            return APResult("session_terminated", device_name, "10.0.0.2", error_type="reset")
+
+        return APResult("valid_image", device_name, "10.0.0.1")
+
+    async def collect(ssh_async, retry_policy):
+        return [result async for result in ssh_async.iterSessions(session, [("AP-1",), ("AP-2",)],
+                                                                  retry_policy=retry_policy)]
+
+    metrics = RunMetrics()
+    retry_policy = RetryPolicy(rules={"reset": RetryRule(3, 0.05, 0.1)}, metrics=metrics)
+    ssh_async = SSH_Async(concurrency=4)
+    results = asyncio.run(collect(ssh_async, retry_policy))
+    ssh_async.close()
+
+    assert ["AP-1", "AP-2"] == sorted(result.device_name for result in results)
+    assert ["valid_image", "valid_image"] == [result.status for result in results]
+    assert {"AP-1": 1, "AP-2": 3} == attempts
+    assert 3 == [result.attempts for result in results if "AP-2" == result.device_name][0]
+    assert {"retry_reset": 2} == metrics.counters
@@ -0,0 +1,74 @@
+"""
+# Title: Run Metrics Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check the session phases are timed and RunMetrics reports them as JSON and Prometheus text
+# Notes:
+0.1 - Created the tests, the session phases are timed against fake_ap_server.py
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Paramiko import SSH_Paramiko
+from run_metrics import RunMetrics, ProgressCounter
+
+
+def test_session_phases_are_timed(fake_aps):
+    fake_ap = fake_aps(1).aps[0]
+    metrics = RunMetrics()
+
+    ssh_out = SSH_Paramiko().executeChannelCommands("admin", "admin", fake_ap.device_ip, fake_ap.device_name,
+                                                    ["show version"], prompt=SSH_Paramiko.DEVICE_PROMPT,
+                                                    cmd_timeout=10, metrics=metrics)
+
+    assert "Model Number" in ssh_out
+    phases = metrics.summary()
+    for phase in ("ping", "tcp_connect", "ssh_handshake", "auth", "shell_ready", "command"):
+        assert phases[phase]["count"] >= 1
+        assert phases[phase]["min"] >= 0
+
+
+def test_summary_percentiles():
+    metrics = RunMetrics()
+    for seconds in range(1, 101):
+        metrics.record("auth", float(seconds))
+
+    stats = metrics.summary()["auth"]
+
+    assert (100, 1.0, 100.0, 50.5) == (stats["count"], stats["min"], stats["max"], stats["mean"])
+    assert (50.0, 90.0, 99.0) == (stats["p50"], stats["p90"], stats["p99"])
+
+
+def test_json_and_prometheus_output(tmp_path):
+    metrics = RunMetrics()
+    metrics.record("auth", 0.5)
+    metrics.increment("result_valid_image", 3)
+    metrics.writeJSON(str(tmp_path / "metrics.json"))
+    metrics.writePrometheus(str(tmp_path / "metrics.prom"))
+
+    with open(str(tmp_path / "metrics.json")) as metrics_file:
+        metrics_json = json.load(metrics_file)
+    with open(str(tmp_path / "metrics.prom")) as metrics_file:
+        prometheus_lines = metrics_file.read().splitlines()
+
+    assert {"result_valid_image": 3} == metrics_json["counters"]
+    assert 1 == metrics_json["phases"]["auth"]["count"]
+    assert 'ap_chk_phase_seconds{phase="auth",quantile="0.9"} 0.5' in prometheus_lines
+    assert 'ap_chk_phase_seconds_count{phase="auth"} 1' in prometheus_lines
+    assert 'ap_chk_events_total{event="result_valid_image"} 3' in prometheus_lines
+
+
+def test_progress_line():
+    progress = ProgressCounter(200, interval=60)
+    progress.done = 50
+
+    progress_line = progress.format(progress.started + 10)
+
+    assert "Progress 50/200 APs (25.0%) - 5.0/s - ETA 0:00:30" == progress_line
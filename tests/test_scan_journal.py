@@ -0,0 +1,71 @@
+"""
+# Title: Scan Journal Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check the scan journal survives an interrupted write and --resume only scans the APs not yet classified
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import glob
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ap_results import APResult
+from scan_journal import ScanJournal
+
+
+def test_journal_skips_partial_line(tmp_path):
+    journal_path = str(tmp_path / "journal.jsonl")
+    journal = ScanJournal(journal_path)
+    journal.record(APResult("valid_image", "AP-1", "10.0.0.1"))
+    journal.record(APResult("corrupt_image", "AP-2", "10.0.0.2"))
+    journal.close()
+
+    # Killed part way through writing AP-3
+    with open(journal_path, "a") as journal_file:
+        journal_file.write('{"status": "valid_image", "device_ip": "10.0.0.3", "dev')
+
+    journal = ScanJournal(journal_path)
+    journal.record(APResult("session_terminated", "AP-1", "10.0.0.1"))
+    journal.record(APResult("corrupt_flash", "AP-4", "10.0.0.4"))
+    journal.close()
+
+    recent = journal.loadRecent(3600)
+
+    # AP-1 failed after it was classified so it is scanned again
+    assert ["10.0.0.2", "10.0.0.4"] == sorted(recent)
+    assert "corrupt_flash" == recent["10.0.0.4"]["status"]
+
+
+def test_journal_window(tmp_path):
+    journal = ScanJournal(str(tmp_path / "journal.jsonl"))
+    journal.record(APResult("valid_image", "AP-1", "10.0.0.1"))
+    journal.close()
+
+    assert {} == journal.loadRecent(-1)
+
+
+def test_resume_scans_only_new_aps(run_scan, fake_aps, capsys):
+    fake_server = fake_aps(4, corrupt_image_rate=0.0, corrupt_flash_rate=0.0)
+
+    run_scan(fake_server.aps[:2])
+    run_scan(fake_server.aps, "--resume")
+    scan_out = capsys.readouterr().out
+
+    with open("ap_corrupt_flash_journal.jsonl") as journal_file:
+        journaled = [json.loads(line)["device_name"] for line in journal_file]
+    with open(sorted(glob.glob("*_ap_corrupt_flash_log/ap_chk_cisco_bugs_results.jsonl"))[-1]) as results_file:
+        results = [json.loads(line)["device_name"] for line in results_file]
+
+    assert "Resuming, 2 APs already classified" in scan_out
+    assert "Running on 2 devices" in scan_out
+    assert ["AP-1", "AP-2"] == sorted(journaled[:2])
+    assert ["AP-3", "AP-4"] == sorted(journaled[2:])
+    assert ["AP-1", "AP-2", "AP-3", "AP-4"] == sorted(results)
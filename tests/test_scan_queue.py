@@ -0,0 +1,89 @@
+"""
+# Title: Scan Queue Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.3
+# Purpose: Check workers only lease and wait on the jobs of the latest run queued and keep the jobs they report on
+# Notes:
+0.1 - Created the tests
+0.2 - Added the lease renewal test
+0.3 - Added the stalled run tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from device_inventory import Device
+from scan_queue import ScanQueue
+
+
+def devices(count, site="default"):
+    return [Device("AP-" + str(index), "10.1.1." + str(index), site, "default", "")
+            for index in range(1, count + 1)]
+
+
+def test_new_run_expires_earlier_jobs(tmp_path):
+    scan_queue = ScanQueue(str(tmp_path / "queue.db"))
+    scan_queue.put("run1", devices(3))
+    stale_jobs = scan_queue.lease("worker1", 1)
+
+    scan_queue.put("run2", devices(2))
+
+    assert 2 == scan_queue.pending()
+    assert 0 == scan_queue.pending("run1")
+    assert ["run2", "run2"] == [job["run"] for job in scan_queue.lease("worker2", 10)]
+    assert 0 == scan_queue.complete("worker1", [(stale_jobs[0]["job_id"], {"status": "valid_image"})])
+    scan_queue.close()
+
+
+def test_jobs_of_the_same_run_are_kept(tmp_path):
+    scan_queue = ScanQueue(str(tmp_path / "queue.db"))
+    scan_queue.put("run1", devices(2, "site1"))
+    scan_queue.put("run1", devices(2, "site2"))
+
+    assert 4 == scan_queue.pending("run1")
+    scan_queue.close()
+
+
+def test_reporting_renews_the_batch_lease(tmp_path):
+    scan_queue = ScanQueue(str(tmp_path / "queue.db"), lease_timeout=1)
+    scan_queue.put("run1", devices(3))
+    jobs = scan_queue.lease("worker1", 3)
+
+    time.sleep(0.6)
+    assert 1 == scan_queue.complete("worker1", [(jobs[0]["job_id"], {"status": "valid_image"})])
+    time.sleep(0.6)
+
+    assert [] == scan_queue.lease("worker2", 3)
+    assert 2 == scan_queue.complete("worker1", [(job["job_id"], {"status": "valid_image"}) for job in jobs[1:]])
+    scan_queue.close()
+
+
+def test_jobs_no_worker_leases_are_failed(tmp_path):
+    scan_queue = ScanQueue(str(tmp_path / "queue.db"))
+    scan_queue.put("run1", devices(3))
+
+    results = [result for worker, result in scan_queue.iterResults("run1", poll_interval=0.05, stall_timeout=0.2)]
+
+    assert ["session_terminated"] * 3 == [result["status"] for result in results]
+    assert 0 == scan_queue.pending("run1")
+    scan_queue.close()
+
+
+def test_leases_of_exited_workers_are_freed(tmp_path):
+    scan_queue = ScanQueue(str(tmp_path / "queue.db"))
+    scan_queue.put("run1", devices(3))
+    scan_queue.lease("worker1", 2)
+
+    started = time.time()
+    results = [result for worker, result in scan_queue.iterResults("run1", poll_interval=0.05, stall_timeout=0.2,
+                                                                   dead_workers=lambda: ["worker1"])]
+
+    assert 3 == len(results)
+    assert time.time() - started < 5
+    scan_queue.close()
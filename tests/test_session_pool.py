@@ -0,0 +1,51 @@
+"""
+# Title: Session Pool Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check commands run on a reused pooled shell read their own reply
+# Notes:
+0.1 - Created the tests against fake_ap_server.py
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Paramiko import SSH_Paramiko
+from SSH_SessionPool import SSH_SessionPool
+
+DIAGNOSE_CMDS = ["debug capwap console cli", "fsck flash:", SSH_Paramiko.answerConfirm, "no debug all"]
+
+
+def test_confirm_is_answered_once(fake_aps):
+    fake_ap = fake_aps(1, corrupt_flash_rate=1.0, corrupt_image_rate=0.0, fix_rate=1.0).aps[0]
+    ssh_pool = SSH_SessionPool("admin", "admin", enable_cmds=["enable", "admin"])
+
+    fsck_out = ssh_pool.executeChannelCommands(fake_ap.device_ip, fake_ap.device_name, DIAGNOSE_CMDS)
+    version_out = ssh_pool.executeChannelCommands(fake_ap.device_ip, fake_ap.device_name, ["show version"])
+    ssh_pool.closeAll()
+
+    assert "Fsck of flash: complete" in fsck_out
+    assert "Model Number" in version_out
+    assert "debugging has been turned off" not in version_out
+
+
+def test_reused_shell_is_drained(fake_aps):
+    fake_ap = fake_aps(1, corrupt_flash_rate=0.0, corrupt_image_rate=0.0).aps[0]
+    ssh_pool = SSH_SessionPool("admin", "admin", enable_cmds=["enable", "admin"])
+
+    # Blank lines sent and not read leave a prompt each on the shell
+    ssh, ssh_channel, ssh_out = ssh_pool.checkout(fake_ap.device_ip)
+    ssh_channel.send("\n\n\n")
+    time.sleep(0.5)
+    ssh_pool.checkin(fake_ap.device_ip, ssh, ssh_channel)
+
+    version_out = ssh_pool.executeChannelCommands(fake_ap.device_ip, fake_ap.device_name, ["show version"])
+    ssh_pool.closeAll()
+
+    assert "Model Number" in version_out
@@ -0,0 +1,58 @@
+"""
+# Title: SSH Profile Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check an SSHProfile offers its target algorithms or refuses to be used without them
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import socket
+import sys
+
+import paramiko
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ssh_profile import SSHProfile, PROFILES
+
+SHA1_KEX = ("diffie-hellman-group14-sha1", "diffie-hellman-group-exchange-sha1", "diffie-hellman-group1-sha1")
+
+
+def legacyProfile():
+    return SSHProfile("legacy", kex=SHA1_KEX + ("diffie-hellman-group14-sha256",), requires={"kex": SHA1_KEX})
+
+
+def test_profile_without_its_algorithms_is_refused(monkeypatch):
+    monkeypatch.setattr(paramiko.Transport, "_kex_info",
+                        dict((name, kex) for name, kex in paramiko.Transport._kex_info.items() if name not in SHA1_KEX))
+    ssh_profile = legacyProfile()
+    transport = paramiko.Transport(socket.socket())
+
+    with pytest.raises(ValueError):
+        ssh_profile.apply(transport)
+
+    transport.close()
+
+
+def test_profile_offers_sha1_kex_when_supported(monkeypatch):
+    kex_info = dict(paramiko.Transport._kex_info)
+    kex_info["diffie-hellman-group14-sha1"] = kex_info["diffie-hellman-group14-sha256"]
+    monkeypatch.setattr(paramiko.Transport, "_kex_info", kex_info)
+    ssh_profile = legacyProfile()
+    transport = paramiko.Transport(socket.socket())
+
+    ssh_profile.apply(transport)
+
+    assert ("diffie-hellman-group14-sha1", "diffie-hellman-group14-sha256") == transport.get_security_options().kex
+    transport.close()
+
+
+def test_default_profiles_are_usable():
+    PROFILES["default"].check()
+    PROFILES["fast"].check()
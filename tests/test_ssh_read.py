@@ -0,0 +1,71 @@
+"""
+# Title: SSH Read Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check SSH_Paramiko.readUntilPrompt waits on the channel itself, as it must on Windows where select only
+takes sockets
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import socket
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Paramiko import SSH_Paramiko
+
+
+class ChunkChannel(object):
+    """
+    Channel with no fileno returning one chunk per recv, times out when the chunks run out unless closed
+    """
+    def __init__(self, chunks, closed=False):
+        self.chunks = list(chunks)
+        self.closed = closed
+        self.timeout = None
+        self.timeouts = []
+
+    def gettimeout(self):
+        return self.timeout
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+        self.timeouts.append(timeout)
+
+    def recv(self, nbytes):
+        if self.chunks:
+            return self.chunks.pop(0)
+        if self.closed:
+            return b""
+
+        raise socket.timeout()
+
+
+def test_read_stops_at_prompt():
+    ssh_channel = ChunkChannel([b"show version\r\n", b"Cisco IOS\r\n", b"AP-1#", b"left over"])
+
+    ssh_out = SSH_Paramiko().readUntilPrompt(ssh_channel, SSH_Paramiko.DEVICE_PROMPT, cmd_timeout=5)
+
+    assert b"show version\r\nCisco IOS\r\nAP-1#" == ssh_out
+    assert [b"left over"] == ssh_channel.chunks
+    assert ssh_channel.gettimeout() is None
+
+
+def test_read_stops_when_channel_closes():
+    ssh_channel = ChunkChannel([b"line 1\n", b"line 2\n"], closed=True)
+
+    assert b"line 1\nline 2\n" == SSH_Paramiko().readUntilPrompt(ssh_channel, None, cmd_timeout=5)
+
+
+def test_read_returns_output_on_command_timeout():
+    ssh_channel = ChunkChannel([b"partial"])
+
+    ssh_out = SSH_Paramiko().readUntilPrompt(ssh_channel, SSH_Paramiko.DEVICE_PROMPT, cmd_timeout=0.2)
+
+    assert b"partial" == ssh_out
+    assert all(0 < timeout <= 0.2 for timeout in ssh_channel.timeouts if timeout is not None)
@@ -0,0 +1,62 @@
+"""
+# Title: Streaming Results Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check SSH_Async.iterSessions yields each result as its session completes without waiting on the rest
+# Notes:
+0.1 - Created the tests
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Async import SSH_Async
+
+
+async def session(ssh_async, device_name, delay):
+    await asyncio.sleep(delay)
+
+    return device_name
+
+
+def collectResults(ssh_async, parameters):
+    async def collect():
+        return [result async for result in ssh_async.iterSessions(session, parameters)]
+
+    return asyncio.run(collect())
+
+
+def test_results_in_completion_order():
+    ssh_async = SSH_Async(concurrency=10)
+
+    results = collectResults(ssh_async, [("AP-1", 0.3), ("AP-2", 0.1), ("AP-3", 0.2)])
+    ssh_async.close()
+
+    assert ["AP-2", "AP-3", "AP-1"] == results
+
+
+def test_parameters_are_read_as_slots_free():
+    ssh_async = SSH_Async(concurrency=2)
+    read = []
+    read_at_result = []
+
+    def parameters():
+        for index in range(1, 7):
+            read.append(index)
+            yield "AP-" + str(index), 0.05
+
+    async def collect():
+        async for result in ssh_async.iterSessions(session, parameters()):
+            read_at_result.append(len(read))
+
+    asyncio.run(collect())
+    ssh_async.close()
+
+    assert 6 == len(read_at_result)
+    assert read_at_result[0] < 6
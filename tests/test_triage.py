@@ -0,0 +1,73 @@
+"""
+# Title: Triage Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Check FlashTriage only sends suspect APs and its sample to the md5 verify
+# Notes:
+0.1 - Created the tests, the scan is run against fake_ap_server.py
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ap_triage import FlashTriage
+from image_manifest import ImageEntry, ImageManifest
+from run_metrics import RunMetrics
+import ap_chk_session
+
+IMAGE_ENTRY = ImageEntry("AIR-CAP3702I", "15.3(3)JF5", "ap3g2-k9w8-mx.153-3.JF5", "1f2e", 20142593)
+CLEAN_DIR = ("Directory of flash:/ap3g2-k9w8-mx.153-3.JF5/\n\n"
+             "    5  -rwx    20142593   Jan 1 2018 00:08:03 +00:00  ap3g2-k9w8-mx.153-3.JF5\n"
+             "    6  -rwx         482   Jan 1 2018 00:08:03 +00:00  info\n")
+
+
+def test_assess_reasons():
+    flash_triage = FlashTriage()
+
+    assert "" == flash_triage.assess(CLEAN_DIR, IMAGE_ENTRY)
+    assert "image size 1000 expected 20142593" == flash_triage.assess(CLEAN_DIR.replace("20142593", "1000"),
+                                                                      IMAGE_ENTRY)
+    assert "image file is empty" == flash_triage.assess(CLEAN_DIR.replace("20142593", "0"), IMAGE_ENTRY)
+    assert "image file not in flash" == flash_triage.assess("Directory of flash:/\n", IMAGE_ENTRY)
+    assert ("flash error - *Mar  1 00:00:21.447: %FILESYS-3-FLASH: flash:/ I/O error reading sector 2048" ==
+            flash_triage.assess(CLEAN_DIR + "*Mar  1 00:00:21.447: %FILESYS-3-FLASH: flash:/ I/O error reading "
+                                            "sector 2048\nAP-1#", IMAGE_ENTRY))
+
+
+def test_clean_aps_are_sampled():
+    triage_state = {}
+
+    assert not FlashTriage(sample_rate=0.05, random_func=lambda: 0.5).escalate(CLEAN_DIR, IMAGE_ENTRY, triage_state)
+    assert "image size and flash log clean" == triage_state["reason"]
+
+    assert FlashTriage(sample_rate=0.05, random_func=lambda: 0.01).escalate(CLEAN_DIR, IMAGE_ENTRY, triage_state)
+    assert {"escalated": True, "reason": "random sample"} == triage_state
+
+
+def test_scan_with_triage(fake_aps, tmp_path):
+    fake_server = fake_aps(6, corrupt_image_rate=0.3, corrupt_flash_rate=0.3, seed=6)
+    fake_server.writeManifest(str(tmp_path / "manifest.csv"))
+    image_manifest = ImageManifest.fromCSV(str(tmp_path / "manifest.csv"))
+
+    metrics = RunMetrics()
+
+    for fake_ap in fake_server.aps:
+        ap_result = ap_chk_session.run_SSHsession("admin", "admin", fake_ap.device_ip, fake_ap.device_name, "_test_",
+                                                  str(tmp_path) + os.sep, 0.1, host_up=True, metrics=metrics,
+                                                  image_manifest=image_manifest,
+                                                  triage=FlashTriage(sample_rate=0.0))
+
+        # Clean APs skip the md5 verify, the damaged ones are escalated to it
+        if "valid_image" == fake_ap.status:
+            assert "triage_clean" == ap_result.status
+        else:
+            assert fake_ap.status == ap_result.status
+
+    escalated = len([fake_ap for fake_ap in fake_server.aps if "valid_image" != fake_ap.status])
+    assert 0 < escalated < 6
+    assert escalated == metrics.counters["triage_escalated"]
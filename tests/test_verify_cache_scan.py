@@ -0,0 +1,51 @@
+"""
+# Title: Verify Cache Scan Test
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.1
+# Purpose: Scan simulated APs twice with a verify cache, the second scan should only ask each AP for its uptime
+# Notes:
+0.1 - Created the test against fake_ap_server.py
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from SSH_Paramiko import SSH_Paramiko
+from fake_ap_server import FakeAPServer, FakeAPProfile, fakeAPAddresses
+from verify_cache import VerifyCache
+import ap_chk_session
+
+FAKE_PORT = 2232
+FAKE_BASE_IP = "127.0.3.1"
+
+
+def test_second_scan_uses_cached_verify(tmp_path, monkeypatch):
+    monkeypatch.setattr(SSH_Paramiko, "SSH_PORT", FAKE_PORT)
+    fake_server = FakeAPServer(4, FAKE_BASE_IP, FAKE_PORT,
+                               FakeAPProfile(latency=0.01, md5_time=0.1, corrupt_image_rate=0.0,
+                                             corrupt_flash_rate=0.0))
+    fake_server.start()
+    try:
+        cache_path = str(tmp_path / "verify_cache.json")
+        for scan in ("first", "second"):
+            verify_cache = VerifyCache(cache_path)
+            ap_results = [ap_chk_session.run_SSHsession("admin", "admin", device_ip, device_name, "_test_",
+                                                        str(tmp_path) + os.sep, 0.1, host_up=True,
+                                                        verify_cache=verify_cache)
+                          for device_ip, device_name in fakeAPAddresses(4, FAKE_BASE_IP)]
+            verify_cache.save()
+
+            assert [ap_result.status for ap_result in ap_results] == ["valid_image"] * 4
+            cached = [ap_result.evidence == "cached verify result" for ap_result in ap_results]
+            if "first" == scan:
+                assert not any(cached)
+                assert all(entry["uptime"] is not None for entry in verify_cache.entries.values())
+            else:
+                assert all(cached)
+    finally:
+        fake_server.stop()
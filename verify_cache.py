@@ -0,0 +1,146 @@
+"""
+# Title: Verify Cache
+# Author: Dean Clark
+# Date Created: 17/10/2026
+# Date Modified: 17/10/2026
+# Version: 0.3
+# Purpose: Persistent cache of AP md5 verify results so scheduled runs only verify APs that are stale or suspect
+# Notes:
+0.1 - Created VerifyCache keyed by device, image name and image hash - A new image name or hash replaces the entry
+    - Entries expire after a TTL or when the AP uptime shows it has reloaded since it was verified
+0.2 - save merges entries written by other processes sharing the cache file, e.g. local queue workers
+0.3 - Added lookupKnown for scans where each AP model verifies a different image from an ImageManifest
+"""
+
+# ++++++++++++++++++++++ Initialising Libraries ++++++++++++++++++++++
+import json
+import os
+import re
+import threading
+import time
+
+
+class VerifyCache(object):
+    # "ap uptime is 1 year, 2 weeks, 3 days, 4 hours, 5 minutes"
+    UPTIME_LINE = re.compile(r"uptime is ([^\r\n\\]*)")
+    UPTIME_UNIT = re.compile(r"(\d+)\s+(year|week|day|hour|minute|second)s?")
+    UNIT_SECONDS = {"year": 31536000, "week": 604800, "day": 86400, "hour": 3600, "minute": 60, "second": 1}
+
+    """
+    cache_path - JSON file the cache is loaded from and saved to
+    ttl - seconds a verified result is trusted for
+    slack - seconds of uptime drift allowed before an AP is treated as reloaded
+    """
+    def __init__(self, cache_path, ttl=604800, slack=600):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.slack = slack
+        self.entries = self.load()
+        self.invalidated = set()
+        self.lock = threading.Lock()
+
+    """
+    Returns - dict of the entries in the cache file, empty if it is missing or damaged
+    """
+    def load(self):
+        if not os.path.isfile(self.cache_path):
+            return {}
+
+        try:
+            with open(self.cache_path, "r") as cache_file:
+                return json.load(cache_file)
+        except ValueError:
+            # A damaged cache only costs a full verify
+            return {}
+
+    """
+    Convert the uptime reported by show version into seconds
+    Returns - int seconds, None if no uptime was found in the output
+    """
+    def parseUptime(self, ssh_out):
+        uptime_line = self.UPTIME_LINE.search(ssh_out)
+        if uptime_line is None:
+            return None
+
+        uptime = 0
+        for count, unit in self.UPTIME_UNIT.findall(uptime_line.group(1)):
+            uptime += int(count) * self.UNIT_SECONDS[unit]
+
+        return uptime
+
+    """
+    Find a verified result for the AP and image that is within the TTL
+    Returns - entry dict or None
+    """
+    def lookup(self, device_ip, image_file_name, image_hash):
+        return self.lookupKnown(device_ip, lambda name, md5: name == image_file_name and md5 == image_hash)
+
+    """
+    Find a verified result for the AP within the TTL whose image is accepted by is_known(image_file_name, image_hash)
+    e.g. ImageManifest.isKnown, an entry for an image no longer in the manifest is not trusted
+    Returns - entry dict or None
+    """
+    def lookupKnown(self, device_ip, is_known):
+        with self.lock:
+            entry = self.entries.get(device_ip)
+
+        if entry is None or time.time() - entry["verified_at"] > self.ttl:
+            return None
+
+        # The AP image has changed since it was verified
+        if not is_known(entry["image_file_name"], entry["image_hash"]):
+            return None
+
+        return entry
+
+    """
+    Check the AP has not reloaded since the entry was verified
+    An AP that has stayed up has an uptime of at least its uptime when verified plus the time since
+    """
+    def isCurrent(self, entry, uptime):
+        if uptime is None or entry.get("uptime") is None:
+            return False
+
+        expected = entry["uptime"] + (time.time() - entry["verified_at"])
+
+        return uptime + self.slack >= expected
+
+    """
+    Record a verify result, replaces any entry held for the AP under another image name or hash
+    """
+    def store(self, device_ip, image_file_name, image_hash, status, uptime):
+        with self.lock:
+            self.invalidated.discard(device_ip)
+            self.entries[device_ip] = {"image_file_name": image_file_name,
+                                       "image_hash": image_hash,
+                                       "status": status,
+                                       "verified_at": time.time(),
+                                       "uptime": uptime}
+
+    def invalidate(self, device_ip):
+        with self.lock:
+            self.entries.pop(device_ip, None)
+            self.invalidated.add(device_ip)
+
+    """
+    Write the cache back to disk, expired entries are dropped
+    Newer entries saved by other processes since the cache was loaded are kept
+    """
+    def save(self):
+        now = time.time()
+        saved = self.load()
+
+        with self.lock:
+            for key, entry in saved.items():
+                current = self.entries.get(key)
+                if key not in self.invalidated and (current is None or
+                                                    entry["verified_at"] > current["verified_at"]):
+                    self.entries[key] = entry
+
+            self.entries = dict((key, entry) for key, entry in self.entries.items()
+                                if now - entry["verified_at"] <= self.ttl)
+            temp_path = self.cache_path + ".tmp"
+            with open(temp_path, "w") as cache_file:
+                json.dump(self.entries, cache_file)
+
+        os.replace(temp_path, self.cache_path)